@@ -1,17 +1,199 @@
-from flask import Flask, send_from_directory
+import argparse
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+
+from flask import Flask, Response, abort, request
+
+from broadcast import create_broadcast_api
+from sync_api import create_sync_api
+
+try:
+    import brotli
+except ImportError:  # brotli jest opcjonalny - bez niego serwujemy gzip
+    brotli = None
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+# Katalog zaczyna się od kropki, więc load_assets go pomija
+DATA_DIR = os.environ.get("OKSFORDOS_DATA", os.path.join(ROOT, ".data"))
+
+# HTML, service worker i manifest muszą być sprawdzane przy każdym wejściu (ETag -> 304),
+# reszta może leżeć w cache przeglądarki dłużej
+MANIFEST_NAME = "asset-manifest.json"
+REVALIDATE = {"index.html", "sw.js", "manifest.json", MANIFEST_NAME}
+STATIC_MAX_AGE = 7 * 24 * 3600
+COMPRESSIBLE = ("text/", "application/json", "application/javascript", "application/manifest+json", "image/svg+xml")
+MIN_COMPRESS_SIZE = 256
+
+mimetypes.add_type("application/manifest+json", ".webmanifest")
+mimetypes.add_type("text/javascript", ".js")
+
+
+class Asset:
+    """A file kept in memory with its content hash and precompressed variants."""
+
+    __slots__ = ("body", "mimetype", "digest", "cache_control", "variants")
+
+    def __init__(self, name, body):
+        self.body = body
+        self.mimetype = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        self.digest = hashlib.sha256(body).hexdigest()[:20]
+        if name in REVALIDATE:
+            self.cache_control = "no-cache"
+        else:
+            self.cache_control = f"public, max-age={STATIC_MAX_AGE}"
+        self.variants = {}
+        if len(body) >= MIN_COMPRESS_SIZE and self.mimetype.startswith(COMPRESSIBLE):
+            if brotli is not None:
+                self.variants["br"] = brotli.compress(body, quality=11)
+            self.variants["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+            # wariant większy od oryginału nie ma sensu
+            self.variants = {k: v for k, v in self.variants.items() if len(v) < len(body)}
+
+    def etag(self, encoding=None):
+        return f'"{self.digest}-{encoding}"' if encoding else f'"{self.digest}"'
+
+
+def load_assets(root):
+    assets = {}
+    for directory, dirs, names in os.walk(root):
+        dirs[:] = [d for d in dirs if not d.startswith(".") and d != "__pycache__"]
+        for name in names:
+            if name.startswith(".") or name.endswith((".py", ".pyc")):
+                continue  # kodu serwera nie wystawiamy
+            path = os.path.join(directory, name)
+            key = os.path.relpath(path, root).replace(os.sep, "/")
+            with open(path, "rb") as f:
+                assets[key] = Asset(key, f.read())
+    return assets
+
+
+def build_asset_manifest(assets):
+    """Content hashes of everything the service worker should cache (sw.js excluded:
+    the browser updates it on its own)."""
+    entries = {
+        "/" + name: asset.digest
+        for name, asset in sorted(assets.items())
+        if name not in ("sw.js", MANIFEST_NAME)
+    }
+    if "/index.html" in entries:
+        entries["/"] = entries["/index.html"]
+    version = hashlib.sha256("".join(f"{k}={v};" for k, v in sorted(entries.items())).encode()).hexdigest()[:20]
+    return {"version": version, "assets": entries}
+
+
+def manifest_bytes(assets):
+    return json.dumps(build_asset_manifest(assets), indent=2, sort_keys=True).encode("utf-8")
+
 
 app = Flask(__name__)
+app.register_blueprint(create_broadcast_api(DATA_DIR))
+app.register_blueprint(create_sync_api(DATA_DIR))
+ASSETS = load_assets(ROOT)
+ASSETS[MANIFEST_NAME] = Asset(MANIFEST_NAME, manifest_bytes(ASSETS))
+
+
+def _etag_matches(header, asset):
+    if not header:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    if "*" in tags:
+        return True
+    return any(asset.etag(enc) in tags for enc in (None, "br", "gzip"))
+
+
+def _pick_encoding(asset):
+    accepted = request.accept_encodings
+    for encoding in ("br", "gzip"):
+        if encoding in asset.variants and accepted[encoding] > 0:
+            return encoding
+    return None
+
+
+def serve_asset(path):
+    asset = ASSETS.get(path)
+    if asset is None:
+        abort(404)
+    encoding = _pick_encoding(asset)
+    headers = {
+        "ETag": asset.etag(encoding),
+        "Cache-Control": asset.cache_control,
+        "Vary": "Accept-Encoding",
+    }
+    if _etag_matches(request.headers.get("If-None-Match"), asset):
+        return Response(status=304, headers=headers)
+    body = asset.body
+    if encoding:
+        body = asset.variants[encoding]
+        headers["Content-Encoding"] = encoding
+    return Response(body, mimetype=asset.mimetype, headers=headers)
 
 
 @app.route("/")
 def serve_index():
-    return send_from_directory(".", "index.html")
+    return serve_asset("index.html")
 
 
 @app.route("/<path:path>")
 def serve_static(path):
-    return send_from_directory(".", path)
+    return serve_asset(path)
+
+
+def serve(host, port, workers, threads):
+    """Production serving: gunicorn worker processes, else waitress threads,
+    else the threaded Werkzeug server. Every open SSE stream (/api/rooms/.../events)
+    holds a thread, so threads bounds the number of live viewers per process."""
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        BaseApplication = None
+
+    if BaseApplication is not None:
+
+        class GunicornApp(BaseApplication):
+            def load_config(self):
+                self.cfg.set("bind", f"{host}:{port}")
+                self.cfg.set("workers", workers)
+                self.cfg.set("worker_class", "gthread")
+                self.cfg.set("threads", threads)
+                self.cfg.set("preload_app", True)  # zasoby wczytane raz, współdzielone przez fork
+
+            def load(self):
+                return app
+
+        GunicornApp().run()
+        return
+
+    try:
+        from waitress import serve as waitress_serve
+    except ImportError:
+        waitress_serve = None
+
+    if waitress_serve is not None:
+        waitress_serve(app, host=host, port=port, threads=max(4, workers * threads))
+        return
+
+    print("Brak gunicorn/waitress - używam wielowątkowego serwera Werkzeug")
+    app.run(host=host, port=port, threaded=True)
 
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=8000)
+    parser = argparse.ArgumentParser(description="Serwer OksfordOS (PWA)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--threads", type=int, default=64, help="wątki na proces (każdy widz transmisji zajmuje jeden)")
+    parser.add_argument("--dev", action="store_true", help="serwer deweloperski Flask")
+    parser.add_argument(
+        "--write-manifest", action="store_true", help=f"zapisz {MANIFEST_NAME} obok plików (hosting statyczny) i zakończ"
+    )
+    args = parser.parse_args()
+    if args.write_manifest:
+        with open(os.path.join(ROOT, MANIFEST_NAME), "wb") as f:
+            f.write(ASSETS[MANIFEST_NAME].body)
+    elif args.dev:
+        app.run(host=args.host, port=args.port)
+    else:
+        serve(args.host, args.port, args.workers, args.threads)
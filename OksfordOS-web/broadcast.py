@@ -0,0 +1,187 @@
+"""Live timer broadcast: publishers POST timer events, viewers follow them over SSE.
+
+Events carry the timer state (running, remaining, duration) stamped with the server's
+time.monotonic() at the moment it was published, so viewers interpolate locally and
+only need a new message when the timer is started, paused or reset. State is kept in
+SQLite so every worker process (gunicorn) sees the same rooms; each process runs one
+poller thread that fans new events out to its own SSE subscribers.
+"""
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from flask import Blueprint, Response, abort, jsonify, request
+
+POLL_INTERVAL = 0.02
+HEARTBEAT = 15.0
+KEEP_EVENTS = 10000
+TIMERS = ("main", "ad")
+ACTIONS = ("start", "pause", "reset")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS timer_events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    room TEXT NOT NULL,
+    timer TEXT NOT NULL,
+    payload TEXT NOT NULL
+);
+"""
+
+
+class TimerHub:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._rooms = {}  # pokój -> {timer: stan}
+        self._subscribers = {}  # pokój -> zbiór kolejek
+        self._wake = threading.Event()
+        self._poller_pid = None
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=5, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode = WAL")
+        return conn
+
+    def _ensure_poller(self):
+        # Wątki nie przeżywają fork()a - każdy proces workera uruchamia własny
+        with self._lock:
+            if self._poller_pid == os.getpid():
+                return
+            self._poller_pid = os.getpid()
+            self._rooms = {}
+            self._subscribers = {}
+            last_seq = self._load_current_state()
+        threading.Thread(target=self._poll_loop, args=(last_seq,), name="timer-hub", daemon=True).start()
+
+    def _load_current_state(self):
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT room, timer, payload FROM timer_events WHERE seq IN "
+                "(SELECT MAX(seq) FROM timer_events GROUP BY room, timer)"
+            ).fetchall()
+            last_seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM timer_events").fetchone()[0]
+        for room, timer, payload in rows:
+            self._rooms.setdefault(room, {})[timer] = json.loads(payload)
+        return last_seq
+
+    def _poll_loop(self, last_seq):
+        conn = self._connect()
+        while True:
+            rows = conn.execute(
+                "SELECT seq, room, timer, payload FROM timer_events WHERE seq > ? ORDER BY seq", (last_seq,)
+            ).fetchall()
+            for seq, room, timer, payload in rows:
+                last_seq = seq
+                event = json.loads(payload)
+                with self._lock:
+                    self._rooms.setdefault(room, {})[timer] = event
+                    subscribers = list(self._subscribers.get(room, ()))
+                for q in subscribers:
+                    q.put(event)
+            self._wake.wait(POLL_INTERVAL)
+            self._wake.clear()
+
+    def publish(self, room, timer, action, remaining, duration):
+        self._ensure_poller()
+        event = {
+            "timer": timer,
+            "action": action,
+            "running": action == "start",
+            "remaining": float(remaining),
+            "duration": float(duration),
+            "t": time.monotonic(),
+        }
+        with self._connect() as conn:
+            seq = conn.execute(
+                "INSERT INTO timer_events (room, timer, payload) VALUES (?, ?, ?)",
+                (room, timer, json.dumps(event)),
+            ).lastrowid
+            if seq % 1000 == 0:
+                conn.execute("DELETE FROM timer_events WHERE seq < ?", (seq - KEEP_EVENTS,))
+        self._wake.set()
+        return event
+
+    def state(self, room):
+        self._ensure_poller()
+        with self._lock:
+            return dict(self._rooms.get(room, {}))
+
+    def subscribe(self, room):
+        self._ensure_poller()
+        q = queue.SimpleQueue()
+        with self._lock:
+            self._subscribers.setdefault(room, set()).add(q)
+        return q
+
+    def unsubscribe(self, room, q):
+        with self._lock:
+            subscribers = self._subscribers.get(room)
+            if subscribers is not None:
+                subscribers.discard(q)
+                if not subscribers:
+                    del self._subscribers[room]
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+def create_broadcast_api(data_dir):
+    api = Blueprint("broadcast", __name__, url_prefix="/api")
+    hub = TimerHub(os.path.join(data_dir, "broadcast.sqlite"))
+    publish_key = os.environ.get("OKSFORDOS_BROADCAST_KEY")
+
+    @api.route("/time")
+    def server_time():
+        # Do estymacji przesunięcia zegara klienta (NTP-owo: min RTT z kilku prób)
+        return jsonify(now=time.monotonic())
+
+    @api.route("/rooms/<room>/timer", methods=["POST"])
+    def publish(room):
+        if publish_key and request.headers.get("X-Room-Key") != publish_key:
+            abort(403)
+        body = request.get_json(silent=True) or {}
+        timer, action = body.get("timer"), body.get("action")
+        if timer not in TIMERS or action not in ACTIONS:
+            abort(400)
+        try:
+            event = hub.publish(room, timer, action, body["remaining"], body.get("duration", body["remaining"]))
+        except (KeyError, TypeError, ValueError):
+            abort(400)
+        return jsonify(event)
+
+    @api.route("/rooms/<room>/state")
+    def state(room):
+        return jsonify(timers=hub.state(room), now=time.monotonic())
+
+    @api.route("/rooms/<room>/events")
+    def events(room):
+        q = hub.subscribe(room)
+
+        def stream():
+            try:
+                yield _sse("state", {"timers": hub.state(room), "now": time.monotonic()})
+                while True:
+                    try:
+                        event = q.get(timeout=HEARTBEAT)
+                    except queue.Empty:
+                        yield _sse("ping", {"now": time.monotonic()})
+                        continue
+                    yield _sse("timer", dict(event, now=time.monotonic()))
+            finally:
+                hub.unsubscribe(room, q)
+
+        return Response(
+            stream(),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    api.hub = hub
+    return api
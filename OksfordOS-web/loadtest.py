@@ -0,0 +1,201 @@
+"""Local load test: many clients loading the PWA at once, like a venue opening the app.
+
+    python loadtest.py --clients 200 --seconds 10          # serwer musi już działać
+    python loadtest.py --spawn --workers 4 --clients 200   # uruchamia app.py sam
+    python loadtest.py --spawn --viewers 300 --events 20   # transmisja timera (SSE)
+
+Every client keeps one HTTP connection, first downloads all assets, then revalidates
+them with If-None-Match like a returning browser would. With --viewers the clients
+instead follow a room's timer stream while events are published, and the test reports
+publish-to-receive latency and the skew between the first and last viewer.
+"""
+import argparse
+import http.client
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+ASSETS = ["/", "/manifest.json", "/logo.png", "/sw.js"]
+
+
+def client_loop(host, port, deadline, latencies, errors, lock):
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    etags = {}
+    local = []
+    failed = 0
+    while time.perf_counter() < deadline:
+        for path in ASSETS:
+            headers = {"Accept-Encoding": "br, gzip"}
+            if path in etags:
+                headers["If-None-Match"] = etags[path]
+            start = time.perf_counter()
+            try:
+                conn.request("GET", path, headers=headers)
+                response = conn.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                conn.close()
+                conn = http.client.HTTPConnection(host, port, timeout=10)
+                continue
+            local.append(time.perf_counter() - start)
+            if response.status not in (200, 304):
+                failed += 1
+            elif response.getheader("ETag"):
+                etags[path] = response.getheader("ETag")
+    conn.close()
+    with lock:
+        latencies.extend(local)
+        errors[0] += failed
+
+
+def viewer_loop(host, port, room, connected, received, lock):
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    try:
+        conn.request("GET", f"/api/rooms/{room}/events")
+        response = conn.getresponse()
+        event = None
+        while True:
+            line = response.readline()
+            if not line:
+                return
+            line = line.decode("utf-8").strip()
+            if line.startswith("event:"):
+                event = line[6:].strip()
+            elif line.startswith("data:"):
+                now = time.perf_counter()
+                if event == "state":
+                    connected.release()
+                elif event == "timer":
+                    marker = json.loads(line[5:])["remaining"]
+                    with lock:
+                        received.setdefault(marker, []).append(now)
+    except (OSError, http.client.HTTPException):
+        return
+
+
+def broadcast_test(host, port, viewers, events, room="loadtest"):
+    connected, received, lock = threading.Semaphore(0), {}, threading.Lock()
+    for _ in range(viewers):
+        threading.Thread(
+            target=viewer_loop, args=(host, port, room, connected, received, lock), daemon=True
+        ).start()
+    for _ in range(viewers):
+        if not connected.acquire(timeout=30):
+            print("Nie wszyscy widzowie się połączyli.", file=sys.stderr)
+            return 1
+
+    latencies, skews, missing = [], [], 0
+    for k in range(events):
+        marker = 1000.0 + k
+        body = json.dumps({"timer": "main", "action": "start", "remaining": marker, "duration": marker})
+        conn = http.client.HTTPConnection(host, port, timeout=10)
+        sent = time.perf_counter()
+        conn.request("POST", f"/api/rooms/{room}/timer", body, {"Content-Type": "application/json"})
+        conn.getresponse().read()
+        conn.close()
+        deadline = time.perf_counter() + 5
+        while time.perf_counter() < deadline:
+            with lock:
+                if len(received.get(marker, ())) >= viewers:
+                    break
+            time.sleep(0.005)
+        with lock:
+            times = sorted(received.get(marker, ()))
+        missing += viewers - len(times)
+        if times:
+            latencies.extend(t - sent for t in times)
+            skews.append(times[-1] - times[0])
+        time.sleep(0.1)
+
+    if not latencies:
+        print("Żaden widz nie odebrał zdarzeń.", file=sys.stderr)
+        return 1
+    latencies.sort()
+    print(
+        f"{viewers} widzów, {events} zdarzeń, nieodebrane: {missing}\n"
+        f"opóźnienie p50 {statistics.median(latencies) * 1000:.1f} ms, max {latencies[-1] * 1000:.1f} ms; "
+        f"rozrzut między widzami śr. {statistics.mean(skews) * 1000:.1f} ms, max {max(skews) * 1000:.1f} ms"
+    )
+    return 0 if missing == 0 else 1
+
+
+def wait_for_server(host, port, timeout=15):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=1)
+            conn.request("GET", "/")
+            conn.getresponse().read()
+            return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Test obciążenia serwera OksfordOS")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--viewers", type=int, default=0, help="test transmisji timera: liczba widzów SSE")
+    parser.add_argument("--events", type=int, default=20, help="z --viewers: liczba publikowanych zdarzeń")
+    parser.add_argument("--spawn", action="store_true", help="uruchom app.py na czas testu")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--dev", action="store_true", help="z --spawn: serwer deweloperski Flask")
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.spawn:
+        cmd = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py"),
+               "--host", args.host, "--port", str(args.port), "--workers", str(args.workers)]
+        if args.dev:
+            cmd.append("--dev")
+        if args.viewers:
+            # Połączenia nie rozkładają się równo między workery - każdy musi udźwignąć wszystkich
+            cmd += ["--threads", str(max(64, args.viewers + 16))]
+        server = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        if not wait_for_server(args.host, args.port):
+            print("Serwer nie odpowiada.", file=sys.stderr)
+            return 1
+        if args.viewers:
+            return broadcast_test(args.host, args.port, args.viewers, args.events)
+        latencies, errors, lock = [], [0], threading.Lock()
+        deadline = time.perf_counter() + args.seconds
+        threads = [
+            threading.Thread(target=client_loop, args=(args.host, args.port, deadline, latencies, errors, lock))
+            for _ in range(args.clients)
+        ]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    if not latencies:
+        print("Brak udanych żądań.", file=sys.stderr)
+        return 1
+    latencies.sort()
+    q = statistics.quantiles(latencies, n=100)
+    print(
+        f"{len(latencies)} żądań w {elapsed:.1f} s = {len(latencies) / elapsed:.0f} req/s, "
+        f"błędy: {errors[0]}\n"
+        f"opóźnienie p50 {q[49] * 1000:.1f} ms, p95 {q[94] * 1000:.1f} ms, "
+        f"p99 {q[98] * 1000:.1f} ms, max {latencies[-1] * 1000:.1f} ms"
+    )
+    return 0 if errors[0] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,23 +1,85 @@
-const CACHE_NAME = 'oksfordos-v5';
-const urlsToCache = [
+// Wersjonowanie przez asset-manifest.json (hashe treści z app.py) - bez ręcznego podbijania numeru
+const CACHE_NAME = 'oksfordos-assets';
+const MANIFEST_URL = '/asset-manifest.json';
+// Gdy manifestu nie ma (np. hosting statyczny bez --write-manifest)
+const FALLBACK_URLS = [
     '/',
     '/index.html',
     '/manifest.json',
- // '/sw.js',
     '/logo.png'
 ];
+const SYNC_INTERVAL_MS = 60 * 1000;
+
+let syncing = null;
+let lastSync = 0;
+
+async function readCachedManifest(cache) {
+    const cached = await cache.match(MANIFEST_URL);
+    if (!cached) return { assets: {} };
+    try {
+        return await cached.json();
+    } catch (e) {
+        return { assets: {} };
+    }
+}
+
+// Pobiera tylko pliki, których hash się zmienił; manifest zapisujemy na końcu,
+// więc przerwana synchronizacja zostanie powtórzona przy następnej okazji
+async function syncAssets() {
+    const cache = await caches.open(CACHE_NAME);
+    let response;
+    try {
+        response = await fetch(MANIFEST_URL, { cache: 'no-cache' });
+    } catch (e) {
+        return; // offline - zostajemy przy tym, co mamy
+    }
+    if (!response.ok) {
+        const known = await cache.match('/');
+        if (!known) await cache.addAll(FALLBACK_URLS);
+        return;
+    }
+    const manifest = await response.clone().json();
+    const previous = await readCachedManifest(cache);
+
+    const changed = [];
+    for (const [url, hash] of Object.entries(manifest.assets)) {
+        if (previous.assets[url] !== hash || !(await cache.match(url))) changed.push([url, hash]);
+    }
+    const fresh = await Promise.all(changed.map(async ([url, hash]) => {
+        const res = await fetch(`${url}?v=${hash}`, { cache: 'no-cache' });
+        if (!res.ok) throw new Error(`${url}: ${res.status}`);
+        return [url, res];
+    }));
+    await Promise.all(fresh.map(([url, res]) => cache.put(url, res)));
+
+    // Usuń pliki, których nie ma już w manifeście
+    await Promise.all(Object.keys(previous.assets)
+        .filter(url => !(url in manifest.assets))
+        .map(url => cache.delete(url)));
+
+    await cache.put(MANIFEST_URL, response);
+}
+
+function syncAssetsThrottled(force) {
+    const now = Date.now();
+    if (syncing) return syncing;
+    if (!force && now - lastSync < SYNC_INTERVAL_MS) return Promise.resolve();
+    lastSync = now;
+    syncing = syncAssets()
+        .catch(err => console.warn('Synchronizacja zasobów nie powiodła się:', err))
+        .finally(() => { syncing = null; });
+    return syncing;
+}
 
 self.addEventListener('install', event => {
     self.skipWaiting();
-    event.waitUntil(
-        caches.open(CACHE_NAME).then(cache => cache.addAll(urlsToCache))
-    );
+    event.waitUntil(syncAssetsThrottled(true));
 });
 
 self.addEventListener('activate', event => {
     event.waitUntil(
         Promise.all([
-            // Usuń stare cache
+            // Usuń stare cache (oksfordos-v5 i wcześniejsze)
             caches.keys().then(cacheNames =>
                 Promise.all(
                     cacheNames.map(name => {
@@ -34,23 +96,27 @@ self.addEventListener('activate', event => {
 self.addEventListener('fetch', event => {
     const url = new URL(event.request.url);
 
-    // Dla HTML – zawsze próbuj sieci, cache tylko jako fallback offline
+    // API, manifest zasobów i obce domeny idą prosto do sieci
+    if (event.request.method !== 'GET' || url.origin !== self.location.origin ||
+        url.pathname.startsWith('/api/') || url.pathname === MANIFEST_URL) {
+        return;
+    }
+
+    // HTML – cache-first, a w tle sprawdzamy manifest (stale-while-revalidate).
+    // Klucz to ścieżka strony: /timer.html?room=... to timer, nie aplikacja sędziego
     if (event.request.mode === 'navigate' || url.pathname.endsWith('.html') || url.pathname === '/') {
+        const key = url.pathname === '/index.html' ? '/' : url.pathname;
+        event.waitUntil(syncAssetsThrottled(false));
         event.respondWith(
-            fetch(event.request)
-                .then(response => {
-                    // Zaktualizuj cache świeżą wersją
-                    const clone = response.clone();
-                    caches.open(CACHE_NAME).then(cache => cache.put(event.request, clone));
-                    return response;
-                })
-                .catch(() => caches.match(event.request))
+            caches.open(CACHE_NAME)
+                .then(cache => cache.match(key))
+                .then(cached => cached || fetch(event.request))
         );
         return;
     }
 
-    // Dla reszty – cache-first (manifest, logo, sw.js)
+    // Dla reszty – cache-first (manifest, logo)
     event.respondWith(
-        caches.match(event.request).then(response => response || fetch(event.request))
+        caches.match(url.pathname).then(response => response || fetch(event.request))
     );
 });
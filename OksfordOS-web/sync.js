@@ -0,0 +1,205 @@
+// Synchronizacja sesji między urządzeniami: wysyłamy tylko zmienione pola (długie teksty
+// jako wycinek prefiks/sufiks), odbieramy to, czego nasz wektor wersji jeszcze nie zna.
+// Protokół opisuje sync_api.py. Kod sesji ustawia się w Ustawieniach.
+const OksfordSync = (() => {
+    const STATE_KEY = 'syncState';
+    const DEBOUNCE_MS = 1000;
+    const POLL_MS = 15000;
+    const SPLICE_MIN = 64; // krótsze pola taniej wysłać w całości
+    const COMPRESS_MIN = 256;
+
+    // Pola sesji: id -> odczyt/zapis (te same klucze co w localStorage)
+    const fields = {};
+
+    function textField(el, key) {
+        return {
+            get: () => el.value,
+            set: v => { el.value = v; localStorage.setItem(key, v); autoResize(el); }
+        };
+    }
+
+    fields.teza = {
+        get: () => localStorage.getItem('teza') || '',
+        set: v => {
+            localStorage.setItem('teza', v);
+            const el = document.getElementById('tezaText'); // w trakcie edycji tezy go nie ma
+            if (el) el.textContent = v || 'Kliknij aby wpisać tezę debaty';
+        }
+    };
+    fields.adVocemProp = textField(els.adVocemProp, 'adVocemProp');
+    fields.adVocemOpp = textField(els.adVocemOpp, 'adVocemOpp');
+    fields.notatnik = textField(els.notatnik, 'notatnik');
+    els.scoreInputs.forEach((input, i) => {
+        fields[`score${i}`] = {
+            get: () => input.value,
+            set: v => { input.value = v; localStorage.setItem(`score${i}`, v); }
+        };
+    });
+    appState.speakers.forEach((_, i) => {
+        ['info', 'question1', 'question2'].forEach((key, ki) => {
+            fields[`speakers/${i}/${key}`] = {
+                get: () => appState.speakers[i][key],
+                set: v => {
+                    appState.speakers[i][key] = v;
+                    saveSpeakers();
+                    const textarea = els.speakerGrid.children[i]?.querySelectorAll('textarea')[ki];
+                    if (textarea) { textarea.value = v; autoResize(textarea); }
+                    toggleQuestions(i);
+                }
+            };
+        });
+    });
+
+    function randomId(bytes) {
+        const raw = crypto.getRandomValues(new Uint8Array(bytes));
+        return btoa(String.fromCharCode(...raw)).replace(/\+/g, '-').replace(/\//g, '_').replace(/=+$/, '');
+    }
+
+    function loadState() {
+        try {
+            const saved = JSON.parse(localStorage.getItem(STATE_KEY));
+            if (saved && saved.replica) return saved;
+        } catch (e) {
+            // uszkodzony stan - zaczynamy od nowa
+        }
+        return { session: '', replica: randomId(9), counter: 0, vv: {}, base: {}, dots: {}, fresh: true };
+    }
+
+    let state = loadState();
+    let timer = null;
+    let running = false;
+    let again = false;
+    let lastResult = '';
+
+    function saveState() {
+        localStorage.setItem(STATE_KEY, JSON.stringify(state));
+    }
+
+    // Wycinek liczony na punktach kodowych, żeby pozycje zgadzały się z str w Pythonie
+    function makeOp(id, value, c) {
+        const base = state.base[id];
+        const dot = state.dots[id];
+        if (!dot || typeof base !== 'string' || value.length < SPLICE_MIN) return { c, v: value };
+        const a = Array.from(base);
+        const b = Array.from(value);
+        let p = 0;
+        while (p < a.length && p < b.length && a[p] === b[p]) p++;
+        let e = 0;
+        while (e < a.length - p && e < b.length - p && a[a.length - 1 - e] === b[b.length - 1 - e]) e++;
+        return { c, b: dot, p, x: a.length - p - e, s: b.slice(p, b.length - e).join('') };
+    }
+
+    async function encode(text) {
+        if (text.length < COMPRESS_MIN || typeof CompressionStream === 'undefined') {
+            return { body: text, headers: { 'Content-Type': 'application/json' } };
+        }
+        const stream = new Blob([text]).stream().pipeThrough(new CompressionStream('gzip'));
+        return {
+            body: await new Response(stream).arrayBuffer(),
+            headers: { 'Content-Type': 'application/json', 'Content-Encoding': 'gzip' }
+        };
+    }
+
+    async function exchange() {
+        // Pierwsza wymiana w nowej sesji tylko pobiera - nie nadpisujemy cudzych notatek pustymi polami
+        const sent = {};
+        const d = {};
+        if (!state.fresh) {
+            for (const [id, field] of Object.entries(fields)) {
+                const value = field.get();
+                if (value === (state.base[id] ?? '')) continue;
+                state.counter++;
+                d[id] = makeOp(id, value, state.counter);
+                sent[id] = value;
+            }
+        }
+        const { body, headers } = await encode(JSON.stringify({ r: state.replica, vv: state.vv, d }));
+        const res = await fetch(`/api/sync/${encodeURIComponent(state.session)}`, { method: 'POST', headers, body });
+        if (!res.ok) throw new Error(`HTTP ${res.status}`);
+        const reply = await res.json();
+
+        const resend = new Set(reply.resend || []);
+        for (const [id, value] of Object.entries(sent)) {
+            if (resend.has(id)) {
+                delete state.dots[id]; // następnym razem pełna wartość
+                continue;
+            }
+            state.base[id] = value;
+            state.dots[id] = [state.replica, d[id].c];
+        }
+        for (const [id, [replica, counter, value]] of Object.entries(reply.d)) {
+            const field = fields[id];
+            if (!field) continue;
+            // Nie ruszamy pola, które użytkownik zmienił w trakcie żądania albo które właśnie
+            // wysłaliśmy (resend) - jego wersja pójdzie w następnej wymianie
+            const local = field.get();
+            const untouched = id in sent ? local === sent[id] && !resend.has(id) : local === (state.base[id] ?? '');
+            if (state.fresh || untouched) field.set(value);
+            state.base[id] = value;
+            state.dots[id] = [replica, counter];
+        }
+        for (const [replica, counter] of Object.entries(reply.vv)) {
+            state.vv[replica] = Math.max(state.vv[replica] || 0, counter);
+        }
+        state.fresh = false;
+        saveState();
+        return Object.keys(sent).length + Object.keys(reply.d).length;
+    }
+
+    async function run() {
+        clearTimeout(timer);
+        if (!state.session) return;
+        if (running) { again = true; return; }
+        running = true;
+        try {
+            await exchange();
+            lastResult = `Zsynchronizowano ${new Date().toLocaleTimeString()}`;
+        } catch (e) {
+            lastResult = `Synchronizacja nie powiodła się (${e.message})`;
+            console.warn(lastResult);
+        } finally {
+            running = false;
+        }
+        if (again) {
+            again = false;
+            schedule(0);
+        } else {
+            schedule(POLL_MS);
+        }
+    }
+
+    function schedule(delay = DEBOUNCE_MS) {
+        if (!state.session) return;
+        clearTimeout(timer);
+        timer = setTimeout(run, delay);
+    }
+
+    function setSession(code) {
+        if (code === state.session) return;
+        if (code && !/^[A-Za-z0-9_-]{16,64}$/.test(code)) {
+            alert('Kod synchronizacji musi mieć 16-64 znaki: litery, cyfry, - lub _');
+            return;
+        }
+        state = { session: code, replica: state.replica, counter: state.counter, vv: {}, base: {}, dots: {}, fresh: true };
+        saveState();
+        lastResult = '';
+        schedule(0);
+    }
+
+    document.addEventListener('input', () => schedule());
+    document.addEventListener('change', () => schedule());
+    document.addEventListener('focusout', () => schedule()); // teza zapisuje się dopiero po blur
+    document.addEventListener('visibilitychange', () => schedule(0));
+    window.addEventListener('online', () => schedule(0));
+    document.getElementById('newSyncCode').addEventListener('click', () => {
+        document.getElementById('syncCode').value = randomId(15);
+    });
+    schedule(0);
+
+    return {
+        setSession,
+        session: () => state.session,
+        status: () => lastResult,
+        syncNow: run
+    };
+})();
@@ -0,0 +1,209 @@
+"""Delta sync of web-client sessions between devices.
+
+A session is a set of fields (teza, notatnik, score3, speakers/2/info, ...). Every
+device is a replica with its own counter; each write of a field is tagged with its dot
+(replica, counter). One POST /api/sync/<session> both pushes and pulls:
+
+    {"r": "replika", "vv": {"replika": 12, ...},
+     "d": {"notatnik": {"c": 13, "b": ["replika", 12], "p": 40, "x": 0, "s": "dopisek"},
+           "score3": {"c": 14, "v": "7"}}}
+
+A text change is sent as a splice (p, x, s) against the dot it was based on (b), or as a
+full value (v). A splice whose base is no longer the stored dot is not applied and the
+field is listed in "resend", so the client sends the full value next time. The response
+carries every field whose dot the client's version vector (vv) does not cover yet, plus
+the server's vector. Concurrent writes of one field are resolved last-writer-wins in
+arrival order and reported in "conflicts". Bodies may be gzip-compressed both ways.
+"""
+import gzip
+import json
+import os
+import re
+import sqlite3
+import zlib
+
+from flask import Blueprint, Response, abort, request
+
+SESSION_ID = re.compile(r"^[A-Za-z0-9_-]{16,64}$")
+REPLICA_ID = re.compile(r"^[A-Za-z0-9_-]{1,32}$")
+FIELD_ID = re.compile(r"^[A-Za-z0-9_/]{1,64}$")
+MAX_BODY = 1 << 20
+MAX_VALUE = 256 * 1024
+MAX_FIELDS = 256
+MIN_COMPRESS_SIZE = 256
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sync_sessions (
+    id TEXT PRIMARY KEY,
+    vv TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sync_fields (
+    session TEXT NOT NULL,
+    field TEXT NOT NULL,
+    value TEXT NOT NULL,
+    replica TEXT NOT NULL,
+    counter INTEGER NOT NULL,
+    PRIMARY KEY (session, field)
+) WITHOUT ROWID;
+"""
+
+
+class SyncStore:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        return conn
+
+    def exchange(self, session, replica, client_vv, deltas):
+        """Apply the pushed deltas and return (server vv, fields to pull, resend, conflicts)."""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")  # jeden zapis na raz, także między workerami
+            row = conn.execute("SELECT vv FROM sync_sessions WHERE id = ?", (session,)).fetchone()
+            vv = json.loads(row[0]) if row else {}
+            stored = {
+                field: (value, rep, counter)
+                for field, value, rep, counter in conn.execute(
+                    "SELECT field, value, replica, counter FROM sync_fields WHERE session = ?", (session,)
+                )
+            }
+            if len(set(stored) | set(deltas)) > MAX_FIELDS:
+                raise ValueError("za dużo pól")
+
+            resend, conflicts, written = [], [], []
+            seen = dict(client_vv)
+            for field, op in deltas.items():
+                counter = op["c"]
+                current = stored.get(field)
+                if "v" in op:
+                    value = op["v"]
+                elif current is not None and list(current[1:]) == op["b"]:
+                    base = current[0]
+                    if op["p"] + op["x"] > len(base):
+                        raise ValueError(f"{field}: zakres poza tekstem")
+                    value = base[:op["p"]] + op["s"] + base[op["p"] + op["x"]:]
+                else:
+                    resend.append(field)
+                    continue
+                if len(value) > MAX_VALUE:
+                    raise ValueError(f"{field}: wartość za długa")
+                if current is not None and current[2] > client_vv.get(current[1], 0):
+                    conflicts.append(field)  # nadpisujemy zapis, którego klient nie widział
+                stored[field] = (value, replica, counter)
+                written.append((session, field, value, replica, counter))
+                vv[replica] = max(vv.get(replica, 0), counter)
+                seen[replica] = max(seen.get(replica, 0), counter)
+
+            if written:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO sync_fields (session, field, value, replica, counter) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    written,
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO sync_sessions (id, vv) VALUES (?, ?)", (session, json.dumps(vv))
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        pull = {
+            field: [rep, counter, value]
+            for field, (value, rep, counter) in stored.items()
+            if counter > seen.get(rep, 0)
+        }
+        return vv, pull, resend, conflicts
+
+
+def _read_body():
+    if (request.content_length or 0) > MAX_BODY:
+        abort(413)
+    data = request.get_data(cache=False)
+    if len(data) > MAX_BODY:
+        abort(413)
+    if request.headers.get("Content-Encoding", "").lower() == "gzip":
+        inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        try:
+            data = inflater.decompress(data, MAX_BODY)
+        except zlib.error:
+            abort(400)
+        if inflater.unconsumed_tail:
+            abort(413)
+    try:
+        return json.loads(data)
+    except (UnicodeDecodeError, ValueError):
+        abort(400)
+
+
+def _validate(body):
+    if not isinstance(body, dict):
+        raise ValueError("oczekiwano obiektu")
+    replica, vv, deltas = body.get("r"), body.get("vv", {}), body.get("d", {})
+    if not isinstance(replica, str) or not REPLICA_ID.match(replica):
+        raise ValueError("r")
+    if not isinstance(vv, dict) or not all(
+        isinstance(k, str) and type(v) is int and v >= 0 for k, v in vv.items()
+    ):
+        raise ValueError("vv")
+    if not isinstance(deltas, dict) or len(deltas) > MAX_FIELDS:
+        raise ValueError("d")
+    for field, op in deltas.items():
+        if not FIELD_ID.match(field) or not isinstance(op, dict) or type(op.get("c")) is not int:
+            raise ValueError(field)
+        if op["c"] <= vv.get(replica, 0):
+            raise ValueError(f"{field}: licznik się nie zwiększył")
+        if "v" in op:
+            if not isinstance(op["v"], str):
+                raise ValueError(field)
+        elif not (
+            isinstance(op.get("b"), list) and len(op["b"]) == 2
+            and isinstance(op["b"][0], str) and type(op["b"][1]) is int
+            and type(op.get("p")) is int and type(op.get("x")) is int and op["p"] >= 0 and op["x"] >= 0
+            and isinstance(op.get("s"), str)
+        ):
+            raise ValueError(field)
+    return replica, vv, deltas
+
+
+def _json_response(data):
+    body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    headers = {"Cache-Control": "no-store", "Vary": "Accept-Encoding"}
+    if len(body) >= MIN_COMPRESS_SIZE and request.accept_encodings["gzip"] > 0:
+        body = gzip.compress(body, compresslevel=6, mtime=0)
+        headers["Content-Encoding"] = "gzip"
+    return Response(body, mimetype="application/json", headers=headers)
+
+
+def create_sync_api(data_dir):
+    api = Blueprint("sync", __name__, url_prefix="/api/sync")
+    store = SyncStore(os.path.join(data_dir, "sync.sqlite"))
+
+    @api.route("/<session>", methods=["POST"])
+    def exchange(session):
+        if not SESSION_ID.match(session):
+            abort(404)
+        try:
+            replica, vv, deltas = _validate(_read_body())
+            server_vv, pull, resend, conflicts = store.exchange(session, replica, vv, deltas)
+        except ValueError as e:
+            return _json_response({"error": str(e)}), 400
+        response = {"vv": server_vv, "d": pull}
+        if resend:
+            response["resend"] = resend
+        if conflicts:
+            response["conflicts"] = conflicts
+        return _json_response(response)
+
+    api.store = store
+    return api
@@ -0,0 +1,261 @@
+"""Timestamped log of every note edit, for replaying a round against the timer.
+
+    python annotation_log.py runda1.przebieg                 # podsumowanie zapisu
+    python annotation_log.py runda1.przebieg --at 12:30      # wszystkie notatki w 12:30 od startu zapisu
+    python annotation_log.py runda1.przebieg --at 12:30 --field notatnik
+
+Each event is (time since the log started, speech on the main timer, main timer position,
+field id, splice: position, removed, added) - the same splices the editors hand to
+DebateSession. Columns are arrays and the added text is kept as one string, so an edit
+costs 27 bytes plus what was typed: three hours of steady typing stay under two megabytes. The log
+is saved next to the session file (annotation_path) as a JSON header line followed by the
+raw columns and the text. Replay keeps the state every CHECKPOINT_EVERY events, so seeking
+to any time applies at most that many edits; runs of typing are applied as one splice.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from array import array
+from bisect import bisect_right
+from collections import Counter, namedtuple
+
+MAGIC = b"OKSFORDOS-PRZEBIEG 1\n"
+CHECKPOINT_EVERY = 1000
+_JOIN_CHUNKS = 4096
+
+Event = namedtuple("Event", "t speech timer field position removed added")
+
+# nazwa kolumny, typ w array; kolejność = kolejność w pliku
+COLUMNS = (
+    ("time", "d"),  # sekundy od początku zapisu (time.monotonic)
+    ("timer", "f"),  # czas, jaki upłynął na głównym timerze
+    ("speech", "b"),  # wystąpienie na głównym timerze (-1 = żadne)
+    ("field", "H"),  # indeks w AnnotationLog.fields
+    ("position", "I"),
+    ("removed", "I"),
+    ("added_end", "I"),  # koniec dopisanego tekstu w AnnotationLog.text()
+)
+
+
+def annotation_path(session_path):
+    """Where the log of a session file lives: runda1.json -> runda1.przebieg."""
+    return os.path.splitext(session_path)[0] + ".przebieg"
+
+
+class AnnotationLog:
+    def __init__(self, base=None, meta=None, clock=time.monotonic):
+        self.base = {field: text for field, text in (base or {}).items() if text}  # stan na początku zapisu
+        self.meta = dict(meta or {})  # np. {"format": "oksfordzki"} - do podpisów w podsumowaniu
+        self.fields = []
+        self._field_ids = {}
+        self._columns = {name: array(typecode) for name, typecode in COLUMNS}
+        self._chunks = []
+        self._text_length = 0
+        self._clock = clock
+        self.started = clock()
+        self.wall_started = time.time()
+
+    def __len__(self):
+        return len(self._columns["time"])
+
+    @property
+    def duration(self):
+        times = self._columns["time"]
+        return times[-1] if times else 0.0
+
+    def record(self, field, position, removed, added, speech=-1, timer=0.0):
+        field_id = self._field_ids.get(field)
+        if field_id is None:
+            field_id = self._field_ids[field] = len(self.fields)
+            self.fields.append(field)
+        columns = self._columns
+        columns["time"].append(self._clock() - self.started)
+        columns["timer"].append(timer)
+        columns["speech"].append(-1 if speech is None else speech)
+        columns["field"].append(field_id)
+        columns["position"].append(position)
+        columns["removed"].append(removed)
+        self._text_length += len(added)
+        columns["added_end"].append(self._text_length)
+        if added:
+            self._chunks.append(added)
+            if len(self._chunks) >= _JOIN_CHUNKS:
+                self._chunks = ["".join(self._chunks)]
+
+    def text(self):
+        """Everything ever typed, in order; event i added text()[added_end[i-1]:added_end[i]]."""
+        if len(self._chunks) > 1:
+            self._chunks = ["".join(self._chunks)]
+        return self._chunks[0] if self._chunks else ""
+
+    def event(self, index):
+        c = self._columns
+        start = c["added_end"][index - 1] if index else 0
+        return Event(
+            c["time"][index], c["speech"][index], c["timer"][index], self.fields[c["field"][index]],
+            c["position"][index], c["removed"][index], self.text()[start:c["added_end"][index]],
+        )
+
+    def resume(self):
+        """Continue a loaded log: new events are timed from its last one, not from a gap."""
+        self.started = self._clock() - self.duration
+
+    def replay(self, every=CHECKPOINT_EVERY):
+        return Replay(self, every)
+
+    # Zapis
+    def save(self, path):
+        text = self.text().encode("utf-8")
+        header = {
+            "events": len(self),
+            "fields": self.fields,
+            "columns": [list(column) for column in COLUMNS],
+            "byteorder": sys.byteorder,
+            "text_bytes": len(text),
+            "started": self.wall_started,
+            "base": self.base,
+            "meta": self.meta,
+        }
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(MAGIC)
+            f.write(json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n")
+            for name, _ in COLUMNS:
+                self._columns[name].tofile(f)
+            f.write(text)
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        """Read a saved log; raises ValueError when the file is not one or is cut short."""
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path}: to nie jest zapis przebiegu rundy")
+            header = json.loads(f.readline().decode("utf-8"))
+            if [list(column) for column in COLUMNS] != header["columns"]:
+                raise ValueError(f"{path}: nieznany układ kolumn")
+            log = cls(header["base"], header.get("meta"))
+            count = header["events"]
+            for name, _ in COLUMNS:
+                column = log._columns[name]
+                try:
+                    column.fromfile(f, count)
+                except EOFError as e:
+                    raise ValueError(f"{path}: plik urwany") from e
+                if header["byteorder"] != sys.byteorder:
+                    column.byteswap()
+            text = f.read(header["text_bytes"]).decode("utf-8")
+        log.fields = list(header["fields"])
+        log._field_ids = {field: i for i, field in enumerate(log.fields)}
+        log._chunks = [text] if text else []
+        log._text_length = len(text)
+        log.wall_started = header["started"]
+        if count and log._columns["added_end"][-1] != len(text):
+            raise ValueError(f"{path}: tekst nie zgadza się z kolumnami")
+        return log
+
+
+class Replay:
+    """Session texts at any point of a log: state(count) after the first ``count`` events,
+    at(t) at ``t`` seconds since the log started."""
+
+    def __init__(self, log, every=CHECKPOINT_EVERY):
+        self.log = log
+        self.every = every
+        self._text = log.text()
+        # Stan co `every` zdarzeń - niezmienione pola dzielą napisy, więc to tanie
+        self._checkpoints = [dict(log.base)]
+        texts = dict(log.base)
+        for start in range(0, len(log) - every + 1, every):
+            self._apply(texts, start, start + every)
+            self._checkpoints.append(dict(texts))
+
+    def index_at(self, t):
+        """Number of events recorded up to ``t`` seconds (inclusive)."""
+        return bisect_right(self.log._columns["time"], t)
+
+    def at(self, t):
+        return self.state(self.index_at(t))
+
+    def final(self):
+        return self.state(len(self.log))
+
+    def state(self, count):
+        """{field: text} after the first ``count`` events; fields still empty are left out."""
+        checkpoint = min(count // self.every, len(self._checkpoints) - 1)
+        texts = dict(self._checkpoints[checkpoint])
+        self._apply(texts, checkpoint * self.every, count)
+        return {field: text for field, text in texts.items() if text}
+
+    def _apply(self, texts, start, stop):
+        c = self.log._columns
+        fields, positions, removed, ends = c["field"], c["position"], c["removed"], c["added_end"]
+        i = start
+        while i < stop:
+            field, position = fields[i], positions[i]
+            begin = ends[i - 1] if i else 0
+            end = ends[i]
+            # Pisanie jednym ciągiem (kolejne wstawienia tuż za poprzednim) to jeden splice
+            j = i + 1
+            while j < stop and fields[j] == field and not removed[j] and positions[j] == position + end - begin:
+                end = ends[j]
+                j += 1
+            name = self.log.fields[field]
+            current = texts.get(name, "")
+            texts[name] = current[:position] + self._text[begin:end] + current[position + removed[i]:]
+            i = j
+
+
+def _parse_time(value):
+    """"12:30", "1:02:03" or plain seconds."""
+    seconds = 0.0
+    for part in value.split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def _format_time(seconds):
+    m, s = divmod(int(seconds), 60)
+    return f"{m // 60}:{m % 60:02}:{s:02}" if m >= 60 else f"{m}:{s:02}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Przebieg rundy: podsumowanie i stan notatek w dowolnej chwili")
+    parser.add_argument("path", help="plik .przebieg zapisany obok sesji")
+    parser.add_argument("--at", type=_parse_time, help="chwila od początku zapisu (sekundy, m:ss lub h:mm:ss)")
+    parser.add_argument("--field", help="tylko to pole, np. notatnik albo speakers/2/info")
+    args = parser.parse_args(argv)
+
+    try:
+        log = AnnotationLog.load(args.path)
+    except (OSError, ValueError) as e:
+        print(f"Nie można wczytać zapisu: {e}", file=sys.stderr)
+        return 1
+
+    if args.at is None:
+        from debate_formats import get_format
+
+        fmt = get_format(log.meta.get("format"))
+        size = os.path.getsize(args.path)
+        print(f"Zdarzeń {len(log)}, czas {_format_time(log.duration)}, plik {size / 1024:.1f} KB")
+        speeches = Counter(log._columns["speech"])
+        for speech, count in sorted(speeches.items()):
+            label = fmt.speaker_label(speech) if 0 <= speech < fmt.speaker_count else "-"
+            print(f"  w czasie wystąpienia {label:<8} {count:>7} zmian")
+        return 0
+
+    replay = log.replay()
+    count = replay.index_at(args.at)
+    texts = replay.state(count)
+    print(f"Stan po {count} z {len(log)} zdarzeń ({_format_time(args.at)})")
+    for field in sorted(texts) if args.field is None else [args.field]:
+        print(f"--- {field}")
+        print(texts.get(field, ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
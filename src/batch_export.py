@@ -0,0 +1,97 @@
+"""Headless PDF export for many saved sessions.
+
+    python batch_export.py sesje/ -o raporty/ -j 8
+
+Uses the same layout as Ctrl+E in the GUI, without importing PyQt5.
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from pdf_report import build_session_pdf
+from session_io import collect_session_files, load_session_from_json
+
+
+def pdf_path_for(session_file, output_dir=None, root=None):
+    """PDF next to the session, or in ``output_dir`` under the session's path relative to ``root``."""
+    stem = os.path.splitext(os.path.basename(session_file))[0]
+    directory = os.path.dirname(session_file)
+    if output_dir:
+        relative = os.path.relpath(os.path.abspath(directory), root) if root else os.curdir
+        directory = os.path.normpath(os.path.join(output_dir, relative))
+    return os.path.join(directory, stem + ".pdf")
+
+
+def pdf_paths(session_files, output_dir=None):
+    """{session file: PDF file}. With ``output_dir`` the directories below the common parent
+    of all sessions are mirrored there, so a/runda1.json and b/runda1.json do not collide.
+    Raises ValueError if two sessions would still write the same PDF."""
+    session_files = list(dict.fromkeys(session_files))
+    root = None
+    if output_dir and session_files:
+        try:
+            root = os.path.commonpath([os.path.dirname(os.path.abspath(f)) for f in session_files])
+        except ValueError:
+            root = None  # różne dyski w Windows - zostaje płaski katalog i kontrola kolizji
+    paths = {f: pdf_path_for(f, output_dir, root) for f in session_files}
+    seen = {}
+    for session_file, pdf_file in paths.items():
+        key = os.path.normcase(os.path.abspath(pdf_file))
+        if key in seen:
+            raise ValueError(f"{seen[key]} i {session_file} zapisałyby ten sam plik {pdf_file}")
+        seen[key] = session_file
+    return paths
+
+
+def export_one(session_file, pdf_file):
+    os.makedirs(os.path.dirname(pdf_file) or os.curdir, exist_ok=True)
+    build_session_pdf(pdf_file, load_session_from_json(session_file))
+    return pdf_file
+
+
+def export_many(session_files, output_dir=None, workers=None):
+    """Render every session to PDF in a process pool; returns a list of (file, error).
+
+    Raises ValueError before exporting anything if two sessions map to one PDF.
+    """
+    targets = pdf_paths(session_files, output_dir)
+    failures = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(export_one, f, pdf_file): f
+            for f, pdf_file in targets.items()
+        }
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                failures.append((futures[future], e))
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Eksport wielu sesji OksfordOS do PDF")
+    parser.add_argument("paths", nargs="+", help="pliki .json lub katalogi z sesjami")
+    parser.add_argument("-o", "--output", help="katalog na PDF-y (domyślnie obok plików JSON)")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="liczba procesów (domyślnie wszystkie rdzenie)")
+    args = parser.parse_args(argv)
+
+    files = collect_session_files(args.paths)
+    if not files:
+        print("Nie znaleziono plików sesji.", file=sys.stderr)
+        return 1
+
+    try:
+        failures = export_many(files, args.output, args.jobs)
+    except ValueError as e:
+        print(f"Kolizja nazw: {e}", file=sys.stderr)
+        return 1
+    for session_file, error in failures:
+        print(f"{session_file}: {error}", file=sys.stderr)
+    print(f"Wyeksportowano {len(files) - len(failures)}/{len(files)} sesji.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,377 @@
+"""Headless benchmarks for the judge app's hot paths, compared against a stored baseline.
+
+    python benchmark.py                              # wyniki -> bench_results.json
+    python benchmark.py --baseline benchmark_baseline.json
+    python benchmark.py --save-baseline benchmark_baseline.json
+    python benchmark.py --only keystroke save_load
+
+Runs on the Qt offscreen platform with settings, autosave and archive redirected to a
+temporary directory, so it never touches the user's data. Inputs are generated from a
+fixed seed. Every metric reports the median (compared against the baseline) together
+with min and p95; a metric is a regression when its median is slower than the baseline
+by more than --tolerance.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SEED = 2024
+WORDS = (
+    "teza argument propozycja opozycja mówca pytanie dowód przykład kontrargument "
+    "statystyka źródło wniosek replika ad vocem sędzia punktacja logika retoryka "
+    "zasadność spójność żądanie odpowiedź"
+).split()
+
+
+def make_text(rng, lines, words_per_line=12):
+    return "\n".join(" ".join(rng.choice(WORDS) for _ in range(words_per_line)) for _ in range(lines))
+
+
+def make_session(rng, lines=400):
+    """A session with large notes: ~8 x 3 fields and a notebook of `lines` lines each."""
+    return {
+        "version": 1,
+        "speakers": [
+            {
+                "info": make_text(rng, lines),
+                "question1": make_text(rng, lines // 4),
+                "question2": make_text(rng, lines // 4),
+            }
+            for _ in range(8)
+        ],
+        "ad_vocem": [make_text(rng, lines // 2), make_text(rng, lines // 2)],
+        "notatnik": make_text(rng, lines * 2),
+        "teza": "Ta izba uważa, że benchmarki powinny być powtarzalne",
+        "punkty": [rng.randint(0, 10) for _ in range(8)],
+    }
+
+
+def summarize(samples, unit="ms", **extra):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))]
+    result = {
+        "unit": unit,
+        "n": len(samples),
+        "median": round(statistics.median(samples), 4),
+        "min": round(samples[0], 4),
+        "p95": round(p95, 4),
+    }
+    result.update(extra)
+    return result
+
+
+def timed(fn, repeat, warmup=1):
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+# Pomiary
+def bench_keystroke(ctx, repeat):
+    """Keystroke to finished layout in a large document, cursor in the middle."""
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtTest import QTest
+    from oksfordos import AutoResizingTextEdit
+
+    results = {}
+    text = make_text(random.Random(SEED), 3000)
+    for mode in (AutoResizingTextEdit.RESIZE_DEFERRED, AutoResizingTextEdit.RESIZE_IMMEDIATE):
+        editor = AutoResizingTextEdit(resize_mode=mode)
+        editor.resize(600, 400)
+        editor.show()
+        editor.setPlainText(text)
+        editor.resize_for_content()
+        ctx.app.processEvents()
+        cursor = editor.textCursor()
+        cursor.setPosition(len(text) // 2)
+        editor.setTextCursor(cursor)
+
+        def keystroke():
+            QTest.keyClick(editor, Qt.Key_A)
+            if mode == AutoResizingTextEdit.RESIZE_DEFERRED:
+                editor.apply_pending_resize()  # to, co zrobiłby timer klatki
+            editor.document().documentLayout().documentSize()
+
+        def newline():
+            QTest.keyClick(editor, Qt.Key_Return)
+            if mode == AutoResizingTextEdit.RESIZE_DEFERRED:
+                editor.apply_pending_resize()
+            editor.document().documentLayout().documentSize()
+
+        results[f"keystroke_{mode}"] = summarize(timed(keystroke, repeat * 20, warmup=10), chars=len(text))
+        results[f"keystroke_newline_{mode}"] = summarize(timed(newline, repeat * 5, warmup=3), chars=len(text))
+        editor.close()
+        editor.deleteLater()
+    return results
+
+
+def bench_save_load(ctx, repeat):
+    from session_io import load_session_from_json, save_session_to_json
+
+    path = os.path.join(ctx.tmp, "bench_session.json")
+    save_session_to_json(path, ctx.session)
+    size_mb = os.path.getsize(path) / 1e6
+    save = timed(lambda: save_session_to_json(path, ctx.session), repeat * 5)
+    load = timed(lambda: load_session_from_json(path, speaker_count=8, score_count=8), repeat * 5)
+    return {
+        name: summarize(samples, mb=round(size_mb, 3), mb_per_s=round(size_mb / (statistics.median(samples) / 1000), 1))
+        for name, samples in (("save_session_to_json", save), ("load_session_from_json", load))
+    }
+
+
+def bench_import(ctx, repeat):
+    from session_io import save_session_to_json
+
+    window = ctx.window()
+    paths = []
+    for i in range(2):
+        # Dwa różne pliki na zmianę - inaczej load_text pomija niezmienione pola
+        path = os.path.join(ctx.tmp, f"bench_import_{i}.json")
+        save_session_to_json(path, make_session(random.Random(SEED + i)))
+        paths.append(path)
+    state = {"i": 0}
+
+    def do_import():
+        state["i"] ^= 1
+        window.import_state_from_json(paths[state["i"]])
+        ctx.app.processEvents()
+
+    return {"import_state_from_json": summarize(timed(do_import, repeat, warmup=2))}
+
+
+def bench_export_pdf(ctx, repeat):
+    """export_to_pdf end to end (snapshot, worker thread, until the worker finishes; after the
+    warmup an unchanged session comes from the report cache) and the full render on its own."""
+    import oksfordos
+    from pdf_report import build_session_pdf
+
+    window = ctx.window()
+    window.apply_session(ctx.session)
+    target = os.path.join(ctx.tmp, "bench.pdf")
+    original = oksfordos.QFileDialog.getSaveFileName
+    oksfordos.QFileDialog.getSaveFileName = staticmethod(lambda *a, **k: (target, ""))
+    try:
+        def export():
+            window.export_to_pdf()
+            while window._pdf_worker is not None:
+                ctx.app.processEvents()
+                time.sleep(0.001)
+
+        samples = timed(export, repeat, warmup=1)
+    finally:
+        oksfordos.QFileDialog.getSaveFileName = original
+    size_kb = round(os.path.getsize(target) / 1024, 1)
+    render = timed(lambda: build_session_pdf(target, ctx.session), max(3, repeat // 2))
+    return {
+        "export_to_pdf": summarize(samples, kb=size_kb),
+        "render_pdf": summarize(render, kb=size_kb),
+    }
+
+
+def bench_annotation_log(ctx, repeat, events=60000):
+    """A three-hour round of note edits: cost of recording one, file size, replay and seeking."""
+    from annotation_log import AnnotationLog
+
+    rng = random.Random(SEED)
+    fields = [f"speakers/{i}/{name}" for i in range(8) for name in ("info", "question1", "question2")]
+    fields += ["ad_vocem/0", "ad_vocem/1", "notatnik"]
+    clock = [0.0]
+    lengths = dict.fromkeys(fields, 0)
+    edits = []
+    while len(edits) < events:
+        field = rng.choice(fields)
+        position = rng.randint(0, lengths[field])
+        for word in make_text(rng, 1, rng.randint(1, 6)).split():
+            for ch in word + " ":  # pisanie po znaku, jak w edytorze
+                edits.append((field, position, 0, ch))
+                position += 1
+                lengths[field] += 1
+        if lengths[field] > 10 and rng.random() < 0.2:  # poprawka: usunięcie kilku znaków
+            removed = rng.randint(1, 5)
+            edits.append((field, position - removed, removed, ""))
+            lengths[field] -= removed
+    edits = edits[:events]
+
+    def record():
+        clock[0] = 0.0
+        log = AnnotationLog(clock=lambda: clock[0])
+        for field, position, removed, added in edits:
+            clock[0] += 0.18  # ~3 h
+            log.record(field, position, removed, added, 3, clock[0] % 240)
+        return log
+
+    samples = timed(record, max(3, repeat // 2))
+    log = record()
+    path = os.path.join(ctx.tmp, "bench.przebieg")
+    log.save(path)
+    size_mb = round(os.path.getsize(path) / 1e6, 3)
+    save = timed(lambda: log.save(path), repeat)
+    load = timed(lambda: AnnotationLog.load(path), repeat)
+    replay = timed(log.replay, max(3, repeat // 2))
+    player = log.replay()
+    seek = timed(lambda: player.at(rng.uniform(0, log.duration)), repeat * 5)
+    return {
+        "annotation_record": summarize([ms * 1000 / events for ms in samples], unit="us", events=events),
+        "annotation_save": summarize(save, mb=size_mb),
+        "annotation_load": summarize(load, mb=size_mb),
+        "annotation_replay": summarize(replay, events=events),
+        "annotation_seek": summarize(seek, events=events),
+    }
+
+
+def bench_cold_start(ctx, repeat):
+    """New process to first painted window (OKSFORDOS_STARTUP_TIME=exit)."""
+    env = dict(os.environ, OKSFORDOS_STARTUP_TIME="exit")
+    first_paint, wall = [], []
+    for i in range(repeat + 1):
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, os.path.join(HERE, "oksfordos.py")],
+            cwd=HERE, env=env, capture_output=True, text=True, timeout=60,
+        )
+        elapsed = (time.perf_counter() - start) * 1000
+        match = re.search(r"Pierwsze odrysowanie po (\d+) ms", proc.stderr)
+        if match is None:
+            raise RuntimeError(f"oksfordos.py nie zgłosił odrysowania:\n{proc.stderr[-2000:]}")
+        if i == 0:
+            continue  # pierwsze uruchomienie rozgrzewa cache dysku i .pyc
+        first_paint.append(float(match.group(1)))
+        wall.append(elapsed)
+    return {
+        "cold_start_first_paint": summarize(first_paint),
+        "cold_start_process": summarize(wall),
+    }
+
+
+BENCHMARKS = {
+    "keystroke": bench_keystroke,
+    "save_load": bench_save_load,
+    "import": bench_import,
+    "export_pdf": bench_export_pdf,
+    "annotation_log": bench_annotation_log,
+    "cold_start": bench_cold_start,
+}
+
+
+class Context:
+    def __init__(self, app, tmp):
+        self.app = app
+        self.tmp = tmp
+        self.session = make_session(random.Random(SEED))
+        self._window = None
+
+    def window(self):
+        if self._window is None:
+            from oksfordos import DebateJudgeApp
+
+            self._window = DebateJudgeApp()
+            self._window.show()
+            self.app.processEvents()
+        return self._window
+
+    def close(self):
+        if self._window is not None:
+            self._window.close()
+
+
+def compare(results, baseline, tolerance):
+    rows, regressions = [], []
+    for name, result in sorted(results.items()):
+        base = baseline.get("results", {}).get(name)
+        if base is None or not base.get("median"):
+            rows.append((name, result["median"], None, None, ""))
+            continue
+        ratio = result["median"] / base["median"]
+        flag = ""
+        if ratio > 1 + tolerance:
+            flag = "REGRESJA"
+            regressions.append(name)
+        elif ratio < 1 - tolerance:
+            flag = "szybciej"
+        rows.append((name, result["median"], base["median"], ratio, flag))
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarki OksfordOS (bez okna, platforma offscreen)")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="uruchom tylko wybrane")
+    parser.add_argument("--repeat", type=int, default=10, help="liczba powtórzeń (klawisze: x20)")
+    parser.add_argument("-o", "--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="porównaj z zapisanym punktem odniesienia")
+    parser.add_argument("--save-baseline", help="zapisz wyniki jako punkt odniesienia")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="dopuszczalne spowolnienie mediany (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    tmp = tempfile.mkdtemp(prefix="oksfordos-bench-")
+    os.environ["QT_QPA_PLATFORM"] = "offscreen"
+    os.environ["XDG_CONFIG_HOME"] = os.path.join(tmp, "config")
+    os.environ["XDG_DATA_HOME"] = os.path.join(tmp, "data")
+    os.environ.pop("OKSFORDOS_LATENCY", None)
+    sys.path.insert(0, HERE)
+
+    from PyQt5.QtCore import QT_VERSION_STR
+    from PyQt5.QtWidgets import QApplication
+
+    app = QApplication(sys.argv[:1])
+    ctx = Context(app, tmp)
+
+    results = {}
+    try:
+        for name in args.only or BENCHMARKS:
+            print(f"... {name}", file=sys.stderr, flush=True)
+            results.update(BENCHMARKS[name](ctx, args.repeat))
+    finally:
+        ctx.close()
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "qt": QT_VERSION_STR,
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "seed": SEED,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    rows, regressions = compare(results, baseline, args.tolerance)
+    print(f"{'Pomiar':<36} {'mediana':>10} {'bazowo':>10} {'zmiana':>8}")
+    for name, median, base, ratio, flag in rows:
+        unit = results[name]["unit"]
+        base_text = f"{base:.2f}" if base is not None else "-"
+        ratio_text = f"{(ratio - 1) * 100:+.0f}%" if ratio is not None else ""
+        print(f"{name:<36} {median:>7.2f} {unit:<2} {base_text:>10} {ratio_text:>8} {flag}")
+    print(f"Wyniki: {args.output}")
+    if regressions:
+        print(f"Regresje ponad {args.tolerance:.0%}: {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
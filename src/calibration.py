@@ -0,0 +1,257 @@
+"""Judge calibration: bias, spread and agreement of judges who scored the same rounds.
+
+    python calibration.py sezon/ -o sedziowie.csv --normalized znormalizowane.csv
+
+A judge is taken from the optional "sedzia" key of a session, or else from the name of
+the directory the file is in (one directory per judge). Sessions are matched into the
+same round by the teza together with the optional "runda" key; the GUI does not write
+"runda", so without it the file name stands for the room:
+
+    sezon/kowalski/r1-sala2.json  and  sezon/nowak/r1-sala2.json  ->  one panel
+
+A second session of the same judge in the same round is left out and reported.
+"""
+import argparse
+import csv
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from session_io import SCORE_RANGE, SessionFormatError, collect_session_files, load_session_from_json
+
+BATCH_ELEMENTS = 4_000_000  # górna granica rozmiaru tensora B x J x J x S w jednej paczce
+
+
+def _judge_and_room(data, path):
+    # Klucze dopisywane przez organizatorów - session_io ich nie zna, więc sprawdzamy je tu
+    judge, room = data.get("sedzia", ""), data.get("runda", "")
+    if not isinstance(judge, str):
+        raise SessionFormatError("oczekiwano tekstu", "sedzia")
+    if not isinstance(room, (str, int)) or isinstance(room, bool):
+        raise SessionFormatError("oczekiwano tekstu lub numeru rundy", "runda")
+    judge = judge or os.path.basename(os.path.dirname(os.path.abspath(path)))
+    room = str(room).strip() or os.path.splitext(os.path.basename(path))[0]
+    return judge, room
+
+
+def _read_scored_session(path):
+    """(path, judge, round key, punkty), or an error message for a file that cannot be read."""
+    try:
+        data = load_session_from_json(path)
+        judge, room = _judge_and_room(data, path)
+    except (OSError, SessionFormatError) as e:
+        return str(e)
+    round_key = (room, " ".join(data.get("teza", "").lower().split()))
+    return path, judge, round_key, data["punkty"]
+
+
+class Panel:
+    """Rounds scored by more than one judge, as a G x J x S array with NaN where a judge
+    did not sit on the panel."""
+
+    def __init__(self, judges, rounds, scores, files, skipped=()):
+        self.judges = judges  # J nazw
+        self.rounds = rounds  # G kluczy (runda, teza)
+        self.scores = scores  # G x J x S
+        self.files = files  # {(g, j): ścieżka}
+        self.skipped = list(skipped)  # (plik, powód)
+
+
+def load_panels(paths, workers=None):
+    files = collect_session_files(paths)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        entries = list(pool.map(_read_scored_session, files, chunksize=64))
+
+    by_round = {}
+    skipped = []
+    for path, entry in zip(files, entries):
+        if isinstance(entry, str):
+            skipped.append((path, entry))
+            continue
+        _, judge, round_key, punkty = entry
+        panel = by_round.setdefault(round_key, {})
+        if judge in panel:
+            # Ten sam sędzia dwa razy w jednej rundzie - liczymy tylko pierwszą ocenę
+            skipped.append((path, f"sędzia {judge} ocenił już tę rundę w {panel[judge][0]}"))
+            continue
+        panel[judge] = (path, punkty)
+    # Tylko rundy z co najmniej dwoma sędziami i jednakową liczbą mówców
+    shared = {
+        key: panel
+        for key, panel in by_round.items()
+        if len(panel) >= 2 and len({len(p) for _, p in panel.values()}) == 1
+    }
+    if not shared:
+        return Panel([], [], np.zeros((0, 0, 0)), {}, skipped)
+    slots = max(len(p) for panel in shared.values() for _, p in panel.values())
+    shared = {k: v for k, v in shared.items() if len(next(iter(v.values()))[1]) == slots}
+
+    judges = sorted({judge for panel in shared.values() for judge in panel})
+    judge_index = {judge: j for j, judge in enumerate(judges)}
+    rounds = sorted(shared)
+    scores = np.full((len(rounds), len(judges), slots), np.nan)
+    panel_files = {}
+    for g, key in enumerate(rounds):
+        for judge, (path, punkty) in shared[key].items():
+            j = judge_index[judge]
+            scores[g, j] = punkty
+            panel_files[(g, j)] = path
+    return Panel(judges, rounds, scores, panel_files, skipped)
+
+
+def judge_statistics(scores, batch_rounds=None):
+    """Per-judge calibration over a G x J x S score array (NaN = not on the panel).
+
+    Each judge is compared with the leave-one-out consensus of the rest of the panel:
+    bias is the mean signed difference, residual_var the variance left after removing
+    it, agreement the mean Pearson correlation with the consensus across speakers.
+    Also returns mean pairwise absolute difference and correlation between judges.
+    Rounds are processed in batches so memory stays bounded for a whole season.
+    """
+    G, J, S = scores.shape
+    if batch_rounds is None:
+        batch_rounds = max(1, BATCH_ELEMENTS // max(1, J * J * S))
+
+    n_scores = np.zeros(J)
+    sum_x = np.zeros(J)
+    sum_x2 = np.zeros(J)
+    n_diff = np.zeros(J)
+    sum_d = np.zeros(J)
+    sum_d2 = np.zeros(J)
+    corr_sum = np.zeros(J)
+    corr_n = np.zeros(J)
+    pair_abs = np.zeros((J, J))
+    pair_corr = np.zeros((J, J))
+    pair_n = np.zeros((J, J))
+
+    for start in range(0, G, batch_rounds):
+        x = scores[start:start + batch_rounds]  # B x J x S
+        present = ~np.isnan(x[:, :, 0])  # B x J
+        xz = np.where(np.isnan(x), 0.0, x)
+        count = present.sum(axis=1)  # B
+
+        n_scores += present.sum(axis=0) * S
+        sum_x += xz.sum(axis=(0, 2))
+        sum_x2 += (xz * xz).sum(axis=(0, 2))
+
+        # Konsensus bez danego sędziego (leave-one-out)
+        total = xz.sum(axis=1, keepdims=True)  # B x 1 x S
+        others = np.maximum(count - 1, 1)[:, None, None]
+        loo = (total - xz) / others
+        valid = present & (count[:, None] >= 2)  # B x J
+        d = np.where(valid[:, :, None], xz - loo, 0.0)
+        n_diff += valid.sum(axis=0) * S
+        sum_d += d.sum(axis=(0, 2))
+        sum_d2 += (d * d).sum(axis=(0, 2))
+
+        xc = xz - xz.mean(axis=2, keepdims=True)
+        lc = loo - loo.mean(axis=2, keepdims=True)
+        num = (xc * lc).sum(axis=2)
+        den = np.sqrt((xc * xc).sum(axis=2) * (lc * lc).sum(axis=2))
+        ok = valid & (den > 0)
+        corr_sum += np.where(ok, num / np.where(den > 0, den, 1.0), 0.0).sum(axis=0)
+        corr_n += ok.sum(axis=0)
+
+        # Pary sędziów w tej samej rundzie
+        both = present[:, :, None] & present[:, None, :]  # B x J x J
+        diff = np.abs(xz[:, :, None, :] - xz[:, None, :, :]).mean(axis=3)
+        pair_abs += np.where(both, diff, 0.0).sum(axis=0)
+        cov = np.einsum("bjs,bks->bjk", xc, xc)
+        norm = np.sqrt(np.einsum("bjs,bjs->bj", xc, xc))
+        nn = norm[:, :, None] * norm[:, None, :]
+        pok = both & (nn > 0)
+        pair_corr += np.where(pok, cov / np.where(nn > 0, nn, 1.0), 0.0).sum(axis=0)
+        pair_n += pok.sum(axis=0)
+
+    mean = sum_x / np.maximum(n_scores, 1)
+    bias = sum_d / np.maximum(n_diff, 1)
+    off_diagonal = ~np.eye(J, dtype=bool)
+    pairs = pair_n * off_diagonal
+    return {
+        "rounds": n_scores / max(S, 1),
+        "mean": mean,
+        "std": np.sqrt(np.maximum(sum_x2 / np.maximum(n_scores, 1) - mean * mean, 0.0)),
+        "bias": bias,
+        "residual_var": np.maximum(sum_d2 / np.maximum(n_diff, 1) - bias * bias, 0.0),
+        "agreement": np.where(corr_n > 0, corr_sum / np.maximum(corr_n, 1), np.nan),
+        "pair_abs_diff": np.where(pairs > 0, pair_abs / np.maximum(pair_n, 1), np.nan),
+        "pair_corr": np.where(pairs > 0, pair_corr / np.maximum(pair_n, 1), np.nan),
+        "mean_abs_diff": float(pair_abs[off_diagonal].sum() / max(pairs.sum(), 1)),
+        "mean_corr": float(pair_corr[off_diagonal].sum() / max(pairs.sum(), 1)),
+    }
+
+
+def normalized_scores(scores, stats):
+    """Scores mapped onto the season-wide scale: each judge's z-scores rescaled to the
+    mean and spread of all judges together, clipped to the score range."""
+    present = ~np.isnan(scores)
+    global_mean = np.nanmean(scores)
+    global_std = np.nanstd(scores)
+    std = np.where(stats["std"] > 0, stats["std"], 1.0)
+    z = (scores - stats["mean"][None, :, None]) / std[None, :, None]
+    low, high = SCORE_RANGE
+    return np.where(present, np.clip(global_mean + global_std * z, low, high), np.nan)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kalibracja sędziów OksfordOS")
+    parser.add_argument("paths", nargs="+", help="pliki .json lub katalogi (jeden katalog na sędziego)")
+    parser.add_argument("-o", "--output", help="statystyki sędziów do CSV")
+    parser.add_argument("--normalized", help="znormalizowane punkty każdej sesji do CSV")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="liczba procesów do wczytywania")
+    args = parser.parse_args(argv)
+
+    panel = load_panels(args.paths, args.jobs)
+    for path, reason in panel.skipped:
+        print(f"Pominięto {path}: {reason}", file=sys.stderr)
+    if not panel.rounds:
+        print("Brak rund ocenianych przez więcej niż jednego sędziego.", file=sys.stderr)
+        return 1
+
+    stats = judge_statistics(panel.scores)
+    rows = [
+        {
+            "sedzia": judge,
+            "rundy": int(stats["rounds"][j]),
+            "srednia": round(float(stats["mean"][j]), 3),
+            "odchylenie": round(float(stats["std"][j]), 3),
+            "bias": round(float(stats["bias"][j]), 3),
+            "wariancja_reszt": round(float(stats["residual_var"][j]), 3),
+            "zgodnosc": round(float(stats["agreement"][j]), 3),
+        }
+        for j, judge in enumerate(panel.judges)
+    ]
+    rows.sort(key=lambda r: r["bias"])
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+            writer.writeheader()
+            writer.writerows(rows)
+
+    if args.normalized:
+        normalized = normalized_scores(panel.scores, stats)
+        with open(args.normalized, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["plik", "sedzia"] + [f"punkty_{i + 1}" for i in range(panel.scores.shape[2])])
+            for (g, j), path in sorted(panel.files.items()):
+                writer.writerow([path, panel.judges[j]] + [f"{v:.2f}" for v in normalized[g, j]])
+
+    print(
+        f"Rundy z panelem: {len(panel.rounds)}, sędziowie: {len(panel.judges)}, "
+        f"średnia różnica między sędziami: {stats['mean_abs_diff']:.2f} pkt, "
+        f"średnia korelacja: {stats['mean_corr']:.2f}"
+    )
+    print(f"{'Sędzia':<20} {'Rundy':>5} {'Bias':>6} {'Odch.':>6} {'Zgodność':>8}")
+    for row in rows:
+        print(
+            f"{row['sedzia']:<20} {row['rundy']:>5} {row['bias']:>+6.2f} "
+            f"{row['odchylenie']:>6.2f} {row['zgodnosc']:>8.2f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
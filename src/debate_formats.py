@@ -0,0 +1,156 @@
+"""Debate formats: who speaks, for which side, for how long and with how many questions.
+
+Speeches are listed in speaking order, which is also the order of "speakers" in a
+session file. Scores ("punkty") are grouped by side in the order of ``sides``, each
+side's speakers in speaking order; for the Oxford format that is the long-standing
+Pro 1..4, Opo 1..4. A session file names its format in "format"; files without it are
+Oxford debates. Each speech also carries its timing profile (timer_engine.SpeechTiming):
+the speaking time, the protected time at both ends and the grace period after zero.
+"""
+from collections import namedtuple
+
+from session_io import SPEAKER_FIELDS, SessionFormatError
+from timer_engine import SpeechTiming
+
+# side - indeks w DebateFormat.sides; label - krótka nazwa (kolumna punktacji, raport);
+# title - nagłówek panelu mówcy; questions - ile pól pytań (0-2, jak w SPEAKER_FIELDS);
+# protected, grace - sekundy czasu chronionego (z każdego końca) i doliczonego
+Speech = namedtuple("Speech", "side label title seconds questions protected grace", defaults=(0, 0))
+
+MAX_QUESTIONS = len(SPEAKER_FIELDS) - 1
+
+
+class DebateFormat:
+    def __init__(self, key, name, sides, speeches):
+        self.key = key
+        self.name = name
+        self.sides = tuple(sides)
+        self.speeches = tuple(speeches)
+        if any(not 0 <= s.questions <= MAX_QUESTIONS for s in self.speeches):
+            raise ValueError(f"{key}: najwyżej {MAX_QUESTIONS} pytania na mówcę")
+        self.score_order = tuple(
+            i for side in range(len(self.sides)) for i, s in enumerate(self.speeches) if s.side == side
+        )
+
+    def __repr__(self):
+        return f"DebateFormat({self.key!r})"
+
+    @property
+    def speaker_count(self):
+        return len(self.speeches)
+
+    @property
+    def score_count(self):
+        return len(self.score_order)
+
+    def speaker_label(self, index):
+        return self.speeches[index].label
+
+    def score_label(self, column):
+        return self.speeches[self.score_order[column]].label
+
+    def score_column(self, index):
+        """Column in "punkty" of the speaker at ``index``."""
+        return self.score_order.index(index)
+
+    def timing(self, index):
+        speech = self.speeches[index]
+        return SpeechTiming(speech.seconds, speech.protected, speech.grace)
+
+
+def _oxford(replies=False):
+    speeches = []
+    for n in range(1, 5):
+        speeches.append(Speech(0, f"Pro {n}", f"Mówca {n} (Propozycja)", 240, 2, 30, 15))
+        speeches.append(Speech(1, f"Opo {n}", f"Mówca {n} (Opozycja)", 240, 2, 30, 15))
+    if not replies:
+        return DebateFormat("oksfordzki", "Oksfordzki (4 na 4)", ("Propozycja", "Opozycja"), speeches)
+    # Repliki bez pytań - chronione w całości
+    speeches.append(Speech(1, "Opo R", "Replika (Opozycja)", 120, 0, 60, 10))
+    speeches.append(Speech(0, "Pro R", "Replika (Propozycja)", 120, 0, 60, 10))
+    return DebateFormat("oksfordzki_repliki", "Oksfordzki z replikami", ("Propozycja", "Opozycja"), speeches)
+
+
+def _world_schools():
+    speeches = []
+    for n in range(1, 4):
+        speeches.append(Speech(0, f"Pro {n}", f"Mówca {n} (Propozycja)", 480, 2, 60, 20))
+        speeches.append(Speech(1, f"Opo {n}", f"Mówca {n} (Opozycja)", 480, 2, 60, 20))
+    # Repliki: najpierw opozycja, bez pytań
+    speeches.append(Speech(1, "Opo R", "Replika (Opozycja)", 240, 0, 120, 20))
+    speeches.append(Speech(0, "Pro R", "Replika (Propozycja)", 240, 0, 120, 20))
+    return DebateFormat("world_schools", "World Schools (3 na 3 + repliki)", ("Propozycja", "Opozycja"), speeches)
+
+
+def _british():
+    benches = (("RO", "Rząd otwierający"), ("OO", "Opozycja otwierająca"),
+               ("RZ", "Rząd zamykający"), ("OZ", "Opozycja zamykająca"))
+    speeches = []
+    for pair in ((0, 1), (2, 3)):
+        for n in (1, 2):
+            for side in pair:
+                short, name = benches[side]
+                speeches.append(Speech(side, f"{short} {n}", f"Mówca {n} ({name})", 420, 2, 60, 15))
+    return DebateFormat("brytyjski", "Brytyjski (4 ławy)", [name for _, name in benches], speeches)
+
+
+def speech_mapping(old, new):
+    """{index in ``old``: index in ``new``} of speeches both formats have - same side, same label."""
+    positions = {(s.side, s.label): i for i, s in enumerate(new.speeches)}
+    mapping = {}
+    for i, speech in enumerate(old.speeches):
+        j = positions.get((speech.side, speech.label))
+        if j is not None:
+            mapping[i] = j
+    return mapping
+
+
+FORMATS = {fmt.key: fmt for fmt in (_oxford(), _oxford(replies=True), _world_schools(), _british())}
+DEFAULT_FORMAT = "oksfordzki"
+
+
+def get_format(key):
+    """The format called ``key``, or the default one for unknown keys (e.g. from old settings)."""
+    return FORMATS.get(key) or FORMATS[DEFAULT_FORMAT]
+
+
+def format_for_session(data):
+    """The format of a validated session dict; raises SessionFormatError when it does not fit."""
+    key = data.get("format", DEFAULT_FORMAT)
+    fmt = FORMATS.get(key)
+    if fmt is None:
+        raise SessionFormatError(f"nieznany format debaty: {key}", "format")
+    if len(data["speakers"]) != fmt.speaker_count:
+        raise SessionFormatError(
+            f"format {fmt.name}: oczekiwano {fmt.speaker_count} mówców, jest {len(data['speakers'])}", "speakers"
+        )
+    if len(data["punkty"]) > fmt.score_count:
+        raise SessionFormatError(
+            f"format {fmt.name}: maksymalnie {fmt.score_count} wyników, jest {len(data['punkty'])}", "punkty"
+        )
+    return fmt
+
+
+def _oxford_labels(speakers, punkty):
+    """Labels for any number of speakers and scores: sections go Pro 1, Opo 1, Pro 2, ...,
+    scores Pro 1..n, then Opo 1..n."""
+    half = max(1, punkty // 2)  # sesja z jednym wynikiem też przechodzi walidację
+    return (
+        [f"{'Pro' if i % 2 == 0 else 'Opo'} {i // 2 + 1}" for i in range(speakers)],
+        [f"{'Pro' if i < half else 'Opo'} {i % half + 1}" for i in range(punkty)],
+    )
+
+
+def session_labels(data):
+    """(speaker labels, score labels) of a session dict. Files without a format, or that do
+    not fit the one they name, keep the Oxford labels they always had."""
+    speakers, punkty = len(data["speakers"]), len(data["punkty"])
+    fmt = None
+    if "format" in data:
+        try:
+            fmt = format_for_session(data)
+        except SessionFormatError:
+            pass
+    if fmt is None:
+        return _oxford_labels(speakers, punkty)
+    return [fmt.speaker_label(i) for i in range(speakers)], [fmt.score_label(i) for i in range(punkty)]
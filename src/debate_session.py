@@ -0,0 +1,136 @@
+"""Session state without Qt: the texts, scores, teza and speech times of one debate.
+
+Text fields live in fixed slots addressed by field id ("speakers/3/info", "ad_vocem/1",
+"notatnik" - the same ids the autosave journal uses). The GUI binds every editor to its
+slot and pushes each edit as a splice, so the model always holds the current text and
+snapshot() never has to walk the widgets. "czasy" holds how long each speech actually
+ran (seconds, in speaking order; 0 = not timed). Batch tools can use it directly:
+
+    session = DebateSession.from_dict(load_session_from_json("runda1.json"))
+    session.splice("notatnik", 0, 0, "Uwagi: ")
+"""
+from types import MappingProxyType
+
+from session_io import SESSION_VERSION, SPEAKER_FIELDS
+
+
+def speaker_field(index, name):
+    return f"speakers/{index}/{name}"
+
+
+class DebateSession:
+    __slots__ = (
+        "speaker_count", "debate_format", "fields", "_slots", "_texts", "punkty", "teza", "czasy", "revision",
+        "_snapshot",
+    )
+
+    def __init__(self, speaker_count=8, score_count=8, debate_format=None):
+        self.speaker_count = speaker_count
+        self.debate_format = debate_format  # klucz z debate_formats.FORMATS; None = bez pola "format"
+        self.fields = tuple(
+            speaker_field(i, name) for i in range(speaker_count) for name in SPEAKER_FIELDS
+        ) + ("ad_vocem/0", "ad_vocem/1", "notatnik")
+        self._slots = {field: slot for slot, field in enumerate(self.fields)}
+        self._texts = [""] * len(self.fields)
+        self.punkty = [0] * score_count
+        self.teza = ""
+        self.czasy = [0.0] * speaker_count
+        self.revision = 0  # rośnie przy każdej zmianie; migawka jest ważna dla jednej rewizji
+        self._snapshot = None
+
+    @classmethod
+    def from_dict(cls, data):
+        """A model sized to a validated session dict (the save_session_to_json layout)."""
+        session = cls(len(data["speakers"]), len(data["punkty"]), data.get("format"))
+        session.load(data)
+        return session
+
+    @property
+    def score_count(self):
+        return len(self.punkty)
+
+    def slot(self, field):
+        return self._slots[field]
+
+    def text(self, field):
+        return self._texts[self._slots[field]]
+
+    def set_text(self, field, text):
+        slot = self._slots[field]
+        if self._texts[slot] != text:
+            self._texts[slot] = text
+            self._changed()
+
+    def splice(self, field, position, removed, added):
+        """Replace ``removed`` characters at ``position`` with ``added`` (one editor edit)."""
+        slot = self._slots[field]
+        text = self._texts[slot]
+        self._texts[slot] = text[:position] + added + text[position + removed:]
+        self._changed()
+
+    def set_score(self, index, value):
+        if self.punkty[index] != value:
+            self.punkty[index] = value
+            self._changed()
+
+    def set_teza(self, teza):
+        if self.teza != teza:
+            self.teza = teza
+            self._changed()
+
+    def set_time(self, index, seconds):
+        """Record how long speech ``index`` ran; returns True when the record changed."""
+        seconds = round(seconds, 1)  # dziesiąte części sekundy wystarczą, a plik zostaje zwięzły
+        if self.czasy[index] == seconds:
+            return False
+        self.czasy[index] = seconds
+        self._changed()
+        return True
+
+    def _changed(self):
+        self.revision += 1
+        self._snapshot = None
+
+    def load(self, data):
+        """Replace the whole state with a validated session dict; missing speakers stay empty."""
+        speakers = data["speakers"]
+        for i in range(self.speaker_count):
+            speaker = speakers[i] if i < len(speakers) else {}
+            for name in SPEAKER_FIELDS:
+                self._texts[self._slots[speaker_field(i, name)]] = speaker.get(name, "")
+        self._texts[self._slots["ad_vocem/0"]] = data["ad_vocem"][0]
+        self._texts[self._slots["ad_vocem/1"]] = data["ad_vocem"][1]
+        self._texts[self._slots["notatnik"]] = data.get("notatnik", "")
+        punkty = list(data["punkty"])[:self.score_count]
+        self.punkty = punkty + [0] * (self.score_count - len(punkty))
+        self.teza = data.get("teza", "")
+        czasy = [float(t) for t in data.get("czasy", ())][:self.speaker_count]
+        self.czasy = czasy + [0.0] * (self.speaker_count - len(czasy))
+        self.debate_format = data.get("format", self.debate_format)
+        self._changed()
+
+    def snapshot(self):
+        """The session as plain strings, ints and tuples, safe to hand to another thread.
+
+        Strings are shared, not copied, and the result is reused until the next change.
+        """
+        if self._snapshot is None:
+            texts = self._texts
+            self._snapshot = {
+                "version": SESSION_VERSION,
+                "speakers": tuple(
+                    MappingProxyType(
+                        {name: texts[self._slots[speaker_field(i, name)]] for name in SPEAKER_FIELDS}
+                    )
+                    for i in range(self.speaker_count)
+                ),
+                "ad_vocem": (texts[self._slots["ad_vocem/0"]], texts[self._slots["ad_vocem/1"]]),
+                "notatnik": texts[self._slots["notatnik"]],
+                "teza": self.teza,
+                "punkty": tuple(self.punkty),
+            }
+            if self.debate_format is not None:
+                self._snapshot["format"] = self.debate_format
+            if any(self.czasy):
+                self._snapshot["czasy"] = tuple(self.czasy)
+        return self._snapshot
@@ -0,0 +1,157 @@
+"""Opt-in hot-path instrumentation (OKSFORDOS_PROFILE): a fixed-size ring buffer of events.
+
+    OKSFORDOS_PROFILE=1 python oksfordos.py              # zrzut do katalogu danych aplikacji
+    OKSFORDOS_PROFILE=profil.json python oksfordos.py    # zrzut do wskazanego pliku
+    python instrumentation.py profil.json                # podsumowanie zrzutu
+
+Each event is (monotonic time, kind, name, value in ms, current speaker). Kinds: "stall"
+(event loop blocked longer than expected), "tick" (timer wakeup later than scheduled),
+"shortcut" (handler run time) and "relayout" (editor height change; value = measure
+time). When the variable is unset PROBE is None and call sites skip everything.
+"""
+import json
+import os
+import sys
+import time
+from array import array
+from collections import Counter
+
+from debate_formats import get_format
+
+KINDS = ("stall", "tick", "shortcut", "relayout")
+_KIND_IDS = {kind: i for i, kind in enumerate(KINDS)}
+CAPACITY = 16384
+
+
+class Probe:
+    def __init__(self, capacity=CAPACITY):
+        self.capacity = capacity
+        # Kolumny w tablicach o stałym rozmiarze - zero alokacji na zdarzenie
+        self._time = array("d", bytes(8 * capacity))
+        self._value = array("d", bytes(8 * capacity))
+        self._kind = array("B", bytes(capacity))
+        self._name = array("H", bytes(2 * capacity))
+        self._speaker = array("b", bytes(capacity))
+        self._name_ids = {}
+        self._names = []
+        self._written = 0
+        self.counts = Counter()  # (rodzaj, nazwa) -> liczba zdarzeń od startu, także tych nadpisanych
+        self.speaker = -1
+        self.format = None  # klucz formatu debaty - podpisy mówców w podsumowaniu zrzutu
+        self.started = time.monotonic()
+
+    def record(self, kind, name, value):
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = self._name_ids[name] = len(self._names)
+            self._names.append(name)
+        i = self._written % self.capacity
+        self._time[i] = time.monotonic()
+        self._value[i] = value
+        self._kind[i] = _KIND_IDS[kind]
+        self._name[i] = name_id
+        self._speaker[i] = self.speaker
+        self._written += 1
+        self.counts[(kind, name)] += 1
+
+    def timed(self, kind, name, fn):
+        """fn wrapped so each call is recorded with its duration."""
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.record(kind, name, (time.perf_counter() - start) * 1000)
+
+        return wrapper
+
+    def records(self, since=None):
+        """Events still in the buffer, oldest first, as (t, kind, name, value_ms, speaker)."""
+        count = min(self._written, self.capacity)
+        start = self._written - count
+        for n in range(start, self._written):
+            i = n % self.capacity
+            t = self._time[i]
+            if since is not None and t < since:
+                continue
+            yield t - self.started, KINDS[self._kind[i]], self._names[self._name[i]], self._value[i], self._speaker[i]
+
+    def summary(self, since=None):
+        groups = {}
+        for _, kind, name, value, _ in self.records(since):
+            groups.setdefault((kind, name), []).append(value)
+        result = {}
+        for (kind, name), values in sorted(groups.items()):
+            values.sort()
+            result[f"{kind}:{name}"] = {
+                "count": len(values),
+                "total": self.counts[(kind, name)],
+                "p50": round(values[len(values) // 2], 3),
+                "p95": round(values[min(len(values) - 1, int(0.95 * len(values)))], 3),
+                "max": round(values[-1], 3),
+            }
+        return result
+
+    def overlay_text(self, window=10.0):
+        """A few lines for the debug overlay: the last `window` seconds."""
+        summary = self.summary(since=time.monotonic() - window)
+        stalls = summary.get("stall:event_loop")
+        ticks = summary.get("tick:timer_qt")
+        shortcuts = [(v["max"], k.split(":", 1)[1]) for k, v in summary.items() if k.startswith("shortcut:")]
+        relayouts = sum(v["count"] for k, v in summary.items() if k.startswith("relayout:"))
+        lines = [
+            f"zacięcia: {stalls['count']}, max {stalls['max']:.0f} ms" if stalls else "zacięcia: 0",
+            f"tick: p95 {ticks['p95']:.1f} ms, max {ticks['max']:.1f} ms" if ticks else "tick: -",
+            f"skrót: {max(shortcuts)[1]} {max(shortcuts)[0]:.1f} ms" if shortcuts else "skrót: -",
+            f"relayout: {relayouts}",
+        ]
+        return "\n".join(lines)
+
+    def dump(self, path):
+        data = {
+            "uptime_s": round(time.monotonic() - self.started, 3),
+            "capacity": self.capacity,
+            "recorded": self._written,
+            "format": self.format,
+            "summary": self.summary(),
+            "fields": ["t_s", "kind", "name", "value_ms", "speaker"],
+            "records": [
+                [round(t, 4), kind, name, round(value, 3), speaker] for t, kind, name, value, speaker in self.records()
+            ],
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        return path
+
+
+def dump_target():
+    value = os.environ.get("OKSFORDOS_PROFILE", "")
+    return None if value in ("", "0", "1") else value
+
+
+PROBE = Probe() if os.environ.get("OKSFORDOS_PROFILE", "0") != "0" else None
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        print("Użycie: python instrumentation.py profil.json", file=sys.stderr)
+        return 2
+    with open(argv[0], encoding="utf-8") as f:
+        data = json.load(f)
+    print(f"Czas działania {data['uptime_s']:.0f} s, zdarzeń {data['recorded']} (w buforze {len(data['records'])})")
+    print(f"{'Zdarzenie':<40} {'ile':>6} {'p50':>8} {'p95':>8} {'max':>8}")
+    for key, s in data["summary"].items():
+        print(f"{key:<40} {s['total']:>6} {s['p50']:>8.2f} {s['p95']:>8.2f} {s['max']:>8.2f}")
+    worst = sorted((r for r in data["records"] if r[1] == "stall"), key=lambda r: -r[3])[:10]
+    fmt = get_format(data.get("format"))  # zrzuty bez formatu są z debat oksfordzkich
+    labels = [fmt.speaker_label(i) for i in range(fmt.speaker_count)]
+    if worst:
+        print("Najdłuższe zacięcia (czas od startu, mówca):")
+        for t, _, _, value, speaker in worst:
+            print(f"  {t:>9.1f} s  {value:>7.0f} ms  {labels[speaker] if 0 <= speaker < len(labels) else '-'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,322 @@
+"""LAN sync between OksfordOS instances on one judging panel.
+
+One instance is the chair; followers send it pings over UDP, the chair answers each
+with its monotonic clock and pushes its state (timers, teza, speaker) whenever it
+changes, plus a heartbeat every second so a lost datagram is repaired quickly.
+Followers estimate the offset to the chair's clock from the ping with the smallest
+round trip (as in NTP) and translate timer timestamps into their own clock.
+
+    python lan_sync.py chair --port 47800
+    python lan_sync.py follow 192.168.1.10:47800
+    python lan_sync.py check --followers 4     # chair + followers as local processes
+"""
+import argparse
+import json
+import os
+import select
+import socket
+import sys
+import threading
+import time
+from collections import deque
+
+DEFAULT_PORT = 47800
+PROTOCOL = 1
+HEARTBEAT = 1.0
+FOLLOWER_TIMEOUT = 10.0
+PING_FAST = 0.2  # pierwsze próbki szybko, żeby offset był znany od razu
+PING_SLOW = 3.0
+OFFSET_SAMPLES = 16
+MAX_DATAGRAM = 65507
+
+
+def parse_address(text, default_port=DEFAULT_PORT):
+    """"host:port", "host" or ":port" -> (host, port); raises ValueError for a bad port."""
+    text = text.strip()
+    host, colon, port = text.rpartition(":")
+    if not colon:
+        return text, default_port
+    return host, int(port) if port else default_port
+
+
+def _encode(message):
+    message["v"] = PROTOCOL
+    return json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _decode(data):
+    try:
+        message = json.loads(data.decode("utf-8"))
+    except (UnicodeDecodeError, ValueError):
+        return None
+    if not isinstance(message, dict) or message.get("v") != PROTOCOL:
+        return None
+    return message
+
+
+class _Peer:
+    def __init__(self, sock):
+        self._sock = sock
+        self._sock.setblocking(False)
+        self._closed = threading.Event()
+        self._wake_r, self._wake_w = socket.socketpair()  # close() budzi select od razu
+        self._thread = threading.Thread(target=self._run, name=type(self).__name__, daemon=True)
+
+    def _send(self, message, address=None):
+        try:
+            if address is None:
+                self._sock.send(_encode(message))
+            else:
+                self._sock.sendto(_encode(message), address)
+        except OSError:
+            pass  # UDP: zgubiony pakiet naprawi heartbeat albo kolejny ping
+
+    def _run(self):
+        next_tick = time.monotonic()
+        while not self._closed.is_set():
+            timeout = max(0.0, next_tick - time.monotonic())
+            ready, _, _ = select.select([self._sock, self._wake_r], [], [], timeout)
+            if self._closed.is_set():
+                break
+            if self._sock in ready:
+                try:
+                    data, address = self._sock.recvfrom(MAX_DATAGRAM)
+                except OSError:
+                    continue  # np. ICMP port unreachable, gdy drugiej strony jeszcze nie ma
+                message = _decode(data)
+                if message is not None:
+                    self._handle(message, address, time.monotonic())
+            if time.monotonic() >= next_tick:
+                next_tick = time.monotonic() + self._tick()
+
+    def close(self):
+        self._closed.set()
+        self._wake_w.send(b"\0")
+        self._thread.join(1.0)
+        for sock in (self._sock, self._wake_r, self._wake_w):
+            sock.close()
+
+
+class SyncChair(_Peer):
+    """Leads the panel. publish() only stores the state and sends one datagram per
+    follower on a non-blocking socket, so it is safe to call from the GUI thread."""
+
+    def __init__(self, port=DEFAULT_PORT, host="0.0.0.0"):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((host, port))
+        super().__init__(sock)
+        self.port = sock.getsockname()[1]
+        self._lock = threading.Lock()
+        self._followers = {}  # adres -> ostatni kontakt
+        self._state = None
+        self._seq = 0
+        self._thread.start()
+
+    @property
+    def followers(self):
+        with self._lock:
+            return list(self._followers)
+
+    def publish(self, state):
+        """state: {"timers": {nazwa: {running, remaining, duration, grace, overtime, t}}, "teza": ...,
+        "speaker": ..., "speech": ...} with t taken from time.monotonic() of this process."""
+        with self._lock:
+            self._seq += 1
+            self._state = dict(state, type="state", seq=self._seq)
+            followers = list(self._followers)
+        for address in followers:
+            self._send(dict(self._state, sent=time.monotonic()), address)
+
+    def _handle(self, message, address, now):
+        kind = message.get("type")
+        if kind == "ping":
+            with self._lock:
+                new = address not in self._followers
+                self._followers[address] = now
+                state = self._state
+            self._send({"type": "pong", "t0": message.get("t0"), "t1": time.monotonic()}, address)
+            if new and state is not None:
+                self._send(dict(state, sent=time.monotonic()), address)
+        elif kind == "bye":
+            with self._lock:
+                self._followers.pop(address, None)
+
+    def _tick(self):
+        now = time.monotonic()
+        with self._lock:
+            self._followers = {a: seen for a, seen in self._followers.items() if now - seen < FOLLOWER_TIMEOUT}
+            followers = list(self._followers)
+            state = self._state
+        if state is not None:
+            for address in followers:
+                self._send(dict(state, sent=time.monotonic()), address)
+        return HEARTBEAT
+
+
+class SyncFollower(_Peer):
+    """Follows a chair. on_state(state) is called from the network thread with every state,
+    heartbeats repeating the last seq included; timer timestamps in it are
+    already converted to this process's time.monotonic(), "offset" is the estimate used
+    (None while only the one-way guess from the datagram itself is available)."""
+
+    def __init__(self, chair_address, on_state):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.connect(chair_address)
+        super().__init__(sock)
+        self.chair_address = chair_address
+        self.on_state = on_state
+        self._samples = deque(maxlen=OFFSET_SAMPLES)  # (rtt, offset)
+        self._pings = 0
+        self.last_contact = None
+        self._thread.start()
+
+    @property
+    def offset(self):
+        """Chair clock minus local clock, or None before the first pong."""
+        if not self._samples:
+            return None
+        return min(self._samples)[1]
+
+    @property
+    def rtt(self):
+        return min(self._samples)[0] if self._samples else None
+
+    def _tick(self):
+        self._pings += 1
+        self._send({"type": "ping", "t0": time.monotonic()})
+        return PING_FAST if self._pings < 5 else PING_SLOW
+
+    def _handle(self, message, address, now):
+        self.last_contact = now
+        kind = message.get("type")
+        if kind == "pong":
+            t0, t1 = message.get("t0"), message.get("t1")
+            if isinstance(t0, (int, float)) and isinstance(t1, (int, float)):
+                self._samples.append((now - t0, t1 - (t0 + now) / 2))
+        elif kind == "state":
+            # Heartbeat z tym samym seq też stosujemy: stan jest idempotentny, a po pierwszych
+            # pongach przeliczamy go z lepszym offsetem niż zgadnięty z samego datagramu
+            estimate = self.offset
+            offset = estimate
+            if offset is None:
+                offset = message.get("sent", now) - now  # bez korekty opóźnienia sieci
+            timers = {
+                name: dict(timer, t=timer["t"] - offset)
+                for name, timer in message.get("timers", {}).items()
+                if isinstance(timer, dict) and isinstance(timer.get("t"), (int, float))
+            }
+            self.on_state(dict(message, timers=timers, offset=estimate))
+
+    def close(self):
+        self._send({"type": "bye"})
+        super().close()
+
+
+def _run_chair(args):
+    chair = SyncChair(args.port)
+    print(f"Przewodniczący na porcie {chair.port}", flush=True)
+    duration = args.duration
+    started = time.monotonic()
+    try:
+        while True:
+            # Demonstracyjnie: timer startuje od nowa co `duration` sekund
+            now = time.monotonic()
+            chair.publish({
+                "timers": {"main": {"running": True, "remaining": duration - (now - started) % duration,
+                                    "duration": duration, "t": now}},
+                "teza": args.teza,
+                "speaker": int((now - started) // duration) % 8,
+            })
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        chair.close()
+    return 0
+
+
+def _run_follower(args):
+    def on_state(state):
+        timer = state["timers"].get("main")
+        if timer is None:
+            return
+        now = time.monotonic()
+        remaining = timer["remaining"] - (now - timer["t"] if timer["running"] else 0.0)
+        offset = state["offset"]
+        latency = now - (state["sent"] - offset) if offset is not None else None
+        print(json.dumps({"seq": state["seq"], "remaining": remaining, "speaker": state.get("speaker"),
+                          "offset": offset, "latency": latency}), flush=True)
+
+    follower = SyncFollower(parse_address(args.address), on_state)
+    try:
+        while True:
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        follower.close()
+    return 0
+
+
+def _run_check(args):
+    """Chair and followers as separate local processes; on one machine the true offset is 0,
+    so the estimated offset is itself the sync error."""
+    import statistics
+    import subprocess  # tylko dla tej próby - aplikacja wczytuje lan_sync bez nich
+
+    script = os.path.abspath(__file__)
+    chair = subprocess.Popen(
+        [sys.executable, script, "chair", "--port", str(args.port), "--interval", "0.25"],
+        stdout=subprocess.PIPE, text=True,
+    )
+    chair.stdout.readline()
+    followers = [
+        subprocess.Popen([sys.executable, script, "follow", f"127.0.0.1:{args.port}"],
+                         stdout=subprocess.PIPE, text=True)
+        for _ in range(args.followers)
+    ]
+    time.sleep(args.seconds)
+    for p in followers + [chair]:
+        p.terminate()
+    offsets, latencies, counts = [], [], []
+    for p in followers:
+        out, _ = p.communicate()
+        rows = [json.loads(line) for line in out.splitlines() if line.startswith("{")]
+        counts.append(len(rows))
+        rows = [r for r in rows if r["offset"] is not None]
+        if rows:
+            offsets.append(abs(rows[-1]["offset"]))
+            latencies.extend(r["latency"] for r in rows)
+    chair.wait()
+    if not latencies or len(offsets) < args.followers:
+        print("Nie wszyscy członkowie panelu odebrali stan.", file=sys.stderr)
+        return 1
+    print(
+        f"{args.followers} członków panelu, stanów na członka: {min(counts)}-{max(counts)}\n"
+        f"błąd offsetu zegara max {max(offsets) * 1000:.3f} ms; "
+        f"opóźnienie stanu p50 {statistics.median(latencies) * 1000:.2f} ms, max {max(latencies) * 1000:.2f} ms"
+    )
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Synchronizacja OksfordOS w sieci lokalnej")
+    sub = parser.add_subparsers(dest="command", required=True)
+    chair = sub.add_parser("chair", help="prowadź panel (demonstracyjny timer)")
+    chair.add_argument("--port", type=int, default=DEFAULT_PORT)
+    chair.add_argument("--duration", type=float, default=240.0)
+    chair.add_argument("--interval", type=float, default=5.0, help="co ile sekund publikować stan")
+    chair.add_argument("--teza", default="")
+    follow = sub.add_parser("follow", help="śledź przewodniczącego i wypisuj stan")
+    follow.add_argument("address", help="host:port przewodniczącego")
+    check = sub.add_parser("check", help="przewodniczący i członkowie panelu jako lokalne procesy")
+    check.add_argument("--followers", type=int, default=3)
+    check.add_argument("--port", type=int, default=DEFAULT_PORT)
+    check.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args(argv)
+    return {"chair": _run_chair, "follow": _run_follower, "check": _run_check}[args.command](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
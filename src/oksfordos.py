@@ -1,7 +1,14 @@
+import time
+
+_PROCESS_START = time.perf_counter()  # dla OKSFORDOS_STARTUP_TIME - przed importem Qt
+
 import sys
 import os
+import re
+import threading
 from PyQt5.QtWidgets import (
     QApplication,
+    QCheckBox,
     QComboBox,
     QDialog,
     QGroupBox,
@@ -22,16 +29,24 @@ from PyQt5.QtWidgets import (
     QTableWidget,
     QHeaderView,
     QFileDialog,
+    QMessageBox,
+    QListWidget,
+    QListWidgetItem,
 )
-from PyQt5.QtCore import QTimeZone, Qt, QTimer, QSettings
-from PyQt5.QtGui import QFont, QKeySequence, QFontMetrics, QIcon
+from PyQt5.QtCore import QTimeZone, Qt, QTimer, QSettings, QObject, QCoreApplication, QThread, QStandardPaths, QLockFile, pyqtSignal
+from PyQt5.QtGui import QFont, QKeySequence, QFontMetrics, QIcon, QTextCursor
 import json
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
+from timer_engine import CountdownClock, next_wakeup, speech_phase
+
+from session_io import SPEAKER_FIELDS, SessionFormatError, save_session_to_json, load_session_from_json
+from debate_session import DebateSession, speaker_field
+from debate_formats import DEFAULT_FORMAT, FORMATS, format_for_session, get_format, speech_mapping
+from session_journal import SessionJournal
+from annotation_log import AnnotationLog, annotation_path
+from instrumentation import PROBE, dump_target
 
 
 def resource_path(relative_path):
@@ -54,6 +69,109 @@ def apply_theme(app, theme="Ciemny"):
         app.setStyleSheet(f.read())
 
 
+class SettingsStore(QObject):
+    """Typed, in-memory view of QSettings; writes are batched and flushed off the GUI thread."""
+
+    DEFAULTS = {
+        "teza": "",
+        "theme": "Jasny",
+        "main_minutes": 4,
+        "main_seconds": 0,
+        # Czasy wystąpień z formatu debaty zamiast main_minutes/main_seconds; kto ma zapisany
+        # własny czas timera (sprzed tej opcji), zostaje przy nim - patrz __init__
+        "format_timing": True,
+        "ad_seconds": 30,
+        "broadcast_url": "",
+        "broadcast_key": "",
+        "sync_mode": "",
+        "sync_address": "",
+        "debate_format": DEFAULT_FORMAT,
+    }
+    FLUSH_DELAY_MS = 500
+
+    valueChanged = pyqtSignal(str, object)
+
+    def __init__(self, organization="OksfordOS", application="DebateJudgeApp", parent=None):
+        super().__init__(parent)
+        self._org = organization
+        self._app = application
+        self._values = {}
+        self._dirty = {}
+        self._writer = ThreadPoolExecutor(max_workers=1)  # jeden wątek = zapisy po kolei
+
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.timeout.connect(self.flush)
+
+        qs = QSettings(self._org, self._app)
+        defaults = dict(self.DEFAULTS)
+        if not qs.contains("format_timing") and (qs.contains("main_minutes") or qs.contains("main_seconds")):
+            defaults["format_timing"] = False
+        for key, default in defaults.items():
+            self._values[key] = self._coerce(key, qs.value(key, default))
+
+    def _coerce(self, key, value):
+        default = self.DEFAULTS.get(key)
+        if default is None:
+            return value
+        if isinstance(default, bool):
+            # QSettings potrafi zwrócić "true"/"false" jako tekst
+            return value in (True, 1, "true", "1")
+        try:
+            return type(default)(value)
+        except (TypeError, ValueError):
+            return default
+
+    def get(self, key):
+        return self._values.get(key, self.DEFAULTS.get(key))
+
+    def set(self, key, value):
+        value = self._coerce(key, value)
+        if self._values.get(key) == value:
+            return
+        self._values[key] = value
+        self._dirty[key] = value
+        self._flush_timer.start(self.FLUSH_DELAY_MS)
+        self.valueChanged.emit(key, value)
+
+    def update(self, values):
+        for key, value in values.items():
+            self.set(key, value)
+
+    def flush(self, wait=False):
+        self._flush_timer.stop()
+        if self._dirty:
+            batch, self._dirty = self._dirty, {}
+            future = self._writer.submit(self._write_batch, batch)
+            if wait:
+                future.result()
+
+    def _write_batch(self, batch):
+        # QSettings jest reentrant - osobna instancja w wątku zapisu
+        qs = QSettings(self._org, self._app)
+        for key, value in batch.items():
+            qs.setValue(key, value)
+        qs.sync()
+
+    def close(self):
+        self.flush(wait=True)
+        self._writer.shutdown(wait=True)
+
+
+_settings_store = None
+_ASTRAL = re.compile("[\U00010000-\U0010FFFF]")  # znaki spoza BMP: w Qt dwie jednostki UTF-16, w Pythonie jeden
+
+
+def settings_store():
+    global _settings_store
+    if _settings_store is None:
+        _settings_store = SettingsStore()
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(_settings_store.close)
+    return _settings_store
+
+
 class ClickableTezaLabel(QStackedWidget):
     """Switches between a label and a line edit on click for inline teza editing."""
     def __init__(self, parent=None):
@@ -98,9 +216,7 @@ class ClickableTezaLabel(QStackedWidget):
         display = new_text if new_text else "Kliknij aby wpisać tezę debaty"
         self.label.setText(f"Teza: {display}" if new_text else display)
         self.setCurrentWidget(self.label)
-        # Save to QSettings
-        settings = QSettings("OksfordOS", "DebateJudgeApp")
-        settings.setValue("teza", new_text)
+        settings_store().set("teza", new_text)
 
     def keyPressEvent(self, event):
         if event.key() == Qt.Key_Escape and self.currentWidget() == self.editor:  # type: ignore
@@ -110,11 +226,21 @@ class ClickableTezaLabel(QStackedWidget):
 
 
 class AutoResizingTextEdit(QTextEdit):
-    def __init__(self, *args, **kwargs):
+    RESIZE_IMMEDIATE = "immediate"
+    RESIZE_DEFERRED = "deferred"  # max raz na klatkę, niezależnie od liczby zmian
+    FRAME_MS = 16
+
+    # (pozycja, usunięte znaki, wstawiony tekst) - dla dziennika autozapisu
+    contentsEdited = pyqtSignal(int, int, str)
+
+    # OKSFORDOS_LATENCY=1 - zbieranie czasu klawisz -> odrysowanie
+    measure_latency = bool(os.environ.get("OKSFORDOS_LATENCY"))
+    latency_samples = deque(maxlen=2000)
+
+    def __init__(self, *args, resize_mode=RESIZE_DEFERRED, **kwargs):
         super().__init__(*args, **kwargs)
         TypingFont = QFont("Arial", 11)  # czcionka pisana
         self.setFont(TypingFont)
-        self.textChanged.connect(self.resize_for_content)
         self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)  # type: ignore
         self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.MinimumExpanding)
         self.setMinimumHeight(40)
@@ -123,23 +249,136 @@ class AutoResizingTextEdit(QTextEdit):
         fontmetrics = QFontMetrics(self.font())
         self.setTabStopDistance(fontmetrics.width(" ") * 5)  # Tab = 4 spacje
 
+        self.resize_mode = resize_mode
+        self._applied_height = None
+        self._key_pressed_at = None
+        # Kopia tekstu trzymana tylko, gdy są w nim znaki spoza BMP - do przeliczania pozycji UTF-16
+        self._wide_text = None
+
+        self._resize_timer = QTimer(self)
+        self._resize_timer.setSingleShot(True)
+        self._resize_timer.timeout.connect(self.resize_for_content)
+
+        self.document().contentsChange.connect(self._emit_contents_edited)  # type: ignore
+
+        if resize_mode == self.RESIZE_IMMEDIATE:
+            self.textChanged.connect(self.resize_for_content)
+        else:
+            self.document().contentsChange.connect(self.schedule_resize)  # type: ignore
+
     def resize_for_content(self):
         doc = self.document()
         if doc is None:
             return
-        doc_height = doc.size().height()
+        if PROBE is not None:
+            start = time.perf_counter()
+            height = doc.size().height()
+            PROBE.record("relayout", "full", (time.perf_counter() - start) * 1000)
+        else:
+            height = doc.size().height()
+        self._set_content_height(height)
+
+    def load_text(self, text):
+        """setPlainText without emitting signals; call resize_for_content once the batch is done."""
+        if self.toPlainText() == text:
+            return
+        self.blockSignals(True)
+        try:
+            self.setPlainText(text)
+        finally:
+            self.blockSignals(False)
+        self._wide_text = text if _ASTRAL.search(text) else None
+        self._resize_timer.stop()
+
+    def _emit_contents_edited(self, position, removed, added):
+        """contentsChange in Python string positions: Qt counts UTF-16 units, so an emoji is two."""
+        doc = self.document()
+        # Qt przy zmianach całego dokumentu liczy też końcowy separator bloku
+        added = max(0, min(added, doc.characterCount() - 1 - position))  # type: ignore
+        cursor = QTextCursor(doc)
+        cursor.setPosition(position)
+        cursor.setPosition(position + added, QTextCursor.KeepAnchor)
+        text = cursor.selectedText().replace("\u2029", "\n")
+        old = self._wide_text
+        if old is not None:
+            units = old.encode("utf-16-le")
+            start = len(units[:2 * position].decode("utf-16-le"))
+            removed = len(units[:2 * (position + removed)].decode("utf-16-le")) - start
+            position = start
+            new = old[:position] + text + old[position + removed:]
+            self._wide_text = new if _ASTRAL.search(new) else None
+        elif _ASTRAL.search(text):
+            # Dotąd bez znaków spoza BMP - ta zmiana ma jeszcze zwykłe pozycje
+            self._wide_text = self.toPlainText()
+        self.contentsEdited.emit(position, removed, text)
+
+    def _set_content_height(self, doc_height):
         h = max(40, min(int(doc_height) + 12, self.max_height))
+        if h == self._applied_height:
+            return  # bez zmiany wysokości nie ruszamy layoutu
+        self._applied_height = h
         self.setMinimumHeight(h)
         self.updateGeometry()
+        if PROBE is not None:
+            PROBE.record("relayout", "geometry", 0.0)
+
+    def schedule_resize(self):
+        if not self._resize_timer.isActive():
+            self._resize_timer.start(self.FRAME_MS)
+
+    def apply_pending_resize(self):
+        """Run a queued resize now instead of on the next frame."""
+        if self._resize_timer.isActive():
+            self._resize_timer.stop()
+            self.resize_for_content()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if event.oldSize().width() != event.size().width():
+            # Inna szerokość = inne zawijanie wierszy
+            if self.resize_mode == self.RESIZE_DEFERRED:
+                self.schedule_resize()
+            else:
+                self.resize_for_content()
+
+    def keyPressEvent(self, event):
+        if self.measure_latency and self._key_pressed_at is None:
+            self._key_pressed_at = time.perf_counter()
+        super().keyPressEvent(event)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self._key_pressed_at is not None:
+            self.latency_samples.append(time.perf_counter() - self._key_pressed_at)
+            self._key_pressed_at = None
+
+    @classmethod
+    def latency_report(cls):
+        """Keystroke-to-paint latency in ms: count, median, p95 and max."""
+        samples = sorted(cls.latency_samples)
+        if not samples:
+            return {"count": 0}
+
+        def pct(q):
+            return samples[min(len(samples) - 1, int(q * len(samples)))] * 1000
+
+        return {
+            "count": len(samples),
+            "median_ms": pct(0.5),
+            "p95_ms": pct(0.95),
+            "max_ms": samples[-1] * 1000,
+        }
 
 
 # Sekcja Ustawień
 class SettingsDialog(QDialog):
+    SYNC_MODES = [("Wyłączona", ""), ("Przewodniczący", "chair"), ("Członek panelu", "follower")]
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setModal(True)
         self.setWindowTitle("Ustawienia")
-        self.setFixedSize(400, 400)
+        self.setFixedSize(400, 670)
 
         layout = QVBoxLayout()
 
@@ -154,15 +393,21 @@ class SettingsDialog(QDialog):
 
         # Main Timer
         main_timer_group = QGroupBox("Czas głównego timera")
-        main_timer_layout = QHBoxLayout()
+        main_timer_layout = QVBoxLayout()
+        self.format_timing_check = QCheckBox("Według formatu debaty (czas każdego wystąpienia)")
+        main_time_layout = QHBoxLayout()
         self.main_timer_minutes = QSpinBox()
         self.main_timer_minutes.setRange(0, 99)
         self.main_timer_seconds = QSpinBox()
         self.main_timer_seconds.setRange(0, 59)
-        main_timer_layout.addWidget(QLabel("Min:"))
-        main_timer_layout.addWidget(self.main_timer_minutes)
-        main_timer_layout.addWidget(QLabel("Sek:"))
-        main_timer_layout.addWidget(self.main_timer_seconds)
+        main_time_layout.addWidget(QLabel("Min:"))
+        main_time_layout.addWidget(self.main_timer_minutes)
+        main_time_layout.addWidget(QLabel("Sek:"))
+        main_time_layout.addWidget(self.main_timer_seconds)
+        self.format_timing_check.toggled.connect(self.main_timer_minutes.setDisabled)
+        self.format_timing_check.toggled.connect(self.main_timer_seconds.setDisabled)
+        main_timer_layout.addWidget(self.format_timing_check)
+        main_timer_layout.addLayout(main_time_layout)
         main_timer_group.setLayout(main_timer_layout)
         layout.addWidget(main_timer_group)
 
@@ -196,22 +441,59 @@ class SettingsDialog(QDialog):
         theme_group.setLayout(theme_layout)
         layout.addWidget(theme_group)
 
-        self.settings = QSettings("OksfordOS", "DebateJudgeApp")
-
-        teza = self.settings.value("teza", "")
-        self.teza_edit.setPlainText(teza)
-
-        current_theme = self.settings.value("theme", "Jasny")
-        self.theme_combo.setCurrentText(current_theme)
+        # Format debaty: liczba mówców, strony, czasy wystąpień, pytania
+        format_group = QGroupBox("Format debaty")
+        format_layout = QHBoxLayout()
+        self.format_combo = QComboBox()
+        for fmt in FORMATS.values():
+            self.format_combo.addItem(fmt.name, fmt.key)
+        format_layout.addWidget(self.format_combo)
+        format_group.setLayout(format_layout)
+        layout.addWidget(format_group)
+
+        # Transmisja timera do OksfordOS-web (timer.html?room=...)
+        broadcast_group = QGroupBox("Transmisja timera")
+        broadcast_layout = QVBoxLayout()
+        self.broadcast_url_edit = QLineEdit()
+        self.broadcast_url_edit.setPlaceholderText("http://serwer:8000/api/rooms/sala1")
+        self.broadcast_key_edit = QLineEdit()
+        self.broadcast_key_edit.setPlaceholderText("Klucz (opcjonalnie)")
+        self.broadcast_key_edit.setEchoMode(QLineEdit.Password)
+        broadcast_layout.addWidget(self.broadcast_url_edit)
+        broadcast_layout.addWidget(self.broadcast_key_edit)
+        broadcast_group.setLayout(broadcast_layout)
+        layout.addWidget(broadcast_group)
+
+        # Synchronizacja timerów i tezy między sędziami panelu
+        sync_group = QGroupBox("Synchronizacja panelu (LAN)")
+        sync_layout = QHBoxLayout()
+        self.sync_mode_combo = QComboBox()
+        for label, mode in self.SYNC_MODES:
+            self.sync_mode_combo.addItem(label, mode)
+        self.sync_address_edit = QLineEdit()
+        from lan_sync import DEFAULT_PORT
+
+        self.sync_address_edit.setPlaceholderText(f"host:{DEFAULT_PORT}")
+        sync_layout.addWidget(self.sync_mode_combo)
+        sync_layout.addWidget(self.sync_address_edit)
+        sync_group.setLayout(sync_layout)
+        layout.addWidget(sync_group)
+
+        self.settings = settings_store()
+
+        self.teza_edit.setPlainText(self.settings.get("teza"))
+        self.theme_combo.setCurrentText(self.settings.get("theme"))
 
         # Load defaults
-        self.settings = QSettings("OksfordOS", "DebateJudgeApp")
-        m = int(self.settings.value("main_minutes", 4))
-        s = int(self.settings.value("main_seconds", 0))
-        ads = int(self.settings.value("ad_seconds", 30))
-        self.main_timer_minutes.setValue(m)
-        self.main_timer_seconds.setValue(s)
-        self.ad_timer_seconds.setValue(ads)
+        self.main_timer_minutes.setValue(self.settings.get("main_minutes"))
+        self.main_timer_seconds.setValue(self.settings.get("main_seconds"))
+        self.format_timing_check.setChecked(self.settings.get("format_timing"))
+        self.ad_timer_seconds.setValue(self.settings.get("ad_seconds"))
+        self.broadcast_url_edit.setText(self.settings.get("broadcast_url"))
+        self.broadcast_key_edit.setText(self.settings.get("broadcast_key"))
+        self.sync_mode_combo.setCurrentIndex(max(0, self.sync_mode_combo.findData(self.settings.get("sync_mode"))))
+        self.sync_address_edit.setText(self.settings.get("sync_address"))
+        self.format_combo.setCurrentIndex(max(0, self.format_combo.findData(self.settings.get("debate_format"))))
 
         # Save button
         save_btn = QPushButton("Zapisz i zamknij")
@@ -221,76 +503,89 @@ class SettingsDialog(QDialog):
         self.setLayout(layout)
 
     def save_settings(self):
-        teza = self.teza_edit.toPlainText()
-        self.settings.setValue("teza", teza)
-        theme = self.theme_combo.currentText()
-        self.settings.setValue("theme", theme)
-        m = self.main_timer_minutes.value()
-        s = self.main_timer_seconds.value()
-        ads = self.ad_timer_seconds.value()
-        self.settings.setValue("main_minutes", m)
-        self.settings.setValue("main_seconds", s)
-        self.settings.setValue("ad_seconds", ads)
+        self.settings.update(
+            {
+                "teza": self.teza_edit.toPlainText(),
+                "theme": self.theme_combo.currentText(),
+                "main_minutes": self.main_timer_minutes.value(),
+                "main_seconds": self.main_timer_seconds.value(),
+                "format_timing": self.format_timing_check.isChecked(),
+                "ad_seconds": self.ad_timer_seconds.value(),
+                "broadcast_key": self.broadcast_key_edit.text().strip(),
+                "broadcast_url": self.broadcast_url_edit.text().strip(),
+                "sync_address": self.sync_address_edit.text().strip(),
+                "sync_mode": self.sync_mode_combo.currentData(),
+                "debate_format": self.format_combo.currentData(),
+            }
+        )
         self.accept()  # zamyka dialog
 
 
 class SpeakerSection(QWidget):
-    def __init__(self, speaker_num, side):
+    """Panel of one speech. Until build() it is only a header of the panel's minimum height;
+    the editors are created when the panel is first visited or scrolled into view."""
+
+    MIN_HEIGHT = 105  # tyle ma zbudowany panel z pustymi polami - zaślepka nie skacze po zbudowaniu
+
+    def __init__(self, title, questions=2):
         super().__init__()
-        self.speaker_num = speaker_num
-        self.side = side
-        self.init_ui()
+        self.title = title
+        self.questions = questions
+        self.built = False
+        self.info_text = None
+        self.question_edits = []
 
-    def init_ui(self):
         layout = QVBoxLayout()
-        header = QLabel(f"Mówca {self.speaker_num} ({self.side})")
+        header = QLabel(title)
         header.setAlignment(Qt.AlignCenter)  # type: ignore
         header_font = QFont("Arial", 14, QFont.Bold)
         header.setFont(header_font)
         layout.addWidget(header)
+        self.setLayout(layout)
+        self.setMinimumHeight(self.MIN_HEIGHT)
+
+    def build(self):
+        """Create the editors; returns False if they already exist."""
+        if self.built:
+            return False
+        self.built = True
+        layout = self.layout()
 
         self.info_text = AutoResizingTextEdit()
-        self.info_text.setPlaceholderText(
-            f"Informacje mówcy {self.speaker_num} {self.side}"
-        )
+        self.info_text.setPlaceholderText(f"Informacje: {self.title}")
         self.info_text.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         self.info_text.setMinimumHeight(40)
-
-        layout.addWidget(self.info_text)
-
-        questions_group = QGroupBox("Pytania")
-        q_layout = QVBoxLayout()
-
-        self.question1 = AutoResizingTextEdit()
-        self.question1.setPlaceholderText("Pytanie 1")
-        self.question1.setMinimumHeight(60)
-        self.question1.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Minimum)
-
-        self.question2 = AutoResizingTextEdit()
-        self.question2.setPlaceholderText("Pytanie 2")
-        self.question2.setMinimumHeight(60)
-        self.question2.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Minimum)
-
-        self.question1.setVisible(False)
-        self.question2.setVisible(False)
-
-        self.question1.textChanged.connect(self.show_question1)
-        self.question2.textChanged.connect(self.show_question2)
-
-        q_layout.addWidget(self.question1)
-        q_layout.addWidget(self.question2)
-        questions_group.setLayout(q_layout)
-
-        layout.addWidget(questions_group)
-        self.setLayout(layout)
-
-    def show_question1(self):
-        if self.question1.toPlainText().strip():
-            self.question1.setVisible(True)
-
-    def show_question2(self):
-        if self.question2.toPlainText().strip():
-            self.question2.setVisible(True)
+        layout.addWidget(self.info_text)  # type: ignore
+
+        if self.questions:
+            questions_group = QGroupBox("Pytania")
+            q_layout = QVBoxLayout()
+            for n in range(1, self.questions + 1):
+                question = AutoResizingTextEdit()
+                question.setPlaceholderText(f"Pytanie {n}")
+                question.setMinimumHeight(60)
+                question.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Minimum)
+                question.setVisible(False)
+                question.textChanged.connect(lambda question=question: self.show_question(question))
+                q_layout.addWidget(question)
+                self.question_edits.append(question)
+            questions_group.setLayout(q_layout)
+            layout.addWidget(questions_group)  # type: ignore
+        return True
+
+    def editors(self):
+        """Editors in SPEAKER_FIELDS order (empty until build())."""
+        if not self.built:
+            return ()
+        return (self.info_text, *self.question_edits)
+
+    def show_question(self, question):
+        if question.toPlainText().strip():
+            question.setVisible(True)
+
+    def show_questions(self):
+        for question in self.question_edits:
+            self.show_question(question)
 
 
 class AdVocemSection(QWidget):
@@ -305,6 +600,59 @@ class AdVocemSection(QWidget):
         self.setLayout(layout)
 
 
+FieldEntry = namedtuple("FieldEntry", "field editor container speaker section")
+
+
+class FieldRegistry:
+    """Two-way index of the editable fields: field id <-> editor <-> (speaker, section).
+
+    Every lookup is one dict access, so focus shortcuts cost the same however many
+    fields there are. A registered field also gets the separator (Ctrl+Return), the
+    session model binding and autosave without further wiring.
+    """
+
+    def __init__(self):
+        self._by_field = {}
+        self._by_editor = {}
+        self._by_position = {}
+        self._sections = {}  # mówca -> liczba sekcji
+
+    def register(self, field, editor, container=None, speaker=None, section=None):
+        """``container`` is the widget scrolled into view when the field gets focus."""
+        entry = FieldEntry(field, editor, editor if container is None else container, speaker, section)
+        self._by_field[field] = entry
+        self._by_editor[editor] = entry
+        if speaker is not None:
+            self._by_position[(speaker, section)] = entry
+            self._sections[speaker] = max(self._sections.get(speaker, 0), section + 1)
+        return entry
+
+    def discard(self, field):
+        entry = self._by_field.pop(field, None)
+        if entry is None:
+            return
+        del self._by_editor[entry.editor]
+        if entry.speaker is not None:
+            del self._by_position[(entry.speaker, entry.section)]
+            if not any(speaker == entry.speaker for speaker, _ in self._by_position):
+                del self._sections[entry.speaker]
+
+    def __getitem__(self, field):
+        return self._by_field[field]
+
+    def __iter__(self):
+        return iter(self._by_field.values())
+
+    def for_editor(self, widget):
+        return self._by_editor.get(widget)
+
+    def at(self, speaker, section):
+        return self._by_position.get((speaker, section))
+
+    def section_count(self, speaker):
+        return self._sections.get(speaker, 0)
+
+
 class TimerPanel(QWidget):
     def __init__(self):
         super().__init__()
@@ -343,7 +691,7 @@ class TimerPanel(QWidget):
         Ctrl+⏎ – Nowa sekcja<br>
         Ctrl+␣ – Timer<br>
         Alt+␣ – Ad vocem timer<br>
-        Ctrl+1-8 – Mówca<br>
+        Ctrl+1-9 – Mówca<br>
         Ctrl+N - Notatnik<br>
         Ctrl+R - Reset timer<br>
         Alt+R - Reset mini timer<br>
@@ -352,6 +700,7 @@ class TimerPanel(QWidget):
         Ctrl+. - Ustawienia<br>
         Ctrl+S - Zapisz<br>
         Ctrl+O - Otwórz<br>
+        Ctrl+F - Archiwum<br>
         </span>
         """)
 
@@ -360,9 +709,229 @@ class TimerPanel(QWidget):
         shortcuts_label.setWordWrap(True)
         layout.addWidget(shortcuts_label)
 
+        # Nakładka diagnostyczna (OKSFORDOS_PROFILE), Ctrl+Shift+D
+        self.debug_label = QLabel("")
+        self.debug_label.setFont(QFont("Courier New", 9))
+        self.debug_label.setStyleSheet("color: #9a9a9a;")
+        self.debug_label.setVisible(False)
+        layout.addWidget(self.debug_label)
+
         self.setLayout(layout)
 
 
+class StallMonitor(QObject):
+    """Records event-loop stalls: a timer that should fire every INTERVAL_MS and how late it was."""
+
+    INTERVAL_MS = 50
+    THRESHOLD_MS = 30
+
+    def __init__(self, probe, window, parent=None):
+        super().__init__(parent)
+        self.probe = probe
+        self.window = window
+        self._last = time.monotonic()
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.PreciseTimer)  # type: ignore
+        self._timer.timeout.connect(self.check)
+        self._timer.start(self.INTERVAL_MS)
+
+    def check(self):
+        now = time.monotonic()
+        late = (now - self._last) * 1000 - self.INTERVAL_MS
+        self._last = now
+        self.probe.speaker = self.window.current_speaker_index
+        self.probe.format = self.window.format.key
+        if late > self.THRESHOLD_MS:
+            self.probe.record("stall", "event_loop", late)
+
+
+def prewarm_pdf():
+    """Import the PDF stack on a background thread so the first Ctrl+E does not pay for it."""
+
+    def load():
+        import pdf_report
+
+        pdf_report.prepare()  # czcionki i style budują się raz na proces
+
+    threading.Thread(target=load, name="pdf-prewarm", daemon=True).start()
+
+
+class PdfExportWorker(QThread):
+    """Builds the PDF report off the GUI thread from an immutable session snapshot."""
+
+    progress = pyqtSignal(int, str)
+    succeeded = pyqtSignal(str)
+    failed = pyqtSignal(str)
+
+    def __init__(self, filename, snapshot, cache_dir=None, parent=None):
+        super().__init__(parent)
+        self.filename = filename
+        self.snapshot = snapshot
+        self.cache_dir = cache_dir
+
+    def run(self):
+        try:
+            # reportlab ładujemy dopiero przy pierwszym eksporcie (albo wcześniej w prewarm_pdf)
+            from pdf_report import build_session_pdf
+
+            build_session_pdf(self.filename, self.snapshot, progress=self.progress.emit, cache_dir=self.cache_dir)
+        except Exception as e:  # reportlab potrafi rzucić czymkolwiek
+            self.failed.emit(str(e))
+        else:
+            self.succeeded.emit(self.filename)
+
+
+def app_data_path(*parts):
+    base = QStandardPaths.writableLocation(QStandardPaths.AppDataLocation)
+    return os.path.join(base, *parts)
+
+
+class ArchiveIndexWorker(QThread):
+    """Indexes a directory of sessions into the archive; uses its own SQLite connection."""
+
+    progress = pyqtSignal(int, int)
+    done = pyqtSignal(dict)
+    failed = pyqtSignal(str)
+
+    def __init__(self, db_path, paths, parent=None):
+        super().__init__(parent)
+        self.db_path = db_path
+        self.paths = paths
+
+    def run(self):
+        import sqlite3
+
+        from session_archive import SessionArchive
+
+        # Wyjątek kończący wątek bez sygnału zablokowałby przycisk indeksowania
+        try:
+            archive = SessionArchive(self.db_path)
+            try:
+                counts = archive.ingest(self.paths, progress=self.progress.emit)
+            finally:
+                archive.close()
+        except (sqlite3.Error, OSError) as e:
+            self.failed.emit(str(e))
+            return
+        self.done.emit(counts)
+
+
+class LanSyncBridge(QObject):
+    """Carries states from the LAN sync network thread to the GUI thread (queued signal)."""
+
+    stateReceived = pyqtSignal(object)
+
+
+class ArchiveDialog(QDialog):
+    """Full-text search over archived sessions; double click opens the session."""
+
+    SEARCH_DELAY_MS = 150
+
+    def __init__(self, archive, parent=None):
+        super().__init__(parent)
+        self.archive = archive
+        self.setWindowTitle("Archiwum sesji")
+        self.resize(700, 500)
+        self._worker = None
+
+        layout = QVBoxLayout()
+        self.query_edit = QLineEdit()
+        self.query_edit.setPlaceholderText("Szukaj w tezach, notatkach i pytaniach...")
+        layout.addWidget(self.query_edit)
+
+        filters = QHBoxLayout()
+        self.speaker_combo = QComboBox()
+        self.fill_speakers()
+        self.min_score_spin = QSpinBox()
+        self.min_score_spin.setRange(0, 10)
+        self.min_score_spin.setPrefix("min. punkty: ")
+        filters.addWidget(self.speaker_combo)
+        filters.addWidget(self.min_score_spin)
+        layout.addLayout(filters)
+
+        self.results = QListWidget()
+        self.results.itemActivated.connect(self.open_result)
+        layout.addWidget(self.results)
+
+        bottom = QHBoxLayout()
+        self.status_label = QLabel("")
+        index_btn = QPushButton("Dodaj katalog do archiwum...")
+        index_btn.clicked.connect(self.index_directory)
+        bottom.addWidget(self.status_label)
+        bottom.addWidget(index_btn)
+        layout.addLayout(bottom)
+        self.setLayout(layout)
+
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.timeout.connect(self.run_search)
+        self.query_edit.textChanged.connect(lambda: self._search_timer.start(self.SEARCH_DELAY_MS))
+        self.speaker_combo.currentIndexChanged.connect(self.run_search)
+        self.min_score_spin.valueChanged.connect(self.run_search)
+
+    def fill_speakers(self):
+        """Speaker filter from the labels in the archive, in the order the formats list them."""
+        current = self.speaker_combo.currentData()
+        present = set(self.archive.speakers())
+        ordered = list(dict.fromkeys(s.label for fmt in FORMATS.values() for s in fmt.speeches))
+        labels = [label for label in ordered if label in present] + sorted(present.difference(ordered))
+        self.speaker_combo.blockSignals(True)
+        self.speaker_combo.clear()
+        self.speaker_combo.addItem("Wszyscy mówcy", None)
+        for label in labels:
+            self.speaker_combo.addItem(label, label)
+        self.speaker_combo.setCurrentIndex(max(self.speaker_combo.findData(current), 0))
+        self.speaker_combo.blockSignals(False)
+
+    def run_search(self):
+        min_score = self.min_score_spin.value() or None
+        start = time.perf_counter()
+        hits = self.archive.search(
+            self.query_edit.text(), self.speaker_combo.currentData(), min_score, limit=200
+        )
+        elapsed = (time.perf_counter() - start) * 1000
+        self.results.clear()
+        for hit in hits:
+            who = hit["speaker"] or hit["field"]
+            item = QListWidgetItem(f"{os.path.basename(hit['path'])}  [{who}]  {hit['snippet']}")
+            item.setToolTip(f"{hit['path']}\nTeza: {hit['teza']}")
+            item.setData(Qt.UserRole, hit["path"])  # type: ignore
+            self.results.addItem(item)
+        self.status_label.setText(f"{len(hits)} wyników ({elapsed:.0f} ms)")
+
+    def open_result(self, item):
+        self.parent().import_state_from_json(item.data(Qt.UserRole))  # type: ignore
+        self.accept()
+
+    def index_directory(self):
+        if self._worker is not None:
+            return
+        directory = QFileDialog.getExistingDirectory(self, "Katalog z sesjami")
+        if not directory:
+            return
+        self._worker = ArchiveIndexWorker(self.archive.path, [directory], self)
+        self._worker.progress.connect(
+            lambda n, total: self.status_label.setText(f"Indeksowanie {n}/{total}...")
+        )
+        self._worker.done.connect(self.on_indexed)
+        self._worker.failed.connect(self.on_index_failed)
+        self._worker.start()
+
+    def on_indexed(self, counts):
+        self._worker.wait()  # type: ignore
+        self._worker = None
+        self.status_label.setText(
+            f"Nowe: {counts['new']}, zmienione: {counts['updated']}, bez zmian: {counts['unchanged']}"
+        )
+        self.fill_speakers()
+        self.run_search()
+
+    def on_index_failed(self, message):
+        self._worker.wait()  # type: ignore
+        self._worker = None
+        self.status_label.setText(f"Błąd indeksowania: {message}")
+
+
 class DebateJudgeApp(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -371,110 +940,347 @@ class DebateJudgeApp(QMainWindow):
         self.setGeometry(100, 100, 1300, 900)
 
         # Main Timer
-        self.timer_running = False
-        self.timer_seconds_left = 240  # 4:00
+        self.main_clock = CountdownClock(240)  # 4:00
 
         # Ad vocem Timer
-        self.ad_timer_running = False
-        self.ad_timer_seconds_left = 30  # 30s
+        self.ad_clock = CountdownClock(30)  # 30s
+
+        self.settings = settings_store()
+        self.settings.valueChanged.connect(self.on_setting_changed)
+
+        # Stan sesji poza widgetami - edytory i punktacja są do niego podpięte w register_field
+        self.format = get_format(self.settings.get("debate_format"))
+        self.session = DebateSession(self.format.speaker_count, self.format.score_count, self.format.key)
+        self.session.set_teza(self.settings.get("teza"))
+        self.timed_speech = 0  # wystąpienie, którego profil i czas ma główny timer
 
         # Index
         self.current_speaker_index = 0
-        self.current_section_index = 0  # 0=info, 1=question1, 2=question2
+        self.current_section_index = 0  # pozycja w SPEAKER_FIELDS: 0=info, 1=question1, 2=question2
 
-        # Qtimer
+        # Qtimer - jeden wspólny harmonogram dla obu timerów, budzony na zmianę sekundy
         self.timer_qt = QTimer(self)
-        self.timer_qt.timeout.connect(self.update_timer)
-
-        self.ad_timer_qt = QTimer(self)
-        self.ad_timer_qt.timeout.connect(self.update_ad_timer)
+        self.timer_qt.setSingleShot(True)
+        self.timer_qt.setTimerType(Qt.PreciseTimer)  # type: ignore
+        self.timer_qt.timeout.connect(self.on_timer_tick)
+        self._tick_due = None
+
+        self._pdf_worker = None
+        self._archive = None
+
+        self.journal = None
+        self.autosave_lock = None
+        self.annotations = None  # przebieg rundy: każda zmiana notatek z czasem i pozycją timera
+        self._first_paint_at = None
+        self.publisher = None
+        self.lan_sync = None
+        self._sync_bridge = LanSyncBridge(self)
+        self._sync_bridge.stateReceived.connect(self.apply_sync_state)
 
         self.init_ui()
         self.setup_shortcuts()
 
+        if PROBE is not None:
+            self.stall_monitor = StallMonitor(PROBE, self, self)
+            self.debug_timer = QTimer(self)
+            self.debug_timer.timeout.connect(self.update_debug_overlay)
+            self.debug_timer.start(500)
+            self.timer_panel.debug_label.setVisible(True)
+
         self.reset_timer()
         self.reset_ad_timer()
         self.update_timer_label()
         self.update_ad_timer_label()
+        self.configure_broadcast()
+        self.configure_lan_sync()
 
     def open_settings(self):
+        # Zmiany trafiają do nas przez on_setting_changed
         dlg = SettingsDialog(self)
-        if dlg.exec_():
-            self.reload_theme()
-
-    def reload_theme(self):
-        settings = QSettings("OksfordOS", "DebateJudgeApp")
-        theme = settings.value("theme", "Jasny")
-        apply_theme(QApplication.instance(), theme)
-        # Reload timer defaults
-        self.reset_timer()
-        self.reset_ad_timer()
-        teza = settings.value("teza", "")
-        self.teza_label.setText(teza)
+        dlg.exec_()
+
+    def on_setting_changed(self, key, value):
+        if key == "theme":
+            apply_theme(QApplication.instance(), value)
+        elif key in ("main_minutes", "main_seconds", "format_timing"):
+            self.reset_timer()
+        elif key == "ad_seconds":
+            self.reset_ad_timer()
+        elif key == "teza":
+            self.teza_label.setText(value)
+            self.session.set_teza(value)
+            self.publish_sync()
+        elif key in ("broadcast_url", "broadcast_key"):
+            self.configure_broadcast()
+        elif key in ("sync_mode", "sync_address"):
+            self.configure_lan_sync()
+        elif key == "debate_format" and value != self.format.key:
+            fmt = get_format(value)
+            if self.confirm_format_change(fmt):
+                self.apply_format(fmt, carry_over=True)
+            else:
+                self.settings.set("debate_format", self.format.key)
+
+    # Start
+    PREWARM_DELAY_MS = 1500
+
+    def finish_startup(self):
+        if self.journal is not None:
+            return
+        self.setup_autosave()
+        QTimer.singleShot(self.PREWARM_DELAY_MS, prewarm_pdf)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self._first_paint_at is None:
+            self._first_paint_at = time.perf_counter()
+            # Autozapis (i ewentualne odtwarzanie) dopiero po pierwszym odrysowaniu okna
+            QTimer.singleShot(0, self.finish_startup)
+            mode = os.environ.get("OKSFORDOS_STARTUP_TIME")
+            if mode:
+                print(
+                    f"Pierwsze odrysowanie po {(self._first_paint_at - _PROCESS_START) * 1000:.0f} ms "
+                    f"od startu procesu",
+                    file=sys.stderr,
+                )
+                if mode == "exit":
+                    QTimer.singleShot(0, self.close)
 
     # Timer
+    @property
+    def timer_running(self):
+        return self.main_clock.running
+
+    @property
+    def ad_timer_running(self):
+        return self.ad_clock.running
+
+    def schedule_timer_tick(self):
+        now = time.monotonic()
+        delay = next_wakeup((self.main_clock, self.ad_clock), now)
+        if delay is None:
+            self.timer_qt.stop()
+            self._tick_due = None
+            return
+        # +1 ms żeby obudzić się już po zmianie wyświetlanej sekundy
+        interval = int(delay * 1000) + 1
+        self.timer_qt.start(interval)
+        self._tick_due = now + interval / 1000
+
+    def on_timer_tick(self):
+        if PROBE is not None and self._tick_due is not None:
+            PROBE.record("tick", "timer_qt", (time.monotonic() - self._tick_due) * 1000)
+        self.update_timer()
+        self.update_ad_timer()
+        self.schedule_timer_tick()
+
+    def configure_broadcast(self):
+        if self.publisher is not None:
+            self.publisher.close()
+            self.publisher = None
+        url = self.settings.get("broadcast_url")
+        if url:
+            from timer_broadcast import TimerPublisher  # urllib.request (http.client, ssl) dopiero tutaj
+
+            self.publisher = TimerPublisher(url, self.settings.get("broadcast_key") or None)
+            self.broadcast_timer("main")
+            self.broadcast_timer("ad")
+
+    def broadcast_timer(self, timer, reset=False):
+        if self.publisher is not None:
+            clock = self.main_clock if timer == "main" else self.ad_clock
+            self.publisher.publish_clock(timer, clock, reset)
+        self.publish_sync()
+
+    # Synchronizacja panelu
+    def configure_lan_sync(self):
+        if self.lan_sync is not None:
+            self.lan_sync.close()
+            self.lan_sync = None
+        mode = self.settings.get("sync_mode")
+        address = self.settings.get("sync_address")
+        if mode not in ("chair", "follower"):
+            return
+        from lan_sync import SyncChair, SyncFollower, parse_address
+
+        try:
+            if mode == "chair":
+                self.lan_sync = SyncChair(parse_address(address)[1])  # adres przewodniczącego: liczy się port
+                self.publish_sync()
+                self.statusBar().showMessage(f"Przewodniczący panelu, port {self.lan_sync.port}", 5000)
+            elif mode == "follower" and address:
+                self.lan_sync = SyncFollower(parse_address(address), self._sync_bridge.stateReceived.emit)
+                self.statusBar().showMessage(f"Łączenie z przewodniczącym {address}...", 5000)
+        except (OSError, ValueError) as e:
+            self.statusBar().showMessage(f"Synchronizacja niedostępna: {e}", 8000)
+
+    def sync_state(self):
+        now = time.monotonic()
+        return {
+            "timers": {
+                name: {
+                    "running": clock.running,
+                    "remaining": clock.remaining(now),
+                    "duration": clock.duration,
+                    "grace": clock.grace,
+                    "overtime": clock.overtime(now),
+                    "t": now,
+                }
+                for name, clock in (("main", self.main_clock), ("ad", self.ad_clock))
+            },
+            "teza": self.settings.get("teza"),
+            "speaker": self.current_speaker_index,
+            "speech": self.timed_speech,
+        }
+
+    def publish_sync(self):
+        if self.lan_sync is None:
+            return
+        from lan_sync import SyncChair  # moduł już wczytany przez configure_lan_sync
+
+        if isinstance(self.lan_sync, SyncChair):
+            self.lan_sync.publish(self.sync_state())
+
+    def apply_sync_state(self, state):
+        from lan_sync import SyncFollower
+
+        if not isinstance(self.lan_sync, SyncFollower):
+            return  # stan spóźniony po zmianie trybu
+        for name, clock in (("main", self.main_clock), ("ad", self.ad_clock)):
+            timer = state["timers"].get(name)
+            if timer is not None:
+                clock.set_state(
+                    timer["duration"], timer["remaining"], timer["running"], at=timer["t"],
+                    grace=timer.get("grace", 0.0), overtime=timer.get("overtime", 0.0),
+                )
+        # Czas wystąpienia, które mierzy przewodniczący, zapisujemy też u siebie
+        speech = state.get("speech")
+        if isinstance(speech, int) and 0 <= speech < self.format.speaker_count:
+            self.timed_speech = speech
+            self.record_speech_time()
+        self.schedule_timer_tick()
+        self.update_timer()
+        self.update_ad_timer()
+        teza = state.get("teza")
+        if isinstance(teza, str):
+            self.settings.set("teza", teza)
+        # Sam stan, bez focusu - kursor zostaje w polu, w którym sędzia pisze
+        speaker = state.get("speaker")
+        if isinstance(speaker, int) and 0 <= speaker < self.format.speaker_count:
+            if speaker != self.current_speaker_index:
+                self.current_speaker_index = speaker
+                self.current_section_index = 0
+
     def start_timer(self):
         if not self.timer_running:
-            self.timer_qt.start(1000)  # Tick co sekunde
-            self.timer_running = True
+            self.main_clock.start()
+            self.schedule_timer_tick()
+            self.update_timer_label()
+            self.broadcast_timer("main")
 
     def pause_timer(self):
         if self.timer_running:
-            self.timer_qt.stop()
-            self.timer_running = False
+            self.main_clock.pause()
+            self.record_speech_time()
+            self.schedule_timer_tick()
+            self.update_timer_label()
+            self.broadcast_timer("main")
+
+    def speech_timing(self, index):
+        """Timing profile of speech ``index``; without format timing every speech gets the settings
+        time and the clock stops at zero, as it always did."""
+        timing = self.format.timing(index)
+        if not self.settings.get("format_timing"):
+            seconds = self.settings.get("main_minutes") * 60 + self.settings.get("main_seconds")
+            timing = timing._replace(seconds=seconds, grace=0)
+        return timing
+
+    def load_speech_timer(self, index):
+        """Preload the main timer with speech ``index``: its profile, and where it stopped if it was timed."""
+        self.record_speech_time()
+        self.timed_speech = index
+        timing = self.speech_timing(index)
+        self.main_clock.reset(timing.seconds, timing.grace, elapsed=self.session.czasy[index])
+        self.schedule_timer_tick()
+        self.update_timer_label()
+        self.broadcast_timer("main", reset=True)
+
+    def record_speech_time(self):
+        """Store the main timer's elapsed time as the time of the speech it is loaded with.
+
+        A timer standing at zero (just reset, never started) leaves a measured time alone.
+        """
+        elapsed = self.main_clock.elapsed()
+        if self.timed_speech is None or elapsed <= 0:
+            return
+        if self.session.set_time(self.timed_speech, elapsed) and self.journal is not None:
+            self.journal.record_value("czasy", list(self.session.czasy))
 
     def reset_timer(self, seconds=None):
-        if seconds is not None:
-            self.timer_seconds_left = seconds
-        else:
-            settings = QSettings("OksfordOS", "DebateJudgeApp")
-            m = int(settings.value("main_minutes", 4))
-            s = int(settings.value("main_seconds", 0))
-            self.timer_seconds_left = m * 60 + s
-        self.pause_timer()
+        self.record_speech_time()  # przed resetem - po nim zegar stoi na zerze
+        timing = self.speech_timing(self.timed_speech)
+        self.main_clock.reset(timing.seconds if seconds is None else seconds, timing.grace)
+        self.schedule_timer_tick()
         self.update_timer_label()
+        self.broadcast_timer("main", reset=True)
 
     def update_timer(self):
-        if self.timer_seconds_left > 0:
-            self.timer_seconds_left -= 1
-            self.update_timer_label()
-        else:
+        if self.timer_running and self.main_clock.finished():
             self.pause_timer()
             # Jakieś dźwięki, wizualne efekty tutaj można dodać
+        self.update_timer_label()
+
+    PHASE_LABELS = {
+        "protected": "czas chroniony",
+        "open": "pytania dozwolone",
+        "grace": "czas doliczony",
+        "over": "koniec czasu",
+    }
 
     def update_timer_label(self):
-        m, s = divmod(self.timer_seconds_left, 60)
-        self.timer_panel.main_timer_label.setText(f"{m:02}:{s:02}")
+        clock = self.main_clock
+        overtime = clock.display_overtime()
+        if overtime:
+            m, s = divmod(overtime, 60)
+            self.timer_panel.main_timer_label.setText(f"+{m:02}:{s:02}")
+        else:
+            m, s = divmod(clock.display_seconds(), 60)
+            self.timer_panel.main_timer_label.setText(f"{m:02}:{s:02}")
+        text = self.format.speaker_label(self.timed_speech)
+        elapsed = clock.elapsed()
+        if clock.running or elapsed:
+            phase = speech_phase(self.speech_timing(self.timed_speech)._replace(seconds=clock.duration), elapsed)
+            text += "\n" + self.PHASE_LABELS[phase]
+        self.timer_panel.question_timer_label.setText(text)
 
     def start_ad_timer(self):
         if not self.ad_timer_running:
-            self.ad_timer_qt.start(1000)  # Tick co sekunde
-            self.ad_timer_running = True
+            self.ad_clock.start()
+            self.schedule_timer_tick()
+            self.broadcast_timer("ad")
 
     def pause_ad_timer(self):
         if self.ad_timer_running:
-            self.ad_timer_qt.stop()
-            self.ad_timer_running = False
+            self.ad_clock.pause()
+            self.schedule_timer_tick()
+            self.broadcast_timer("ad")
 
     def reset_ad_timer(self, seconds=None):
-        if seconds is not None:
-            self.ad_timer_seconds_left = seconds
-        else:
-            settings = QSettings("OksfordOS", "DebateJudgeApp")
-            self.ad_timer_seconds_left = int(settings.value("ad_seconds", 30))
-        self.pause_ad_timer()
+        if seconds is None:
+            seconds = self.settings.get("ad_seconds")
+        self.ad_clock.reset(seconds)
+        self.schedule_timer_tick()
         self.update_ad_timer_label()
+        self.broadcast_timer("ad", reset=True)
 
     def update_ad_timer(self):
-        if self.ad_timer_seconds_left > 0:
-            self.ad_timer_seconds_left -= 1
-            self.update_ad_timer_label()
-        else:
+        if self.ad_timer_running and self.ad_clock.expired():
             self.pause_ad_timer()
             # Jakieś dźwięki, wizualne efekty tutaj można dodać
+        self.update_ad_timer_label()
 
     def update_ad_timer_label(self):
-        m, s = divmod(self.ad_timer_seconds_left, 60)
+        m, s = divmod(self.ad_clock.display_seconds(), 60)
         self.timer_panel.ad_vocem_timer_label.setText(f"{m:02}:{s:02}")
 
     # GUI
@@ -486,9 +1292,7 @@ class DebateJudgeApp(QMainWindow):
         self.teza_label = ClickableTezaLabel()
         self.teza_label.setFixedHeight(50)
 
-        settings = QSettings("OksfordOS", "DebateJudgeApp")
-        teza = settings.value("teza", "")
-        self.teza_label.setText(teza)
+        self.teza_label.setText(self.settings.get("teza"))
 
         top_layout.addWidget(self.teza_label)
 
@@ -500,18 +1304,10 @@ class DebateJudgeApp(QMainWindow):
         right_container = QWidget()
         right_layout = QVBoxLayout()
 
-        # Grid mówców
+        # Grid mówców - panele budowane leniwie (build_speaker_panels, ensure_speaker)
         self.speaker_grid = QGridLayout()
         self.speakers = []
-
-        for i in range(4):
-            prop = SpeakerSection(i + 1, "Propozycja")
-            opp = SpeakerSection(i + 1, "Opozycja")
-            self.speakers.append(prop)
-            self.speakers.append(opp)
-            self.speaker_grid.addWidget(prop, i, 0)
-            self.speaker_grid.addWidget(opp, i, 1)
-
+        self._unbuilt = set()
         right_layout.addLayout(self.speaker_grid)
 
         # Ad vocem: 2x2 grid
@@ -529,27 +1325,20 @@ class DebateJudgeApp(QMainWindow):
         self.notatnik_box.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         right_layout.addWidget(self.notatnik_box)
 
+        self.fields = FieldRegistry()
+        self.register_field("ad_vocem/0", self.ad_vocem_1.text_edit, self.ad_vocem_1)
+        self.register_field("ad_vocem/1", self.ad_vocem_2.text_edit, self.ad_vocem_2)
+        self.register_field("notatnik", self.notatnik_box)
+
         # Punktacja
         self.scores_group = QGroupBox("Punktacja")
         self.scores_group.setObjectName("scores_group")
         scores_layout = QVBoxLayout()
 
-        speakers_names = [
-            "Pro 1",
-            "Pro 2",
-            "Pro 3",
-            "Pro 4",
-            "Opo 1",
-            "Opo 2",
-            "Opo 3",
-            "Opo 4",
-        ]
-        self.scores_table = QTableWidget(1, 8)
-        self.scores_table.setHorizontalHeaderLabels(speakers_names)
+        self.scores_table = QTableWidget(1, 0)
         self.scores_table.verticalHeader().setVisible(False)  # type: ignore
         header = self.scores_table.horizontalHeader()
-        for i in range(self.scores_table.columnCount()):
-            header.setSectionResizeMode(i, QHeaderView.Stretch)  # type: ignore
+        header.setSectionResizeMode(QHeaderView.Stretch)  # type: ignore
         header.setSectionsMovable(False)  # type: ignore
         header.setSectionsClickable(False)  # type: ignore
         header.setStretchLastSection(True)  # type: ignore
@@ -557,12 +1346,6 @@ class DebateJudgeApp(QMainWindow):
         self.scores_table.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)  # type: ignore
         self.scores_table.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)  # type: ignore
 
-        for i in range(8):
-            spin = QSpinBox()
-            spin.setRange(0, 10)
-            spin.setStyleSheet("QSpinBox {font-size: 18px; min-width: 50px;}")
-            self.scores_table.setCellWidget(0, i, spin)
-
         scores_layout.addWidget(self.scores_table)
         self.scores_group.setLayout(scores_layout)
         right_layout.addWidget(self.scores_group)
@@ -575,6 +1358,17 @@ class DebateJudgeApp(QMainWindow):
         self.scroll_area.setWidget(right_container)
         self.scroll_area.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
 
+        # Panele mówców powstają, gdy wjadą w widok
+        self._build_timer = QTimer(self)
+        self._build_timer.setSingleShot(True)
+        self._build_timer.timeout.connect(self.build_visible_speakers)
+        scroll_bar = self.scroll_area.verticalScrollBar()
+        scroll_bar.valueChanged.connect(lambda _: self._build_timer.start(0))  # type: ignore
+        scroll_bar.rangeChanged.connect(lambda *_: self._build_timer.start(0))  # type: ignore
+
+        self.build_speaker_panels()
+        self.build_scores_table()
+
         top_layout.addWidget(self.teza_label)
         top_layout.addWidget(self.scroll_area)
 
@@ -584,76 +1378,224 @@ class DebateJudgeApp(QMainWindow):
         main_widget.setLayout(main_layout)
         self.setCentralWidget(main_widget)
 
+    # Format debaty
+    def build_speaker_panels(self):
+        """Placeholders for every speech of the current format, one column per side pair."""
+        for section in self.speakers:
+            self.speaker_grid.removeWidget(section)
+            section.deleteLater()
+        for entry in [entry for entry in self.fields if entry.speaker is not None]:
+            self.fields.discard(entry.field)
+        self.speakers = []
+        rows = [0, 0]
+        for speech in self.format.speeches:
+            section = SpeakerSection(speech.title, speech.questions)
+            column = speech.side % 2
+            self.speaker_grid.addWidget(section, rows[column], column)
+            rows[column] += 1
+            self.speakers.append(section)
+        self._unbuilt = set(range(len(self.speakers)))
+        self._build_timer.start(0)
+
+    def build_scores_table(self):
+        table = self.scores_table
+        table.setColumnCount(self.format.score_count)
+        table.setHorizontalHeaderLabels([self.format.score_label(i) for i in range(self.format.score_count)])
+        for i in range(self.format.score_count):
+            spin = QSpinBox()
+            spin.setRange(0, 10)
+            spin.setStyleSheet("QSpinBox {font-size: 18px; min-width: 50px;}")
+            spin.setValue(self.session.punkty[i])
+            spin.valueChanged.connect(lambda value, i=i: self.on_score_changed(i, value))
+            table.setCellWidget(0, i, spin)
+
+    def ensure_speaker(self, index):
+        """Build the panel of speaker ``index`` if it is still a placeholder."""
+        section = self.speakers[index]
+        if section.build():
+            self._unbuilt.discard(index)
+            for n, (name, editor) in enumerate(zip(SPEAKER_FIELDS, section.editors())):
+                field = speaker_field(index, name)
+                editor.load_text(self.session.text(field))
+                self.register_field(field, editor, section, speaker=index, section=n)
+            section.show_questions()
+            for editor in section.editors():
+                editor.resize_for_content()
+        return section
+
+    def build_visible_speakers(self):
+        if not self._unbuilt or not self.scroll_area.isVisible():
+            return
+        self.scroll_area.widget().layout().activate()  # type: ignore  # bez tego geometria sprzed układu
+        viewport = self.scroll_area.viewport()
+        visible = viewport.rect().translated(  # type: ignore
+            self.scroll_area.horizontalScrollBar().value(),  # type: ignore
+            self.scroll_area.verticalScrollBar().value(),  # type: ignore
+        )
+        for index in sorted(self._unbuilt):
+            if self.speakers[index].geometry().intersects(visible):
+                self.ensure_speaker(index)
+
+    def confirm_format_change(self, fmt):
+        """Ask before a format change drops notes or scores of speakers the new format lacks."""
+        kept = speech_mapping(self.format, fmt)
+        lost = [
+            self.format.speaker_label(i)
+            for i in range(self.format.speaker_count)
+            if i not in kept and (
+                any(self.session.text(speaker_field(i, name)) for name in SPEAKER_FIELDS)
+                or self.session.punkty[self.format.score_column(i)]
+            )
+        ]
+        if not lost:
+            return True
+        answer = QMessageBox.question(
+            self,
+            "Zmiana formatu",
+            f"Format {fmt.name} nie ma mówców: {', '.join(lost)}.\n"
+            "Ich notatki i punkty zostaną usunięte. Kontynuować?",
+        )
+        return answer == QMessageBox.Yes
+
+    def apply_format(self, fmt, carry_over=False):
+        """Rebuild speaker panels and the score table for ``fmt``. With ``carry_over`` notes and
+        scores of speeches present in both formats (same side and label) are kept."""
+        old, old_format = self.session_snapshot(), self.format
+        self.format = fmt
+        self.session = DebateSession(fmt.speaker_count, fmt.score_count, fmt.key)
+        self.timed_speech = None  # czas starego formatu jest już w `old`
+        if carry_over:
+            mapping = speech_mapping(old_format, fmt)
+            speakers = [{}] * fmt.speaker_count
+            czasy = [0.0] * fmt.speaker_count
+            punkty = [0] * fmt.score_count
+            old_czasy = old.get("czasy", ())
+            for index, new_index in mapping.items():
+                speakers[new_index] = old["speakers"][index]
+                if index < len(old_czasy):
+                    czasy[new_index] = old_czasy[index]
+            for column, value in enumerate(old["punkty"]):
+                index = old_format.score_order[column]
+                if index in mapping:
+                    punkty[fmt.score_column(mapping[index])] = value
+            self.session.load(dict(old, format=fmt.key, speakers=speakers, punkty=punkty, czasy=czasy))
+        else:
+            self.session.set_teza(old["teza"])
+        self.current_speaker_index = min(self.current_speaker_index, fmt.speaker_count - 1)
+        self.current_section_index = 0
+        self.build_speaker_panels()
+        self.build_scores_table()
+        for field in ("ad_vocem/0", "ad_vocem/1", "notatnik"):
+            self.fields[field].editor.load_text(self.session.text(field))
+            self.fields[field].editor.resize_for_content()
+        self.load_speech_timer(self.current_speaker_index)
+        if self.annotations is not None:
+            self.start_annotation_log()  # inne pola - nowy zapis od stanu po zmianie formatu
+        self.settings.set("debate_format", fmt.key)
+        if self.journal is not None:
+            self.journal.compact(self.session_snapshot())
+        self.publish_sync()
+
+    def add_shortcut(self, key, handler):
+        if PROBE is not None:
+            handler = PROBE.timed("shortcut", key, handler)
+        return QShortcut(QKeySequence(key), self, handler)
+
     def setup_shortcuts(self):
         # Ctrl+l/h - przejścia pomiędzy sekcjami mówcy
-        QShortcut(QKeySequence("Ctrl+l"), self, self.next_section)
-        QShortcut(QKeySequence("Ctrl+h"), self, self.previous_section)
-        QShortcut(QKeySequence("Alt+l"), self, self.next_speaker)
-        QShortcut(QKeySequence("Alt+h"), self, self.previous_speaker)
-        QShortcut(QKeySequence("Ctrl+n"), self, self.focus_notatnik)
-        QShortcut(QKeySequence("Ctrl+Return"), self, self.create_section)
-
-        # Ctrl+1-8 do przeskoku do mówcy
-        for i in range(8):
-            QShortcut(
-                QKeySequence(f"Ctrl+{i + 1}"),
-                self,
-                lambda idx=i: self.jump_to_speaker(idx),
-            )
-        # Alt+A – przejście do Ad Vocem PROPOZYCJA (lewe pole)
-        QShortcut(QKeySequence("Alt+a"), self, self.focus_ad_vocem_proposition)
-        # Alt+Shift+A – przejście do Ad Vocem OPOZYCJI (prawe pole)
-        QShortcut(QKeySequence("Alt+d"), self, self.focus_ad_vocem_opposition)
+        self.add_shortcut("Ctrl+l", self.next_section)
+        self.add_shortcut("Ctrl+h", self.previous_section)
+        self.add_shortcut("Alt+l", self.next_speaker)
+        self.add_shortcut("Alt+h", self.previous_speaker)
+        self.add_shortcut("Ctrl+Return", self.create_section)
+
+        # Ctrl+1-9 do przeskoku do mówcy
+        for i in range(9):
+            self.add_shortcut(f"Ctrl+{i + 1}", lambda idx=i: self.jump_to_speaker(idx))
+        # Ctrl+N - notatnik, Alt+A / Alt+D - Ad Vocem propozycji (lewe pole) / opozycji (prawe)
+        for key, field in (("Ctrl+n", "notatnik"), ("Alt+a", "ad_vocem/0"), ("Alt+d", "ad_vocem/1")):
+            self.add_shortcut(key, lambda field=field: self.focus_field(field))
         # Ctrl+Space - start/stop Main Timer; Ctrl+R - reset Timer
-        QShortcut(QKeySequence("Ctrl+space"), self, self.toggle_timer)
-        QShortcut(QKeySequence("Ctrl+r"), self, lambda: self.reset_timer())
+        self.add_shortcut("Ctrl+space", self.toggle_timer)
+        self.add_shortcut("Ctrl+r", lambda: self.reset_timer())
         # Alt+Space - start/stop Ad-Vocem Timer; Alt+R - reset Ad-Vocem Timer
-        QShortcut(QKeySequence("Alt+space"), self, self.toggle_ad_timer)
-        QShortcut(QKeySequence("Alt+r"), self, lambda: self.reset_ad_timer())
+        self.add_shortcut("Alt+space", self.toggle_ad_timer)
+        self.add_shortcut("Alt+r", lambda: self.reset_ad_timer())
 
         # Ustawienia
-        QShortcut(QKeySequence("Ctrl+."), self, self.open_settings)
+        self.add_shortcut("Ctrl+.", self.open_settings)
         # Zapis i Wczytywanie plików json
-        QShortcut(QKeySequence("Ctrl+S"), self, self.export_current_state)  # Zapis
-        QShortcut(QKeySequence("Ctrl+O"), self, self.import_state_from_json)  # Odczyt
-        QShortcut(QKeySequence("Ctrl+E"), self, self.export_to_pdf)  # Zapis PDF
+        self.add_shortcut("Ctrl+S", self.export_current_state)  # Zapis
+        self.add_shortcut("Ctrl+O", self.import_state_from_json)  # Odczyt
+        self.add_shortcut("Ctrl+E", self.export_to_pdf)  # Zapis PDF
+        self.add_shortcut("Ctrl+F", self.open_archive)  # Archiwum
 
         # Przewijanie
-        QShortcut(
-            QKeySequence("Alt+o"),
-            self,
+        self.add_shortcut(
+            "Alt+o",
             lambda: self.scroll_area.verticalScrollBar().triggerAction(  # type: ignore
                 self.scroll_area.verticalScrollBar().SliderPageStepSub  # type: ignore
             ),
         )
-        QShortcut(
-            QKeySequence("Alt+p"),
-            self,
+        self.add_shortcut(
+            "Alt+p",
             lambda: self.scroll_area.verticalScrollBar().triggerAction(  # type: ignore
                 self.scroll_area.verticalScrollBar().SliderPageStepAdd  # type: ignore
             ),
         )
 
+        # Diagnostyka (tylko z OKSFORDOS_PROFILE)
+        if PROBE is not None:
+            self.add_shortcut("Ctrl+Shift+D", self.toggle_debug_overlay)
+            self.add_shortcut("Ctrl+Shift+P", self.dump_profile)
+
+    def toggle_debug_overlay(self):
+        label = self.timer_panel.debug_label
+        label.setVisible(not label.isVisible())
+        self.update_debug_overlay()
+
+    def update_debug_overlay(self):
+        if self.timer_panel.debug_label.isVisible():
+            self.timer_panel.debug_label.setText(PROBE.overlay_text() + "\nCtrl+Shift+P - zrzut")
+
+    def dump_profile(self):
+        path = dump_target()
+        if path is None:
+            os.makedirs(app_data_path(), exist_ok=True)
+            path = app_data_path(time.strftime("profil-%Y%m%d-%H%M%S.json"))
+        try:
+            PROBE.dump(path)
+        except OSError as e:
+            self.statusBar().showMessage(f"Nie można zapisać profilu: {e}", 8000)  # type: ignore
+            return None
+        self.statusBar().showMessage(f"Zapisano profil: {path}", 5000)  # type: ignore
+        return path
+
+    def focus_field(self, field):
+        entry = self.fields[field]
+        entry.editor.setVisible(True)
+        entry.editor.setFocus()
+        self.ensure_widget_visible(entry.container)
+
     def focus_current_section(self):
-        speaker = self.speakers[self.current_speaker_index]
-        if self.current_section_index == 0:
-            speaker.info_text.setFocus()
-            self.ensure_widget_visible(speaker)
-
-        elif self.current_section_index == 1:
-            speaker.question1.setVisible(True)
-            speaker.question1.setFocus()
-            self.ensure_widget_visible(speaker)
-
-        elif self.current_section_index == 2:
-            if not speaker.question1.toPlainText().strip():
-                self.current_section_index = 1
-                speaker.question1.setFocus()
-                self.ensure_widget_visible(speaker)
-            else:
-                speaker.question2.setVisible(True)
-                speaker.question2.setFocus()
-                self.ensure_widget_visible(speaker)
+        speaker = self.current_speaker_index
+        self.ensure_speaker(speaker)
+        section = self.current_section_index
+        # Kolejne pytanie dopiero, gdy poprzednie ma treść
+        while section > 1 and not self.session.text(self.fields.at(speaker, section - 1).field).strip():
+            section -= 1
+        self.current_section_index = section
+        self.focus_field(self.fields.at(speaker, section).field)
+
+    def follow_focus(self):
+        """Navigation continues from the speaker field that has the cursor, if any."""
+        entry = self.fields.for_editor(QApplication.focusWidget())
+        if entry is None or entry.speaker is None:
+            return
+        self.current_section_index = entry.section
+        if entry.speaker != self.current_speaker_index:
+            self.current_speaker_index = entry.speaker
+            self.publish_sync()
 
     def ensure_widget_visible(self, widget):
         rect = widget.geometry()
@@ -672,75 +1614,61 @@ class DebateJudgeApp(QMainWindow):
             self.start_ad_timer()
 
     def next_section(self):
-        self.current_section_index = (self.current_section_index + 1) % 3
+        self.follow_focus()
+        self.ensure_speaker(self.current_speaker_index)
+        sections = self.fields.section_count(self.current_speaker_index)
+        self.current_section_index = (self.current_section_index + 1) % sections
         self.focus_current_section()
 
     def previous_section(self):
-        self.current_section_index = (self.current_section_index - 1) % 3
+        self.follow_focus()
+        self.ensure_speaker(self.current_speaker_index)
+        sections = self.fields.section_count(self.current_speaker_index)
+        self.current_section_index = (self.current_section_index - 1) % sections
         self.focus_current_section()
 
     def next_speaker(self):
+        self.follow_focus()
         self.current_speaker_index = (self.current_speaker_index + 1) % len(
             self.speakers
         )
         self.current_section_index = 0
         self.focus_current_section()
+        self.follow_speech_timer()
+        self.publish_sync()
 
     def previous_speaker(self):
+        self.follow_focus()
         self.current_speaker_index = (self.current_speaker_index - 1) % len(
             self.speakers
         )
         self.current_section_index = 0
         self.focus_current_section()
+        self.follow_speech_timer()
+        self.publish_sync()
+
+    def follow_speech_timer(self):
+        """Moving to another speaker preloads the main timer with that speech, unless it is running."""
+        if not self.timer_running and self.timed_speech != self.current_speaker_index:
+            self.load_speech_timer(self.current_speaker_index)
 
     def create_section(self):
-        focus_wid = QApplication.focusWidget()
-        # Speaker fields
-        for sp in self.speakers:
-            if focus_wid in [sp.info_text, sp.question1, sp.question2]:
-                cursor = focus_wid.textCursor()
-                cursor.insertText("\n------------------\n")
-                focus_wid.setTextCursor(cursor)
-                focus_wid.setFocus()
-                return
-        # Ad vocem
-        if hasattr(self, "ad_vocem_1") and focus_wid == self.ad_vocem_1.text_edit:
-            cursor = self.ad_vocem_1.text_edit.textCursor()
-            cursor.insertText("\n------------------\n")
-            self.ad_vocem_1.text_edit.setTextCursor(cursor)
-            self.ad_vocem_1.text_edit.setFocus()
-            return
-        if hasattr(self, "ad_vocem_2") and focus_wid == self.ad_vocem_2.text_edit:
-            cursor = self.ad_vocem_2.text_edit.textCursor()
-            cursor.insertText("\n------------------\n")
-            self.ad_vocem_2.text_edit.setTextCursor(cursor)
-            self.ad_vocem_2.text_edit.setFocus()
-            return
-        # Notatnik
-        if hasattr(self, "notatnik_box") and focus_wid == self.notatnik_box:
-            cursor = self.notatnik_box.textCursor()
-            cursor.insertText("\n------------------\n")
-            self.notatnik_box.setTextCursor(cursor)
-            self.notatnik_box.setFocus()
+        entry = self.fields.for_editor(QApplication.focusWidget())
+        if entry is None:
             return
+        cursor = entry.editor.textCursor()
+        cursor.insertText("\n------------------\n")
+        entry.editor.setTextCursor(cursor)
 
-    def jump_to_speaker(self, idx):
+    def jump_to_speaker(self, idx, load_timer=True):
+        if idx >= len(self.speakers):
+            return
         self.current_speaker_index = idx
         self.current_section_index = 0
         self.focus_current_section()
-        self.ensure_widget_visible(self.speakers[idx])
-
-    def focus_ad_vocem_proposition(self):
-        self.ad_vocem_1.text_edit.setFocus()
-        self.ensure_widget_visible(self.ad_vocem_1)
-
-    def focus_ad_vocem_opposition(self):
-        self.ad_vocem_2.text_edit.setFocus()
-        self.ensure_widget_visible((self.ad_vocem_2))
-
-    def focus_notatnik(self):
-        self.notatnik_box.setFocus()
-        self.ensure_widget_visible(self.notatnik_box)
+        if load_timer:
+            self.follow_speech_timer()
+        self.publish_sync()
 
     def export_current_state(self, filename=None):
         if filename is None:
@@ -751,26 +1679,42 @@ class DebateJudgeApp(QMainWindow):
                 return  # anulowano wybór pliku
             if not filename.lower().endswith(".json"):
                 filename += ".json"
-        data = {
-            "speakers": [
-                {
-                    "info": s.info_text.toPlainText(),
-                    "question1": s.question1.toPlainText(),
-                    "question2": s.question2.toPlainText(),
-                }
-                for s in self.speakers
-            ],
-            "ad_vocem": [
-                self.ad_vocem_1.text_edit.toPlainText(),
-                self.ad_vocem_2.text_edit.toPlainText(),
-            ],
-            "notatnik": self.notatnik_box.toPlainText(),
-            "punkty": [
-                self.scores_table.cellWidget(0, i).value()  # type: ignore
-                for i in range(self.scores_table.columnCount())
-            ],
-        }
-        save_session_to_json(filename, data)
+        save_session_to_json(filename, self.session_snapshot())
+        if self.annotations is not None:
+            self.annotations.save(annotation_path(filename))
+        import sqlite3
+
+        # Sesja jest już zapisana - archiwum (brak FTS5, baza zablokowana) nie może jej zepsuć
+        try:
+            self.archive().ingest_file(filename)
+        except (sqlite3.Error, OSError) as e:
+            self.statusBar().showMessage(f"Zapisano, ale nie dodano do archiwum: {e}", 8000)  # type: ignore
+
+    def archive(self):
+        if self._archive is None:
+            from session_archive import SessionArchive  # sqlite3 dopiero przy pierwszym użyciu archiwum
+
+            os.makedirs(app_data_path(), exist_ok=True)
+            self._archive = SessionArchive(app_data_path("archiwum.sqlite"))
+        return self._archive
+
+    def open_archive(self):
+        import sqlite3
+
+        try:
+            archive = self.archive()
+        except (sqlite3.Error, OSError) as e:
+            QMessageBox.warning(self, "Archiwum", f"Nie można otworzyć archiwum:\n{e}")
+            return
+        ArchiveDialog(archive, self).exec_()
+
+    def session_snapshot(self):
+        """Current session as plain strings, ints and tuples, safe to hand to another thread.
+
+        A speech being timed right now is included with its time so far.
+        """
+        self.record_speech_time()
+        return self.session.snapshot()
 
     def import_state_from_json(self, filename=None):
         if filename is None:
@@ -779,18 +1723,175 @@ class DebateJudgeApp(QMainWindow):
             )
             if not filename:
                 return  # Anulowano wybór pliku
-        data = load_session_from_json(filename)
-        for i, s in enumerate(self.speakers):
-            s.info_text.setPlainText(data["speakers"][i]["info"])
-            s.question1.setPlainText(data["speakers"][i]["question1"])
-            s.question2.setPlainText(data["speakers"][i]["question2"])
-        self.ad_vocem_1.text_edit.setPlainText(data["ad_vocem"][0])
-        self.ad_vocem_2.text_edit.setPlainText(data["ad_vocem"][1])
-        self.notatnik_box.setPlainText(data.get("notatnik", ""))
-        for i, val in enumerate(data["punkty"]):
-            self.scores_table.cellWidget(0, i).setValue(val)  # type: ignore
+        # Najpierw cały plik musi przejść walidację - dopiero potem ruszamy widgety
+        try:
+            data = load_session_from_json(filename)
+            format_for_session(data)
+        except (OSError, SessionFormatError) as e:
+            QMessageBox.warning(self, "Błąd wczytywania", f"Nie można wczytać sesji:\n{e}")
+            return
+        log = None
+        if os.path.exists(annotation_path(filename)):
+            try:
+                log = AnnotationLog.load(annotation_path(filename))
+            except (OSError, ValueError):
+                log = None  # bez przebiegu sesja i tak się wczyta
+        self.finish_startup()
+        with self.journal.suspended():
+            self.apply_session(data)
+        # Wczytany plik to nowy punkt odniesienia dla autozapisu
+        self.journal.compact(self.session_snapshot())
+        self.start_annotation_log(log)
+
+    def apply_session(self, data):
+        """Fill every field in one batch: no per-editor signals, one layout pass at the end.
+
+        ``data`` must fit its format (format_for_session); a session in another format than
+        the current one switches the window to it. Panels not built yet read the model later.
+        """
+        fmt = format_for_session(data)
+        if fmt is not self.format:
+            self.apply_format(fmt)
+        self.session.load(dict(data, format=fmt.key))
+        container = self.scroll_area.widget()
+        container.setUpdatesEnabled(False)  # type: ignore
+        try:
+            for entry in self.fields:
+                entry.editor.load_text(self.session.text(entry.field))
+            if data.get("teza"):
+                self.settings.set("teza", data["teza"])
+            self.session.set_teza(self.settings.get("teza"))  # sesja bez tezy zostawia bieżącą
+            for i, val in enumerate(self.session.punkty):
+                spin = self.scores_table.cellWidget(0, i)
+                spin.blockSignals(True)  # type: ignore
+                spin.setValue(val)  # type: ignore
+                spin.blockSignals(False)  # type: ignore
+
+            # To, co normalnie robią sloty textChanged - raz na pole
+            for s in self.speakers:
+                s.show_questions()
+            for _, editor in self.journal_fields():
+                editor.resize_for_content()
+        finally:
+            container.setUpdatesEnabled(True)  # type: ignore
+        # Główny timer wraca do bieżącego wystąpienia z czasami z wczytanej sesji
+        self.timed_speech = None
+        self.load_speech_timer(self.current_speaker_index)
+
+    def register_field(self, field, editor, container=None, speaker=None, section=None):
+        """Add an editor to the registry; its edits go to the model and the autosave journal."""
+        self.fields.register(field, editor, container, speaker, section)
+        editor.contentsEdited.connect(
+            lambda pos, removed, text, field=field: self.on_field_edited(field, pos, removed, text)
+        )
+
+    def on_field_edited(self, field, pos, removed, text):
+        self.session.splice(field, pos, removed, text)
+        if self.annotations is not None:
+            self.annotations.record(field, pos, removed, text, self.timed_speech, self.main_clock.elapsed())
+        if self.journal is not None:
+            self.journal_text_change(field, pos, removed, text)
+
+    def on_score_changed(self, index, value):
+        self.session.set_score(index, value)
+        if self.journal is not None:
+            self.journal.record_value(f"punkty/{index}", value)
+
+    def start_annotation_log(self, log=None):
+        """Record note edits from the current session state on. A log loaded with the session
+        is continued if replaying it ends exactly at that state."""
+        texts = {field: self.session.text(field) for field in self.session.fields}
+        base = {field: text for field, text in texts.items() if text}
+        if log is not None and log.replay().final() == base:
+            log.resume()
+            log.meta["format"] = self.format.key
+            self.annotations = log
+        else:
+            self.annotations = AnnotationLog(base, {"format": self.format.key})
+
+    # Autozapis
+    def journal_fields(self):
+        """(field id, editor) pairs; ids are paths into the session dict."""
+        return [(entry.field, entry.editor) for entry in self.fields]
+
+    AUTOSAVE_SLOTS = 16
+
+    def claim_autosave_directory(self):
+        """A directory for this window's autosave that no other running instance writes to.
+
+        Every instance holds a lock in its directory; a lock left by a crashed instance is
+        stale, so the next instance takes that directory over and recovers the session.
+        """
+        for n in range(self.AUTOSAVE_SLOTS):
+            directory = app_data_path("autosave" if n == 0 else f"autosave-{n + 1}")
+            os.makedirs(directory, exist_ok=True)
+            lock = QLockFile(os.path.join(directory, "autosave.lock"))
+            lock.setStaleLockTime(0)  # nieaktualna jest tylko blokada martwego procesu
+            if lock.tryLock(0):
+                self.autosave_lock = lock
+                return directory
+        return app_data_path(f"autosave-pid{os.getpid()}")  # wszystkie zajęte - katalog tylko dla tego procesu
+
+    def setup_autosave(self):
+        self.journal = SessionJournal(self.claim_autosave_directory())
+        recovered, problem = None, None
+        try:
+            recovered = self.journal.recover()
+            if recovered is not None:
+                format_for_session(recovered)
+        except (OSError, ValueError, KeyError, IndexError, TypeError) as e:
+            recovered, problem = None, e
+        if recovered is not None:
+            try:
+                self.apply_session(recovered)
+            except (ValueError, KeyError, IndexError, TypeError) as e:
+                # Start nie może paść przez autozapis - wracamy do pustej sesji
+                problem = e
+                empty = DebateSession(self.format.speaker_count, self.format.score_count, self.format.key)
+                self.apply_session(empty.snapshot())
+        if problem is not None:
+            # Uszkodzony autozapis odkładamy na bok, zamiast nadpisać go pustą sesją
+            kept = self.journal.set_aside()
+            self.statusBar().showMessage(  # type: ignore
+                f"Nie udało się przywrócić sesji ({problem}); autozapis zachowano w {kept}", 20000
+            )
+        elif recovered is not None:
+            self.statusBar().showMessage("Przywrócono niezapisaną sesję po awarii", 10000)  # type: ignore
+        self.journal.start(self.session_snapshot())
+        self.start_annotation_log()
+
+        self.compact_timer = QTimer(self)
+        self.compact_timer.timeout.connect(self.compact_journal)
+        self.compact_timer.start(30000)
+
+    def journal_text_change(self, field, pos, removed, text):
+        self.journal.record_text(field, pos, removed, text)
+        if self.journal.needs_compaction():
+            self.compact_journal()
+
+    def compact_journal(self):
+        if self.journal.has_pending():
+            self.journal.compact(self.session_snapshot())
+
+    def closeEvent(self, event):
+        if self.journal is not None:
+            self.journal.close()
+        if self.autosave_lock is not None:
+            self.autosave_lock.unlock()
+        if self.publisher is not None:
+            self.publisher.close()
+        if self.lan_sync is not None:
+            self.lan_sync.close()
+        if PROBE is not None:
+            path = self.dump_profile()
+            if path:
+                print(f"Profil: {path}", file=sys.stderr)
+        super().closeEvent(event)
 
     def export_to_pdf(self):
+        if self._pdf_worker is not None:
+            self.statusBar().showMessage("Eksport PDF już trwa...")  # type: ignore
+            return
         filename, _ = QFileDialog.getSaveFileName(
             self, "Zapisz jako PDF", "", "Pliki PDF (*.pdf)"
         )
@@ -799,125 +1900,36 @@ class DebateJudgeApp(QMainWindow):
         if not filename.lower().endswith(".pdf"):
             filename += ".pdf"
 
-        # Tworzymy dokument PDF
-        doc = SimpleDocTemplate(filename, pagesize=A4)
-        elements = []
-
-        # Style
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            "CustomTitle",
-            parent=styles["Heading1"],
-            fontSize=24,
-            textColor=colors.HexColor("#27293C"),
-            spaceAfter=30,
-            alignment=1,  # centered
-        )
-
-        # Tytuł
-        elements.append(Paragraph("Raport Debaty", title_style))
-        elements.append(Spacer(1, 0.3 * inch))
-
-        # Tabela mówców
-        elements.append(Paragraph("Mówcy", styles["Heading2"]))
-
-        table_data = [["Mówca", "Informacje", "Pytanie 1", "Pytanie 2"]]
-        for i, speaker in enumerate(self.speakers):
-            table_data.append(
-                [
-                    f"Mówca {i + 1}",
-                    speaker.info_text.toPlainText()[:50] + "...",
-                    speaker.question1.toPlainText()[:30] + "...",
-                    speaker.question2.toPlainText()[:30] + "...",
-                ]
-            )
-
-        t = Table(table_data)
-        t.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
-                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-                    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                    ("FONTSIZE", (0, 0), (-1, 0), 12),
-                    ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
-                    ("BACKGROUND", (0, 1), (-1, -1), colors.beige),
-                    ("GRID", (0, 0), (-1, -1), 1, colors.black),
-                    ("WORDWRAP", (0, 0), (-1, -1), True),
-                ]
-            )
-        )
-        elements.append(t)
-        elements.append(Spacer(1, 0.3 * inch))
-
-        # Tabela punktów
-        elements.append(Paragraph("Punktacja", styles["Heading2"]))
-
-        scores_data = [
-            ["Pro 1", "Opo 1", "Pro 2", "Opo 2", "Pro 3", "Opo 3", "Pro 4", "Opo 4"]
-        ]
-        scores_row = []
-        for i in range(8):
-            val = self.scores_table.cellWidget(0, i).value()  # type: ignore
-            scores_row.append(str(val))
-        scores_data.append(scores_row)
-
-        scores_table = Table(scores_data)
-        scores_table.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
-                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-                    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                    ("FONTSIZE", (0, 0), (-1, 0), 11),
-                    ("BACKGROUND", (0, 1), (-1, -1), colors.lightblue),
-                    ("GRID", (0, 0), (-1, -1), 1, colors.black),
-                ]
-            )
-        )
-        elements.append(scores_table)
-        elements.append(Spacer(1, 0.3 * inch))
-
-        # Ad Vocem
-        elements.append(Paragraph("Ad Vocem Propozycja", styles["Heading3"]))
-        elements.append(
-            Paragraph(self.ad_vocem_1.text_edit.toPlainText(), styles["Normal"])
-        )
-        elements.append(Spacer(1, 0.2 * inch))
-
-        elements.append(Paragraph("Ad Vocem Opozycja", styles["Heading3"]))
-        elements.append(
-            Paragraph(self.ad_vocem_2.text_edit.toPlainText(), styles["Normal"])
-        )
-        elements.append(Spacer(1, 0.2 * inch))
-
-        # Notatnik
-        elements.append(Paragraph("Notatnik", styles["Heading3"]))
-        elements.append(Paragraph(self.notatnik_box.toPlainText(), styles["Normal"]))
-
-        # Budowanie PDF
-        doc.build(elements)
+        # Wątek dostaje migawkę - widgetów nie dotyka
+        worker = PdfExportWorker(filename, self.session_snapshot(), app_data_path("raporty"), self)
+        worker.progress.connect(self.on_pdf_progress)
+        worker.succeeded.connect(self.on_pdf_done)
+        worker.failed.connect(self.on_pdf_failed)
+        worker.finished.connect(self.on_pdf_worker_finished)
+        self._pdf_worker = worker
+        worker.start()
 
+    def on_pdf_progress(self, percent, message):
+        self.statusBar().showMessage(f"PDF: {message} ({percent}%)")  # type: ignore
 
-def save_session_to_json(filename, data):
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    def on_pdf_done(self, filename):
+        self.statusBar().showMessage(f"Zapisano PDF: {filename}", 5000)  # type: ignore
 
+    def on_pdf_failed(self, error):
+        self.statusBar().showMessage(f"Błąd eksportu PDF: {error}", 10000)  # type: ignore
 
-def load_session_from_json(filename):
-    with open(filename, "r", encoding="utf-8") as f:
-        lines = [line for line in f if not line.strip().startswith("//")]
-        return json.loads("".join(lines))
+    def on_pdf_worker_finished(self):
+        self._pdf_worker.deleteLater()  # type: ignore
+        self._pdf_worker = None
 
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
-    settings = QSettings("OksfordOS", "DebateJudgeApp")
-    theme = settings.value("theme", "Jasny")
-    apply_theme(app, theme)
+    apply_theme(app, settings_store().get("theme"))
 
     window = DebateJudgeApp()
     window.show()
-    sys.exit(app.exec_())
+    exit_code = app.exec_()
+    if AutoResizingTextEdit.measure_latency:
+        print("Opóźnienie klawisz -> odrysowanie:", AutoResizingTextEdit.latency_report(), file=sys.stderr)
+    sys.exit(exit_code)
@@ -0,0 +1,232 @@
+"""PDF report of a debate session (the save_session_to_json layout).
+
+Fonts, paragraph and table styles are built once per process (prepare()). Every text
+field is rendered in full: escaped once and split into one paragraph per line, so long
+notes flow across page breaks and reportlab never re-wraps one huge paragraph. The output
+is byte-for-byte reproducible (fixed creation date and document id), so a finished report
+can be reused for an unchanged session, keyed by session_digest(data).
+"""
+import hashlib
+import json
+import os
+import shutil
+from functools import lru_cache
+from types import SimpleNamespace
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from debate_formats import session_labels
+
+REPORT_VERSION = 2  # zmiana wyglądu raportu unieważnia raporty zapamiętane w cache
+CACHE_LIMIT = 64
+
+# Czcionki z polskimi znakami; wbudowana Helvetica nie ma ą, ę, ł, ś...
+FONT_CANDIDATES = (
+    ("DejaVuSans", "DejaVuSans.ttf", "DejaVuSans-Bold.ttf",
+     ("/usr/share/fonts/truetype/dejavu", "/usr/share/fonts/dejavu", "/usr/share/fonts/TTF")),
+    ("Arial", "arial.ttf", "arialbd.ttf", (os.path.join(os.environ.get("WINDIR", r"C:\Windows"), "Fonts"),)),
+    ("Arial", "Arial.ttf", "Arial Bold.ttf", ("/Library/Fonts", "/System/Library/Fonts/Supplemental")),
+)
+
+SPEAKER_FIELDS = (("info", "Informacje"), ("question1", "Pytanie 1"), ("question2", "Pytanie 2"))
+
+
+@lru_cache(maxsize=None)
+def _fonts():
+    """(regular, bold) font names, registering the first TrueType pair found."""
+    for name, regular, bold, directories in FONT_CANDIDATES:
+        for directory in directories:
+            regular_path = os.path.join(directory, regular)
+            bold_path = os.path.join(directory, bold)
+            if os.path.exists(regular_path) and os.path.exists(bold_path):
+                pdfmetrics.registerFont(TTFont(name, regular_path))
+                pdfmetrics.registerFont(TTFont(name + "-Bold", bold_path))
+                pdfmetrics.registerFontFamily(name, normal=name, bold=name + "-Bold",
+                                              italic=name, boldItalic=name + "-Bold")
+                return name, name + "-Bold"
+    return "Helvetica", "Helvetica-Bold"
+
+
+@lru_cache(maxsize=None)
+def prepare():
+    """Fonts, paragraph styles and table styles, built on first use and shared by every export."""
+    regular, bold = _fonts()
+    sample = getSampleStyleSheet()
+
+    def style(name, parent, **kwargs):
+        kwargs.setdefault("fontName", regular)
+        return ParagraphStyle(name, parent=sample[parent], **kwargs)
+
+    return SimpleNamespace(
+        regular=regular,
+        bold=bold,
+        title=style("ReportTitle", "Heading1", fontName=bold, fontSize=24, leading=28,
+                    textColor=colors.HexColor("#27293C"), spaceAfter=12, alignment=1),
+        teza=style("ReportTeza", "Normal", fontSize=12, leading=16, alignment=1, spaceAfter=18),
+        heading=style("ReportHeading", "Heading2", fontName=bold, keepWithNext=1),
+        speaker=style("ReportSpeaker", "Heading3", fontName=bold, keepWithNext=1, spaceBefore=10),
+        label=style("ReportLabel", "Normal", fontName=bold, textColor=colors.HexColor("#4A4D68"),
+                    keepWithNext=1, spaceBefore=4),
+        body=style("ReportBody", "Normal", fontSize=10, leading=13),
+        empty=style("ReportEmpty", "Normal", fontSize=10, leading=13, textColor=colors.grey),
+        scores=TableStyle([
+            ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
+            ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+            ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+            ("FONTNAME", (0, 0), (-1, 0), bold),
+            ("FONTNAME", (0, 1), (-1, -1), regular),
+            ("FONTSIZE", (0, 0), (-1, 0), 11),
+            ("BACKGROUND", (0, 1), (-1, -1), colors.lightblue),
+            ("GRID", (0, 0), (-1, -1), 1, colors.black),
+        ]),
+    )
+
+
+def _text_flowables(text, styles):
+    """The whole text as one paragraph per line; empty lines become spacing."""
+    if not text.strip():
+        return [Paragraph("(brak)", styles.empty)]
+    flowables = []
+    gap = 0.0
+    for line in escape(text).splitlines():
+        if not line.strip():
+            gap += styles.body.leading / 2
+            continue
+        if gap:
+            flowables.append(Spacer(1, gap))
+            gap = 0.0
+        flowables.append(Paragraph(line, styles.body))
+    return flowables
+
+
+def _footer(canvas, doc):
+    styles = prepare()
+    canvas.saveState()
+    canvas.setFont(styles.regular, 8)
+    canvas.setFillColor(colors.grey)
+    canvas.drawRightString(doc.pagesize[0] - doc.rightMargin, doc.bottomMargin / 2, f"Strona {doc.page}")
+    canvas.restoreState()
+
+
+def session_digest(data):
+    """Hash of everything that ends up in the report, for caching rendered PDFs."""
+    canonical = [
+        REPORT_VERSION,
+        _fonts()[0],
+        [[s["info"], s["question1"], s["question2"]] for s in data["speakers"]],
+        list(data["ad_vocem"]),
+        data.get("notatnik", ""),
+        data.get("teza", ""),
+        list(data["punkty"]),
+        data.get("format"),
+    ]
+    payload = json.dumps(canonical, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _session_elements(data, styles):
+    elements = [Paragraph("Raport Debaty", styles.title)]
+    teza = data.get("teza", "").strip()
+    if teza:
+        elements.append(Paragraph(escape(teza), styles.teza))
+    else:
+        elements.append(Spacer(1, 0.3 * inch))
+
+    # Punktacja na początku - to jedyna część o stałej długości
+    speaker_labels, score_labels = session_labels(data)
+    elements.append(Paragraph("Punktacja", styles.heading))
+    scores_table = Table([score_labels, [str(value) for value in data["punkty"]]])
+    scores_table.setStyle(styles.scores)
+    elements.append(scores_table)
+    elements.append(Spacer(1, 0.3 * inch))
+
+    elements.append(Paragraph("Mówcy", styles.heading))
+    for i, speaker in enumerate(data["speakers"]):
+        elements.append(Paragraph(speaker_labels[i], styles.speaker))
+        for key, label in SPEAKER_FIELDS:
+            if key != "info" and not speaker[key].strip():
+                continue  # puste pytania (i mówcy bez pytań, np. repliki) pomijamy
+            elements.append(Paragraph(label, styles.label))
+            elements.extend(_text_flowables(speaker[key], styles))
+    elements.append(Spacer(1, 0.3 * inch))
+
+    for title, text in (
+        ("Ad Vocem Propozycja", data["ad_vocem"][0]),
+        ("Ad Vocem Opozycja", data["ad_vocem"][1]),
+        ("Notatnik", data.get("notatnik", "")),
+    ):
+        elements.append(Paragraph(title, styles.heading))
+        elements.extend(_text_flowables(text, styles))
+        elements.append(Spacer(1, 0.2 * inch))
+    return elements
+
+
+def _prune_cache(cache_dir, limit=CACHE_LIMIT):
+    reports = [entry for entry in os.scandir(cache_dir) if entry.name.endswith(".pdf")]
+    reports.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in reports[limit:]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+
+def build_session_pdf(filename, data, progress=None, cache_dir=None):
+    """Render a session dict (the save_session_to_json layout) to a PDF report.
+
+    ``progress`` is an optional callable taking (percent, message); it is called
+    from whatever thread runs the export. With ``cache_dir`` an unchanged session is
+    copied from the report rendered last time instead of being rendered again.
+    """
+
+    def report(percent, message):
+        if progress is not None:
+            progress(percent, message)
+
+    report(0, "Przygotowanie raportu")
+    cached = None
+    if cache_dir:
+        cached = os.path.join(cache_dir, session_digest(data) + ".pdf")
+        if os.path.exists(cached):
+            shutil.copyfile(cached, filename)
+            os.utime(cached)  # najdawniej używane wylatują pierwsze
+            report(100, "Gotowe")
+            return
+
+    styles = prepare()
+    doc = SimpleDocTemplate(
+        filename,
+        pagesize=A4,
+        invariant=1,  # stała data utworzenia i identyfikator - ten sam plik dla tej samej sesji
+        title="Raport Debaty",
+        author="OksfordOS",
+        creator="OksfordOS",
+        subject=data.get("teza", ""),
+    )
+    elements = _session_elements(data, styles)
+    report(20, "Składanie stron")
+
+    # reportlab raportuje postęp jako liczbę przetworzonych flowables
+    total = len(elements)
+
+    def on_build_progress(kind, value):
+        if kind == "PROGRESS" and total:
+            report(20 + int(75 * min(value, total) / total), "Składanie stron")
+
+    doc.setProgressCallBack(on_build_progress)
+    doc.build(elements, onFirstPage=_footer, onLaterPages=_footer)
+
+    if cached is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        partial = cached + ".tmp"
+        shutil.copyfile(filename, partial)
+        os.replace(partial, cached)
+        _prune_cache(cache_dir)
+    report(100, "Gotowe")
@@ -0,0 +1,260 @@
+"""Searchable archive of saved debate sessions (SQLite + FTS5).
+
+    python session_archive.py --db archiwum.sqlite index sesje/
+    python session_archive.py --db archiwum.sqlite search "dochód podstawowy" --speaker "Opo 3"
+"""
+import argparse
+import hashlib
+import os
+import sqlite3
+import sys
+import time
+
+from debate_formats import session_labels
+from session_io import SessionFormatError, load_session_from_json
+
+DEFAULT_DB = os.environ.get("OKSFORDOS_ARCHIVE", "oksfordos-archiwum.sqlite")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    teza TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS scores (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    speaker TEXT NOT NULL,
+    score INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scores_by_speaker ON scores(speaker, score);
+CREATE TABLE IF NOT EXISTS notes (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    field TEXT NOT NULL,
+    speaker TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS notes_by_file ON notes(file_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+    text,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+
+def _file_digest(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def session_notes(data):
+    """(field id, speaker label, text) for every non-empty text field of a session."""
+    if data.get("teza"):
+        yield "teza", "", data["teza"]
+    speaker_labels, _ = session_labels(data)
+    for i, speaker in enumerate(data["speakers"]):
+        for name, text in speaker.items():
+            if text:
+                yield f"speakers/{i}/{name}", speaker_labels[i], text
+    for i, text in enumerate(data["ad_vocem"]):
+        if text:
+            yield f"ad_vocem/{i}", ("Pro", "Opo")[i], text
+    if data.get("notatnik"):
+        yield "notatnik", "", data["notatnik"]
+
+
+def fts_query(text):
+    """Turn free text into an FTS5 query: every word must match, as a prefix."""
+    words = text.split()
+    return " ".join('"{}"*'.format(w.replace('"', '""')) for w in words)
+
+
+class SessionArchive:
+    def __init__(self, path=DEFAULT_DB):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA foreign_keys = ON")
+        self.db.execute("PRAGMA journal_mode = WAL")
+        self.db.executescript(_SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    # Indeksowanie
+    def ingest_file(self, path):
+        """Index one session file. Returns "new", "updated", "unchanged" or "skipped"."""
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        row = self.db.execute(
+            "SELECT id, mtime_ns, size, sha256 FROM files WHERE path = ?", (path,)
+        ).fetchone()
+        if row is not None and row[1] == st.st_mtime_ns and row[2] == st.st_size:
+            return "unchanged"
+        digest = _file_digest(path)
+        if row is not None and row[3] == digest:
+            # Plik tylko "dotknięty" - zapamiętujemy nowy mtime, bez ponownego indeksu
+            with self.db:
+                self.db.execute(
+                    "UPDATE files SET mtime_ns = ?, size = ? WHERE id = ?",
+                    (st.st_mtime_ns, st.st_size, row[0]),
+                )
+            return "unchanged"
+        try:
+            data = load_session_from_json(path)
+        except SessionFormatError:
+            return "skipped"
+
+        with self.db:
+            if row is not None:
+                self._forget(row[0])
+            file_id = self.db.execute(
+                "INSERT INTO files (path, mtime_ns, size, sha256, teza) VALUES (?, ?, ?, ?, ?)",
+                (path, st.st_mtime_ns, st.st_size, digest, data.get("teza", "")),
+            ).lastrowid
+            for field, speaker, text in session_notes(data):
+                note_id = self.db.execute(
+                    "INSERT INTO notes (file_id, field, speaker) VALUES (?, ?, ?)",
+                    (file_id, field, speaker),
+                ).lastrowid
+                self.db.execute("INSERT INTO notes_fts (rowid, text) VALUES (?, ?)", (note_id, text))
+            _, score_labels = session_labels(data)
+            self.db.executemany(
+                "INSERT INTO scores (file_id, speaker, score) VALUES (?, ?, ?)",
+                [(file_id, label, score) for label, score in zip(score_labels, data["punkty"])],
+            )
+        return "updated" if row is not None else "new"
+
+    def _forget(self, file_id):
+        self.db.execute(
+            "DELETE FROM notes_fts WHERE rowid IN (SELECT id FROM notes WHERE file_id = ?)", (file_id,)
+        )
+        self.db.execute("DELETE FROM files WHERE id = ?", (file_id,))  # notes, scores: CASCADE
+
+    def ingest(self, paths, progress=None):
+        """Index session files and directories incrementally; returns counts per outcome."""
+        counts = {"new": 0, "updated": 0, "unchanged": 0, "skipped": 0, "removed": 0}
+        seen = set()
+        roots = []
+        for path in paths:
+            if os.path.isdir(path):
+                roots.append(os.path.abspath(path))
+                for root, _, names in os.walk(path):
+                    for name in names:
+                        if name.lower().endswith(".json"):
+                            seen.add(os.path.abspath(os.path.join(root, name)))
+            else:
+                seen.add(os.path.abspath(path))
+        for n, path in enumerate(sorted(seen)):
+            counts[self.ingest_file(path)] += 1
+            if progress is not None:
+                progress(n + 1, len(seen))
+
+        # Pliki usunięte z indeksowanych katalogów znikają z archiwum
+        with self.db:
+            for root in roots:
+                prefix = os.path.join(root, "")
+                for file_id, path in self.db.execute(
+                    "SELECT id, path FROM files WHERE substr(path, 1, ?) = ?", (len(prefix), prefix)
+                ).fetchall():
+                    if path not in seen:
+                        self._forget(file_id)
+                        counts["removed"] += 1
+        return counts
+
+    # Wyszukiwanie
+    def speakers(self):
+        """Distinct speaker labels in the archive (every format that was indexed)."""
+        return [
+            row[0]
+            for row in self.db.execute(
+                "SELECT speaker FROM notes WHERE speaker != '' UNION SELECT speaker FROM scores ORDER BY 1"
+            )
+        ]
+
+    def search(self, text="", speaker=None, min_score=None, limit=50):
+        """Find notes matching ``text``; optionally only for ``speaker`` ("Opo 3") and
+        only in rounds where that speaker (or anyone, if no speaker) scored >= ``min_score``.
+
+        Returns dicts with path, teza, field, speaker and a highlighted snippet.
+        """
+        where = []
+        params = []
+        matching = bool(text.strip())
+        if matching:
+            where.append("notes_fts MATCH ?")
+            params.append(fts_query(text))
+        if speaker:
+            where.append("notes.speaker = ?")
+            params.append(speaker)
+        if min_score is not None:
+            where.append(
+                "EXISTS (SELECT 1 FROM scores s WHERE s.file_id = files.id AND s.score >= ?"
+                + (" AND s.speaker = ?)" if speaker else ")")
+            )
+            params.append(min_score)
+            if speaker:
+                params.append(speaker)
+        snippet = "snippet(notes_fts, 0, '[', ']', '…', 12)" if matching else "substr(notes_fts.text, 1, 80)"
+        sql = (
+            f"SELECT files.path, files.teza, notes.field, notes.speaker, {snippet} "
+            "FROM notes_fts "
+            "JOIN notes ON notes.id = notes_fts.rowid "
+            "JOIN files ON files.id = notes.file_id"
+        )
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += (" ORDER BY rank" if matching else "") + " LIMIT ?"
+        params.append(limit)
+        return [
+            {
+                "path": path,
+                "teza": teza,
+                "field": field,
+                "speaker": speaker_name,
+                "snippet": snippet_text,
+            }
+            for path, teza, field, speaker_name, snippet_text in self.db.execute(sql, params)
+        ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Archiwum sesji OksfordOS")
+    parser.add_argument("--db", default=DEFAULT_DB, help=f"plik bazy (domyślnie {DEFAULT_DB})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    index_cmd = sub.add_parser("index", help="dodaj/odśwież pliki sesji w archiwum")
+    index_cmd.add_argument("paths", nargs="+")
+
+    search_cmd = sub.add_parser("search", help="szukaj w notatkach")
+    search_cmd.add_argument("text", nargs="?", default="")
+    search_cmd.add_argument("--speaker", help='np. "Opo 3"')
+    search_cmd.add_argument("--min-score", type=int)
+    search_cmd.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    archive = SessionArchive(args.db)
+    try:
+        if args.command == "index":
+            start = time.perf_counter()
+            counts = archive.ingest(args.paths)
+            summary = ", ".join(f"{k}: {v}" for k, v in counts.items())
+            print(f"{summary} ({time.perf_counter() - start:.2f} s)")
+        else:
+            start = time.perf_counter()
+            hits = archive.search(args.text, args.speaker, args.min_score, args.limit)
+            elapsed = (time.perf_counter() - start) * 1000
+            for hit in hits:
+                print(f"{hit['path']}  [{hit['speaker'] or hit['field']}]  {hit['snippet']}")
+            print(f"{len(hits)} wyników ({elapsed:.1f} ms)", file=sys.stderr)
+    finally:
+        archive.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+import json
+import os
+import re
+
+SESSION_VERSION = 1
+SCORE_RANGE = (0, 10)
+SPEAKER_FIELDS = ("info", "question1", "question2")
+
+# Komentarze // i /* */ wycinamy jednym przebiegiem regexu (napisy JSON przepuszczamy),
+# dopiero potem json.loads - parser w C jest szybszy niż własny jednoprzebiegowy w Pythonie
+_STRING_OR_COMMENT = re.compile(r'"(?:\\.|[^"\\])*"|//[^\n]*|/\*.*?\*/', re.DOTALL)
+
+
+class SessionFormatError(ValueError):
+    """Raised when a session file is not valid JSON or does not match the session schema."""
+
+    def __init__(self, message, path=None):
+        self.path = path
+        super().__init__(f"{path}: {message}" if path else message)
+
+
+def strip_json_comments(text):
+    if "/" not in text:
+        return text
+
+    def replace(match):
+        token = match.group(0)
+        if token[0] == '"':
+            return token
+        # zostawiamy nowe linie, żeby numery linii w błędach się zgadzały
+        return "\n" * token.count("\n")
+
+    return _STRING_OR_COMMENT.sub(replace, text)
+
+
+def _expect_text(value, path):
+    if not isinstance(value, str):
+        raise SessionFormatError(f"oczekiwano tekstu, jest {type(value).__name__}", path)
+    return value
+
+
+def _expect_list(value, path):
+    if not isinstance(value, (list, tuple)):
+        raise SessionFormatError(f"oczekiwano listy, jest {type(value).__name__}", path)
+    return value
+
+
+def validate_session(data, speaker_count=None, score_count=None):
+    """Check a parsed session against the schema and return a normalized copy.
+
+    Unknown top-level keys are passed through untouched so newer tools can add data
+    without breaking older readers.
+    """
+    if not isinstance(data, dict):
+        raise SessionFormatError("plik sesji musi zawierać obiekt JSON")
+
+    version = data.get("version", 1)
+    if not isinstance(version, int) or isinstance(version, bool):
+        raise SessionFormatError("wersja musi być liczbą całkowitą", "version")
+    if version > SESSION_VERSION:
+        raise SessionFormatError(
+            f"plik zapisany nowszą wersją programu (format {version}, obsługiwany {SESSION_VERSION})",
+            "version",
+        )
+
+    for key in ("speakers", "ad_vocem", "punkty"):
+        if key not in data:
+            raise SessionFormatError("brak wymaganego pola", key)
+
+    speakers = []
+    for i, speaker in enumerate(_expect_list(data["speakers"], "speakers")):
+        if not isinstance(speaker, dict):
+            raise SessionFormatError("oczekiwano obiektu mówcy", f"speakers[{i}]")
+        speakers.append(
+            {
+                name: _expect_text(speaker.get(name, ""), f"speakers[{i}].{name}")
+                for name in SPEAKER_FIELDS
+            }
+        )
+    if speaker_count is not None and len(speakers) != speaker_count:
+        raise SessionFormatError(f"oczekiwano {speaker_count} mówców, jest {len(speakers)}", "speakers")
+
+    ad_vocem = [
+        _expect_text(text, f"ad_vocem[{i}]")
+        for i, text in enumerate(_expect_list(data["ad_vocem"], "ad_vocem"))
+    ]
+    if len(ad_vocem) != 2:
+        raise SessionFormatError(f"oczekiwano 2 pól, jest {len(ad_vocem)}", "ad_vocem")
+
+    notatnik = _expect_text(data.get("notatnik", ""), "notatnik")
+    teza = _expect_text(data.get("teza", ""), "teza")
+
+    low, high = SCORE_RANGE
+    punkty = []
+    for i, value in enumerate(_expect_list(data["punkty"], "punkty")):
+        if not isinstance(value, int) or isinstance(value, bool):
+            raise SessionFormatError("punkty muszą być liczbą całkowitą", f"punkty[{i}]")
+        if not low <= value <= high:
+            raise SessionFormatError(f"punkty poza zakresem {low}-{high}: {value}", f"punkty[{i}]")
+        punkty.append(value)
+    if score_count is not None and len(punkty) > score_count:
+        raise SessionFormatError(f"maksymalnie {score_count} wyników, jest {len(punkty)}", "punkty")
+
+    if "format" in data:
+        _expect_text(data["format"], "format")
+    if "czasy" in data:
+        czasy = _expect_list(data["czasy"], "czasy")
+        for i, value in enumerate(czasy):
+            if not isinstance(value, (int, float)) or isinstance(value, bool) or not value >= 0:
+                raise SessionFormatError("czas wystąpienia musi być nieujemną liczbą sekund", f"czasy[{i}]")
+        if len(czasy) > len(speakers):
+            raise SessionFormatError(f"więcej czasów ({len(czasy)}) niż mówców ({len(speakers)})", "czasy")
+
+    session = dict(data)
+    session.update(
+        version=SESSION_VERSION,
+        speakers=speakers,
+        ad_vocem=ad_vocem,
+        notatnik=notatnik,
+        teza=teza,
+        punkty=punkty,
+    )
+    return session
+
+
+def parse_session(text, speaker_count=None, score_count=None):
+    try:
+        data = json.loads(strip_json_comments(text))
+    except ValueError as e:
+        raise SessionFormatError(f"niepoprawny JSON: {e}") from e
+    return validate_session(data, speaker_count, score_count)
+
+
+def save_session_to_json(filename, data):
+    with open(filename, "w", encoding="utf-8") as f:
+        # default=dict: migawki sesji trzymają mówców w MappingProxyType
+        json.dump(data, f, ensure_ascii=False, indent=2, default=dict)
+
+
+def load_session_from_json(filename, speaker_count=None, score_count=None):
+    try:
+        with open(filename, "r", encoding="utf-8") as f:
+            text = f.read()
+    except UnicodeDecodeError as e:
+        raise SessionFormatError(f"plik nie jest zapisany w UTF-8 ({e.reason} na bajcie {e.start})") from e
+    return parse_session(text, speaker_count, score_count)
+
+
+def collect_session_files(paths):
+    """Session files among ``paths``: files as given, directories walked for *.json."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(
+                    os.path.join(root, name)
+                    for name in sorted(names)
+                    if name.lower().endswith(".json")
+                )
+        else:
+            files.append(path)
+    return files
@@ -0,0 +1,149 @@
+import json
+import os
+from contextlib import contextmanager
+
+from session_io import save_session_to_json, load_session_from_json, validate_session
+
+
+def resolve_field(data, field):
+    """Return (container, key) for a field id such as "speakers/3/info" or "punkty/5"."""
+    parts = [int(p) if p.isdigit() else p for p in field.split("/")]
+    container = data
+    for part in parts[:-1]:
+        container = container[part]
+    return container, parts[-1]
+
+
+def apply_record(data, record):
+    container, key = resolve_field(data, record["f"])
+    if "v" in record:
+        container[key] = record["v"]
+    else:
+        text = container[key]
+        pos = record["p"]
+        container[key] = text[:pos] + record["a"] + text[pos + record["r"]:]
+
+
+class SessionJournal:
+    """Append-only autosave: a JSON snapshot plus a log of per-field edits made since.
+
+    Every edit appends one short line, so the cost of a keystroke does not depend on
+    the size of the session. compact() folds the log into a fresh snapshot. Records
+    carry a sequence number and the snapshot stores the last one it includes, so a
+    crash between writing the snapshot and truncating the log never replays twice.
+    """
+
+    SNAPSHOT_NAME = "autosave.json"
+    JOURNAL_NAME = "autosave.journal"
+    COMPACT_RECORDS = 500
+    COMPACT_BYTES = 256 * 1024
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.snapshot_path = os.path.join(directory, self.SNAPSHOT_NAME)
+        self.journal_path = os.path.join(directory, self.JOURNAL_NAME)
+        self._file = None
+        self._seq = 0
+        self._pending_records = 0
+        self._pending_bytes = 0
+        self._suspended = 0
+
+    # Odzyskiwanie
+    def has_recovery(self):
+        return os.path.exists(self.snapshot_path)
+
+    def recover(self):
+        """Snapshot with the journal replayed on top, or None if there is nothing to recover.
+
+        The result is validated again, since a replayed record can break a valid snapshot.
+        """
+        if not self.has_recovery():
+            return None
+        data = load_session_from_json(self.snapshot_path)
+        seq = data.pop("journal_seq", 0)
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break  # urwany ostatni wpis po awarii
+                    if record["n"] > seq:
+                        apply_record(data, record)
+                        seq = record["n"]
+        self._seq = seq
+        return validate_session(data)
+
+    # Zapis
+    def start(self, snapshot):
+        os.makedirs(self.directory, exist_ok=True)
+        self.compact(snapshot)
+
+    def record_text(self, field, position, removed, added):
+        self._append({"f": field, "p": position, "r": removed, "a": added})
+
+    def record_value(self, field, value):
+        self._append({"f": field, "v": value})
+
+    def _append(self, record):
+        if self._file is None or self._suspended:
+            return
+        self._seq += 1
+        record["n"] = self._seq
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        self._file.write(line)
+        self._file.flush()
+        self._pending_records += 1
+        self._pending_bytes += len(line)
+
+    def needs_compaction(self):
+        return (
+            self._pending_records >= self.COMPACT_RECORDS
+            or self._pending_bytes >= self.COMPACT_BYTES
+        )
+
+    def has_pending(self):
+        return self._pending_records > 0
+
+    def compact(self, snapshot):
+        data = dict(snapshot)
+        data["journal_seq"] = self._seq
+        tmp = self.snapshot_path + ".tmp"
+        save_session_to_json(tmp, data)
+        os.replace(tmp, self.snapshot_path)
+        if self._file is not None:
+            self._file.close()
+        self._file = open(self.journal_path, "w", encoding="utf-8")
+        self._pending_records = 0
+        self._pending_bytes = 0
+
+    @contextmanager
+    def suspended(self):
+        self._suspended += 1
+        try:
+            yield
+        finally:
+            self._suspended -= 1
+
+    def set_aside(self, suffix=".uszkodzony"):
+        """Move the autosave files out of the way, keeping them for manual recovery.
+
+        Returns the path the snapshot was moved to.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        for path in (self.journal_path, self.snapshot_path):
+            if os.path.exists(path):
+                os.replace(path, path + suffix)
+        return self.snapshot_path + suffix
+
+    def close(self, discard=True):
+        """Stop journaling; by default remove the files, since a clean exit needs no recovery."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if discard:
+            for path in (self.journal_path, self.snapshot_path):
+                if os.path.exists(path):
+                    os.remove(path)
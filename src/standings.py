@@ -0,0 +1,230 @@
+"""Tournament standings from many saved sessions, computed on a rounds x speakers matrix.
+
+    python standings.py sesje/ -o ranking.csv
+
+Speakers are identified by the optional "mowcy" list of a session (names in the same
+order as "punkty"); without it the position label ("Pro 1" ... "Opo 4") is used. The side
+of every score comes from the session's debate format; formats with more than two sides
+(British, four benches) have no Propozycja/Opozycja result and are skipped.
+"""
+import argparse
+import csv
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from debate_formats import format_for_session, session_labels
+from session_io import SessionFormatError, collect_session_files, load_session_from_json
+
+SIDE_PRO = 1
+SIDE_OPO = -1
+TIE = 0
+
+
+class ScoreMatrix:
+    """Scores of R rounds with S speaker slots each: ``scores`` is an R x S int array,
+    ``sides`` the matching SIDE_PRO / SIDE_OPO of every slot (default: first half Pro)."""
+
+    def __init__(self, scores, names, files=(), skipped=(), sides=None):
+        self.scores = np.asarray(scores, dtype=np.int16)
+        self.names = np.asarray(names, dtype=object)  # R x S
+        self.sides = _halves(self.scores) if sides is None else np.asarray(sides, dtype=np.int8)
+        self.files = list(files)
+        self.skipped = list(skipped)  # (plik, powód) - sesje, które nie weszły do macierzy
+
+    @property
+    def rounds(self):
+        return self.scores.shape[0]
+
+    @property
+    def slots(self):
+        return self.scores.shape[1]
+
+
+def _halves(scores):
+    """Sides of sessions without a format: Pro 1..n, then Opo 1..n."""
+    slots = scores.shape[1]
+    return np.broadcast_to(np.where(np.arange(slots) < slots // 2, SIDE_PRO, SIDE_OPO), scores.shape).astype(np.int8)
+
+
+def _read_round(path):
+    data = load_session_from_json(path)
+    punkty = data["punkty"]
+    # Lista nazwisk pochodzi od organizatora turnieju, nie z GUI
+    names = data.get("mowcy") or []
+    if not isinstance(names, list) or not all(isinstance(name, str) for name in names):
+        raise SessionFormatError("oczekiwano listy nazwisk", "mowcy")
+    if len(names) > len(punkty):
+        raise SessionFormatError(f"więcej nazwisk ({len(names)}) niż wyników ({len(punkty)})", "mowcy")
+    _, score_labels = session_labels(data)
+    labels = [names[i] if i < len(names) and names[i] else score_labels[i] for i in range(len(punkty))]
+    if "format" not in data:
+        sides = [SIDE_PRO if i < len(punkty) // 2 else SIDE_OPO for i in range(len(punkty))]
+        return punkty, labels, sides
+    fmt = format_for_session(data)
+    if len(fmt.sides) != 2:
+        raise ValueError(f"format {fmt.name} ma {len(fmt.sides)} strony - ranking liczy tylko Propozycję i Opozycję")
+    sides = [SIDE_PRO if fmt.speeches[fmt.score_order[c]].side == 0 else SIDE_OPO for c in range(len(punkty))]
+    return punkty, labels, sides
+
+
+def _read_round_safe(path):
+    """(punkty, labels, sides), or an error message: one bad file must not stop the whole pool."""
+    try:
+        return _read_round(path)
+    except (OSError, ValueError, LookupError, ArithmeticError) as e:  # SessionFormatError to ValueError
+        return str(e) or type(e).__name__
+
+
+def load_score_matrix(paths, workers=None):
+    """Read "punkty" (and "mowcy") from every session. Unreadable files and rounds of a
+    different size than the first one are left out and listed in ``skipped``."""
+    files = collect_session_files(paths)
+    rows, names, sides, used, skipped = [], [], [], [], []
+    # Parsowanie JSON to większość czasu - rozkładamy na procesy
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(_read_round_safe, files, chunksize=64)
+        for path, result in zip(files, results):
+            if isinstance(result, str):
+                skipped.append((path, result))
+                continue
+            punkty, labels, round_sides = result
+            if rows and len(punkty) != len(rows[0]):
+                skipped.append((path, f"{len(punkty)} wyników, a pierwsza runda ma {len(rows[0])}"))
+                continue
+            rows.append(punkty)
+            names.append(labels)
+            sides.append(round_sides)
+            used.append(path)
+    if not rows:
+        return ScoreMatrix(np.zeros((0, 8)), np.empty((0, 8), dtype=object), skipped=skipped)
+    return ScoreMatrix(rows, names, used, skipped, sides)
+
+
+def round_ranks(scores):
+    """Competition ranking (1, 2, 2, 4) of the speakers inside every round."""
+    s = scores.astype(np.int32)
+    return 1 + (s[:, None, :] > s[:, :, None]).sum(axis=2)
+
+
+def round_winners(scores, sides=None):
+    """Winning side per round: SIDE_PRO, SIDE_OPO or TIE.
+
+    Higher team total wins; equal totals are broken by the best individual score,
+    then by the number of speakers ranked in the top half of the round.
+    """
+    if sides is None:
+        sides = _halves(scores)
+    half = scores.shape[1] // 2
+    s = scores.astype(np.int32)
+    pro, opo = sides == SIDE_PRO, sides == SIDE_OPO
+    top = round_ranks(scores) <= half
+    keys = [
+        np.where(pro, s, 0).sum(axis=1) - np.where(opo, s, 0).sum(axis=1),
+        np.where(pro, s, -1).max(axis=1) - np.where(opo, s, -1).max(axis=1),
+        (top & pro).sum(axis=1) - (top & opo).sum(axis=1),
+    ]
+    winner = np.zeros(len(s), dtype=np.int8)
+    undecided = np.ones(len(s), dtype=bool)
+    for key in keys:
+        decided = undecided & (key != 0)
+        winner[decided] = np.sign(key[decided])
+        undecided &= ~decided
+    return winner
+
+
+def side_win_rates(scores, sides=None):
+    winners = round_winners(scores, sides)
+    n = max(len(winners), 1)
+    return {
+        "Propozycja": float((winners == SIDE_PRO).sum() / n),
+        "Opozycja": float((winners == SIDE_OPO).sum() / n),
+        "Remis": float((winners == TIE).sum() / n),
+    }
+
+
+def speaker_standings(matrix):
+    """Per speaker: rounds, total, average, std, average in-round rank, round wins.
+
+    Rows are sorted by total, then average, then average rank, then best score.
+    """
+    scores = matrix.scores.astype(np.float64).ravel()
+    ranks = round_ranks(matrix.scores).astype(np.float64).ravel()
+    winners = round_winners(matrix.scores, matrix.sides)
+    won = (winners[:, None] == matrix.sides).astype(np.float64).ravel()
+
+    names, idx = np.unique(matrix.names.ravel().astype(str), return_inverse=True)
+    k = len(names)
+    rounds = np.bincount(idx, minlength=k).astype(np.float64)
+    total = np.bincount(idx, weights=scores, minlength=k)
+    square = np.bincount(idx, weights=scores * scores, minlength=k)
+    rank_sum = np.bincount(idx, weights=ranks, minlength=k)
+    wins = np.bincount(idx, weights=won, minlength=k)
+    best = np.full(k, -1.0)
+    np.maximum.at(best, idx, scores)
+
+    safe = np.maximum(rounds, 1)
+    average = total / safe
+    std = np.sqrt(np.maximum(square / safe - average * average, 0.0))
+    avg_rank = rank_sum / safe
+
+    # lexsort: ostatni klucz najważniejszy
+    order = np.lexsort((-best, avg_rank, -average, -total))
+    place = np.empty(k, dtype=np.int64)
+    place[order] = np.arange(1, k + 1)
+    return [
+        {
+            "miejsce": int(place[i]),
+            "mowca": str(names[i]),
+            "rundy": int(rounds[i]),
+            "suma": int(total[i]),
+            "srednia": round(float(average[i]), 3),
+            "odchylenie": round(float(std[i]), 3),
+            "sredni_ranking": round(float(avg_rank[i]), 3),
+            "najlepszy": int(best[i]),
+            "wygrane_rundy": int(wins[i]),
+        }
+        for i in order
+    ]
+
+
+def write_standings_csv(rows, filename):
+    with open(filename, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()) if rows else ["miejsce"])
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ranking mówców z wielu sesji OksfordOS")
+    parser.add_argument("paths", nargs="+", help="pliki .json lub katalogi z sesjami")
+    parser.add_argument("-o", "--output", help="zapisz ranking do pliku CSV")
+    parser.add_argument("-n", "--top", type=int, default=20, help="ile pozycji wypisać")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="liczba procesów do wczytywania")
+    args = parser.parse_args(argv)
+
+    matrix = load_score_matrix(args.paths, args.jobs)
+    for path, reason in matrix.skipped:
+        print(f"Pominięto {path}: {reason}", file=sys.stderr)
+    if matrix.rounds == 0:
+        print("Brak sesji z punktacją.", file=sys.stderr)
+        return 1
+
+    rows = speaker_standings(matrix)
+    if args.output:
+        write_standings_csv(rows, args.output)
+
+    rates = side_win_rates(matrix.scores, matrix.sides)
+    print(f"Rundy: {matrix.rounds}  " + "  ".join(f"{k}: {v:.1%}" for k, v in rates.items()))
+    print(f"{'#':>3}  {'Mówca':<20} {'Rundy':>5} {'Suma':>6} {'Śr.':>6} {'Śr. miejsce':>11}")
+    for row in rows[: args.top]:
+        print(
+            f"{row['miejsce']:>3}  {row['mowca']:<20} {row['rundy']:>5} {row['suma']:>6} "
+            f"{row['srednia']:>6.2f} {row['sredni_ranking']:>11.2f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""Publishes timer events to an OksfordOS-web room, for viewers on timer.html.
+
+The room URL is e.g. http://192.168.1.10:8000/api/rooms/sala1. Events are sent from a
+background thread so a slow or missing server never blocks the GUI.
+"""
+import json
+import queue
+import threading
+import time
+import urllib.request
+
+TIMEOUT = 2.0
+
+
+class TimerPublisher:
+    def __init__(self, room_url, key=None):
+        self.url = room_url.rstrip("/") + "/timer"
+        self.key = key
+        self.last_error = None
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="timer-publisher", daemon=True)
+        self._thread.start()
+
+    # action: "start" (odliczanie trwa), "pause" albo "reset"
+    def publish(self, timer, action, remaining, duration):
+        self._queue.put((time.monotonic(), timer, action, remaining, duration))
+
+    def publish_clock(self, timer, clock, reset=False):
+        if clock.running:
+            action = "start"
+        else:
+            action = "reset" if reset else "pause"
+        self.publish(timer, action, clock.remaining(), clock.duration)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            created, timer, action, remaining, duration = item
+            if action == "start":
+                # Serwer stempluje zdarzenie w chwili odbioru - odejmij czas spędzony w kolejce
+                remaining = max(0.0, remaining - (time.monotonic() - created))
+            body = {"timer": timer, "action": action, "remaining": remaining, "duration": duration}
+            request = urllib.request.Request(
+                self.url,
+                data=json.dumps(body).encode("utf-8"),
+                headers={"Content-Type": "application/json"},
+                method="POST",
+            )
+            if self.key:
+                request.add_header("X-Room-Key", self.key)
+            try:
+                with urllib.request.urlopen(request, timeout=TIMEOUT) as response:
+                    response.read()
+                self.last_error = None
+            except (OSError, ValueError) as e:
+                self.last_error = e
+
+    def close(self, wait=False):
+        self._queue.put(None)
+        if wait:
+            self._thread.join(TIMEOUT * 2)
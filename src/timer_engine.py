@@ -0,0 +1,122 @@
+import math
+import time
+from collections import namedtuple
+
+# Profil czasowy wystąpienia: seconds - czas mowy; protected - czas chroniony (bez pytań)
+# na początku i na końcu mowy; grace - doliczony czas po zerze, zanim zegar sam stanie
+SpeechTiming = namedtuple("SpeechTiming", "seconds protected grace")
+
+PHASES = ("protected", "open", "grace", "over")
+
+
+def speech_phase(timing, elapsed):
+    """Phase of a speech ``elapsed`` seconds in: one of PHASES."""
+    if elapsed >= timing.seconds + timing.grace:
+        return "over"
+    if elapsed >= timing.seconds:
+        return "grace"
+    if elapsed < timing.protected or timing.seconds - elapsed <= timing.protected:
+        return "protected"
+    return "open"
+
+
+class CountdownClock:
+    """Countdown computed from a monotonic start/pause ledger instead of tick counting.
+
+    After reaching zero the clock keeps running for ``grace`` seconds (overtime) and only
+    then stops by itself; with no grace it finishes at zero.
+    """
+
+    def __init__(self, duration=0.0, clock=time.monotonic, grace=0.0):
+        self._clock = clock
+        self.duration = float(duration)
+        self.grace = float(grace)
+        self._elapsed = 0.0  # czas zebrany z zakończonych odcinków
+        self._started_at = None  # początek bieżącego odcinka (None = pauza)
+
+    @property
+    def running(self):
+        return self._started_at is not None
+
+    @property
+    def limit(self):
+        return self.duration + self.grace
+
+    def elapsed(self, now=None):
+        if self._started_at is None:
+            return self._elapsed
+        if now is None:
+            now = self._clock()
+        return min(self.limit, self._elapsed + (now - self._started_at))
+
+    def remaining(self, now=None):
+        return max(0.0, self.duration - self.elapsed(now))
+
+    def overtime(self, now=None):
+        return max(0.0, self.elapsed(now) - self.duration)
+
+    def expired(self, now=None):
+        return self.remaining(now) <= 0.0
+
+    def finished(self, now=None):
+        """Expired and out of grace: the clock cannot run any further."""
+        return self.elapsed(now) >= self.limit
+
+    def start(self, now=None):
+        if self._started_at is None and not self.finished():
+            self._started_at = self._clock() if now is None else now
+
+    def pause(self, now=None):
+        if self._started_at is not None:
+            if now is None:
+                now = self._clock()
+            self._elapsed = min(self.limit, self._elapsed + (now - self._started_at))
+            self._started_at = None
+
+    def reset(self, duration=None, grace=None, elapsed=0.0):
+        """Stop the clock; ``elapsed`` > 0 resumes a speech timed earlier."""
+        if duration is not None:
+            self.duration = float(duration)
+        if grace is not None:
+            self.grace = float(grace)
+        self._elapsed = min(self.limit, max(0.0, float(elapsed)))
+        self._started_at = None
+
+    def set_state(self, duration, remaining, running, at=None, grace=0.0, overtime=0.0):
+        """Adopt a state observed elsewhere: `remaining` seconds (or `overtime` past zero) at time `at`."""
+        self.duration = float(duration)
+        self.grace = float(grace)
+        self._elapsed = min(self.limit, max(0.0, self.duration - remaining + overtime))
+        if running:
+            self._started_at = self._clock() if at is None else at
+        else:
+            self._started_at = None
+
+    def display_seconds(self, now=None):
+        # Zaokrąglamy w górę: 4:00 widać aż do upływu pierwszej pełnej sekundy
+        return int(math.ceil(self.remaining(now) - 1e-9))
+
+    def display_overtime(self, now=None):
+        # Po zerze liczymy w górę pełnymi sekundami: +0:01 po pierwszej sekundzie doliczonego czasu
+        return int(math.floor(self.overtime(now) + 1e-9))
+
+    def until_next_second(self, now=None):
+        """Seconds until the displayed value changes, or None if the clock is idle."""
+        if not self.running:
+            return None
+        elapsed = self.elapsed(now)
+        if elapsed >= self.limit:
+            return 0.0
+        remaining = self.duration - elapsed
+        if remaining > 0.0:
+            frac = remaining - math.floor(remaining)
+            return frac if frac > 1e-6 else 1.0
+        over = -remaining
+        return min(1.0 - (over - math.floor(over)), self.limit - elapsed)
+
+
+def next_wakeup(clocks, now=None):
+    """Shared tick schedule: the soonest display change across all running clocks."""
+    delays = [c.until_next_second(now) for c in clocks]
+    delays = [d for d in delays if d is not None]
+    return min(delays) if delays else None
@@ -0,0 +1,22 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+# Qt bez okna, ustawienia i dane aplikacji poza katalogiem użytkownika
+_HOME = tempfile.mkdtemp(prefix="oksfordos-tests-")
+os.environ["QT_QPA_PLATFORM"] = "offscreen"
+os.environ["XDG_CONFIG_HOME"] = os.path.join(_HOME, "config")
+os.environ["XDG_DATA_HOME"] = os.path.join(_HOME, "data")
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    pytest.importorskip("PyQt5")
+    from PyQt5.QtWidgets import QApplication
+
+    return QApplication.instance() or QApplication([])
@@ -0,0 +1,74 @@
+import pytest
+
+from annotation_log import AnnotationLog, annotation_path, main
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def typed_log(every=None):
+    clock = FakeClock()
+    log = AnnotationLog({"notatnik": "Start"}, {"format": "oksfordzki"}, clock=clock)
+    expected = {"notatnik": "Start", "speakers/0/info": ""}
+    states = []
+    for i in range(2500):
+        clock.now = i * 0.5
+        field = "notatnik" if i % 3 else "speakers/0/info"
+        text = expected[field]
+        if i % 7 == 6 and text:
+            position, removed, added = len(text) // 2, 1, ""
+        else:
+            position, removed, added = len(text), 0, chr(ord("a") + i % 26)
+        expected[field] = text[:position] + added + text[position + removed:]
+        log.record(field, position, removed, added, speech=i // 400, timer=clock.now % 240)
+        states.append({k: v for k, v in expected.items() if v})
+    return log, states
+
+
+def test_replay_matches_every_state():
+    log, states = typed_log()
+    replay = log.replay(every=100)
+    for count in (0, 1, 99, 100, 101, 1234, 2500):
+        assert replay.state(count) == (states[count - 1] if count else {"notatnik": "Start"})
+    assert replay.final() == states[-1]
+    assert replay.at(10.0) == states[20]  # zdarzenia do 10 s włącznie
+
+
+def test_save_and_load(tmp_path):
+    log, states = typed_log()
+    path = log.save(str(tmp_path / "runda1.przebieg"))
+    loaded = AnnotationLog.load(path)
+    assert len(loaded) == len(log) and loaded.meta == {"format": "oksfordzki"}
+    assert loaded.event(42) == log.event(42)
+    assert loaded.replay().final() == states[-1]
+
+    data = open(path, "rb").read()
+    (tmp_path / "urwany.przebieg").write_bytes(data[: len(data) // 2])
+    with pytest.raises(ValueError):
+        AnnotationLog.load(str(tmp_path / "urwany.przebieg"))
+
+
+def test_resume_continues_the_timeline():
+    clock = FakeClock()
+    log = AnnotationLog(clock=clock)
+    clock.now = 30.0
+    log.record("notatnik", 0, 0, "a")
+    clock.now = 1000.0
+    log.resume()
+    log.record("notatnik", 1, 0, "b")
+    assert log.event(1).t == 30.0
+
+
+def test_cli(tmp_path, capsys):
+    assert annotation_path("sesje/runda1.json") == "sesje/runda1.przebieg"
+    log, states = typed_log()
+    path = log.save(str(tmp_path / "runda1.przebieg"))
+    assert main([path]) == 0
+    assert "Zdarzeń 2500" in capsys.readouterr().out
+    assert main([path, "--at", "0:10", "--field", "notatnik"]) == 0
+    assert states[20]["notatnik"] in capsys.readouterr().out
@@ -0,0 +1,63 @@
+import pytest
+
+from debate_formats import FORMATS
+from debate_session import DebateSession, speaker_field
+from session_io import SPEAKER_FIELDS
+
+
+@pytest.fixture
+def window(qapp):
+    from oksfordos import DebateJudgeApp
+
+    window = DebateJudgeApp()
+    window.apply_format(FORMATS["oksfordzki"])
+    teza = window.settings.get("teza")
+    yield window
+    # Ustawienia są wspólne dla całego procesu - pusta sesja, żeby zmiana formatu
+    # w kolejnych testach nie pytała tego okna o utratę notatek
+    window.apply_session(DebateSession(debate_format="oksfordzki").snapshot())
+    window.settings.set("teza", teza)
+    window.close()
+
+
+def filled_session():
+    session = DebateSession(debate_format="oksfordzki")
+    for i in range(8):
+        for name in SPEAKER_FIELDS:
+            session.set_text(speaker_field(i, name), f"{name} mówcy {i + 1}\ndruga linia")
+    session.set_text("ad_vocem/0", "ad vocem propozycji")
+    session.set_text("ad_vocem/1", "ad vocem opozycji")
+    session.set_text("notatnik", "notatnik\n" * 20)
+    for i in range(8):
+        session.set_score(i, i + 1)
+    session.set_teza("Ta izba wprowadziłaby dochód podstawowy")
+    return session.snapshot()
+
+
+def test_apply_session_fills_everything_in_one_pass(window, monkeypatch):
+    from oksfordos import AutoResizingTextEdit
+
+    for i in range(window.format.speaker_count):
+        window.ensure_speaker(i)  # wszystkie panele zbudowane - wszystkie edytory do wypełnienia
+    edits, resizes, repaints = [], [], []
+    monkeypatch.setattr(window, "on_field_edited", lambda *args: edits.append(args))
+    measure = AutoResizingTextEdit.resize_for_content
+    monkeypatch.setattr(AutoResizingTextEdit, "resize_for_content",
+                        lambda editor: (resizes.append(editor), measure(editor)))
+    container = window.scroll_area.widget()
+    monkeypatch.setattr(window.speakers[0], "show_questions",
+                        lambda: repaints.append(container.updatesEnabled()))
+
+    data = filled_session()
+    window.apply_session(data)
+
+    editors = [entry.editor for entry in window.fields]
+    assert len(editors) == 8 * 3 + 3
+    for entry in window.fields:
+        assert entry.editor.toPlainText() == window.session.text(entry.field) != ""
+    assert sorted(map(id, resizes)) == sorted(map(id, editors))  # jeden pomiar na edytor
+    assert repaints == [False]  # przeliczenia przy wyłączonym odrysowaniu, layout raz na końcu
+    assert container.updatesEnabled()
+    assert edits == []  # wczytanie to nie edycja - bez dziennika i adnotacji
+    assert window.teza_label.text() == window.session.teza == data["teza"]
+    assert [window.scores_table.cellWidget(0, i).value() for i in range(8)] == list(range(1, 9))
@@ -0,0 +1,74 @@
+import sqlite3
+
+import pytest
+
+from debate_formats import FORMATS
+
+
+@pytest.fixture
+def window(qapp):
+    from oksfordos import DebateJudgeApp
+
+    window = DebateJudgeApp()
+    window.apply_format(FORMATS["oksfordzki"])
+    yield window
+    window.close()
+
+
+def test_save_survives_a_broken_archive(window, tmp_path, monkeypatch):
+    def broken():
+        raise sqlite3.OperationalError("no such module: fts5")
+
+    monkeypatch.setattr(window, "archive", broken)
+    path = tmp_path / "runda1.json"
+    window.export_current_state(str(path))
+    assert path.exists()
+    assert "archiwum" in window.statusBar().currentMessage()
+
+
+def test_index_worker_reports_failure(qapp, tmp_path):
+    from oksfordos import ArchiveIndexWorker
+
+    worker = ArchiveIndexWorker(str(tmp_path / "brak" / "archiwum.sqlite"), [str(tmp_path)])
+    done, failed = [], []
+    worker.done.connect(done.append)
+    worker.failed.connect(failed.append)
+    worker.run()  # w tym wątku - sygnały dochodzą od razu
+    assert done == [] and len(failed) == 1
+
+
+def test_archive_dialog_resets_after_a_failed_index(window, tmp_path):
+    from oksfordos import ArchiveDialog
+
+    dialog = ArchiveDialog(window.archive(), window)
+    dialog._worker = type("Finished", (), {"wait": lambda self: True})()
+    dialog.on_index_failed("database is locked")
+    assert dialog._worker is None
+    assert "database is locked" in dialog.status_label.text()
+
+
+def test_speaker_filter_lists_the_archived_formats(window, tmp_path):
+    from debate_session import DebateSession
+    from oksfordos import ArchiveDialog
+    from session_archive import SessionArchive
+    from session_io import save_session_to_json
+
+    # Sesje zapisane wprost - zmiana formatu w oknie dotknęłaby wspólnych ustawień
+    for key, name in (("oksfordzki", "otwarcie"), ("brytyjski", "odpowiedź opozycji")):
+        fmt = FORMATS[key]
+        session = DebateSession(fmt.speaker_count, fmt.score_count, fmt.key)
+        session.set_text("speakers/1/info", name)
+        save_session_to_json(str(tmp_path / f"{key}.json"), session.snapshot())
+
+    archive = SessionArchive(str(tmp_path / "archiwum.sqlite"))
+    archive.ingest([str(tmp_path)])
+    dialog = ArchiveDialog(archive, window)
+    labels = [dialog.speaker_combo.itemText(i) for i in range(1, dialog.speaker_combo.count())]
+    assert sorted(labels) == archive.speakers()
+    assert "Pro 1" in labels and "OO 1" in labels and "Opo 4" in labels
+    assert labels.index("Opo 4") < labels.index("OO 1")  # kolejność jak w FORMATS, nie alfabetyczna
+
+    dialog.speaker_combo.setCurrentIndex(labels.index("OO 1") + 1)
+    dialog.run_search()
+    assert dialog.results.count() == 1 and "[OO 1]" in dialog.results.item(0).text()
+    archive.close()
@@ -0,0 +1,82 @@
+import json
+import os
+
+import pytest
+
+from debate_session import DebateSession, speaker_field
+
+
+@pytest.fixture
+def data_dir(qapp, tmp_path, monkeypatch):
+    import oksfordos
+
+    monkeypatch.setattr(oksfordos, "app_data_path", lambda *parts: os.path.join(str(tmp_path), *parts))
+    return tmp_path
+
+
+@pytest.fixture
+def windows(data_dir):
+    from oksfordos import DebateJudgeApp
+
+    opened = []
+
+    def open_window():
+        window = DebateJudgeApp()
+        window.finish_startup()
+        opened.append(window)
+        return window
+
+    yield open_window
+    for window in opened:
+        window.close()
+
+
+def write_autosave(directory, records):
+    os.makedirs(directory)
+    snapshot = dict(DebateSession().snapshot(), format="oksfordzki", journal_seq=0)
+    snapshot["speakers"] = [dict(s) for s in snapshot["speakers"]]
+    snapshot["ad_vocem"] = list(snapshot["ad_vocem"])
+    with open(os.path.join(directory, "autosave.json"), "w", encoding="utf-8") as f:
+        json.dump(snapshot, f)
+    with open(os.path.join(directory, "autosave.journal"), "w", encoding="utf-8") as f:
+        for n, record in enumerate(records, 1):
+            f.write(json.dumps(dict(record, n=n)) + "\n")
+
+
+def test_instances_do_not_share_the_autosave(windows):
+    first, second = windows(), windows()
+    assert first.journal.directory != second.journal.directory
+    first.close()
+    # Zamknięte okno zwalnia katalog dla następnej instancji
+    assert windows().journal.directory == first.journal.directory
+
+
+def test_recovery_after_crash(data_dir, windows):
+    write_autosave(str(data_dir / "autosave"), [{"f": "notatnik", "p": 0, "r": 0, "a": "po awarii"}])
+    assert windows().session.text("notatnik") == "po awarii"
+
+
+def test_recovery_that_does_not_load_keeps_the_files(data_dir, windows):
+    # Migawka jest poprawna, dopiero wpis z dziennika wstawia liczbę w pole tekstowe
+    write_autosave(str(data_dir / "autosave"), [{"f": speaker_field(0, "info"), "v": 5}])
+    window = windows()
+    assert window.session.text(speaker_field(0, "info")) == ""
+    assert os.path.exists(data_dir / "autosave" / "autosave.json.uszkodzony")
+    assert os.path.exists(data_dir / "autosave" / "autosave.json")  # nowy autozapis działa dalej
+
+
+def test_startup_survives_a_recovery_that_fails_to_apply(data_dir, windows, monkeypatch):
+    from oksfordos import DebateJudgeApp
+
+    write_autosave(str(data_dir / "autosave"), [{"f": "notatnik", "p": 0, "r": 0, "a": "po awarii"}])
+    apply_session = DebateJudgeApp.apply_session
+
+    def failing(self, data):
+        if data.get("notatnik"):
+            raise ValueError("nie pasuje")
+        apply_session(self, data)
+
+    monkeypatch.setattr(DebateJudgeApp, "apply_session", failing)
+    window = windows()
+    assert window.session.text("notatnik") == ""
+    assert "po awarii" in (data_dir / "autosave" / "autosave.journal.uszkodzony").read_text(encoding="utf-8")
@@ -0,0 +1,33 @@
+import json
+import os
+
+import pytest
+
+from batch_export import main, pdf_paths
+
+
+def test_output_dir_mirrors_subdirectories(tmp_path):
+    out = str(tmp_path / "out")
+    a, b = str(tmp_path / "a" / "runda1.json"), str(tmp_path / "b" / "runda1.json")
+    paths = pdf_paths([a, b], out)
+    assert paths == {a: os.path.join(out, "a", "runda1.pdf"), b: os.path.join(out, "b", "runda1.pdf")}
+    # Jeden katalog - PDF-y bezpośrednio w katalogu wyjściowym, jak dotąd
+    assert pdf_paths([a], out) == {a: os.path.join(out, "runda1.pdf")}
+    assert pdf_paths([a]) == {a: str(tmp_path / "a" / "runda1.pdf")}
+
+
+def test_same_pdf_twice_is_an_error(tmp_path):
+    with pytest.raises(ValueError):
+        pdf_paths([str(tmp_path / "runda1.json"), str(tmp_path / "runda1.JSON")], str(tmp_path / "out"))
+
+
+def test_export_into_mirrored_directories(tmp_path):
+    pytest.importorskip("reportlab")
+    speaker = {"info": "", "question1": "", "question2": ""}
+    session = dict(speakers=[speaker] * 8, ad_vocem=["", ""], punkty=[5] * 8, teza="Teza")
+    for room in ("a", "b"):
+        (tmp_path / "sesje" / room).mkdir(parents=True)
+        (tmp_path / "sesje" / room / "runda1.json").write_text(json.dumps(session), encoding="utf-8")
+    assert main([str(tmp_path / "sesje"), "-o", str(tmp_path / "out"), "-j", "1"]) == 0
+    assert (tmp_path / "out" / "a" / "runda1.pdf").exists()
+    assert (tmp_path / "out" / "b" / "runda1.pdf").exists()
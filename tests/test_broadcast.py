@@ -0,0 +1,114 @@
+import json
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("flask")
+
+# Serwer (OksfordOS-web) nie jest pakietem - importujemy jego moduły jak app.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "OksfordOS-web"))
+
+from flask import Flask  # noqa: E402
+
+from broadcast import TimerHub, create_broadcast_api  # noqa: E402
+from timer_broadcast import TimerPublisher  # noqa: E402
+from timer_engine import CountdownClock  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.delenv("OKSFORDOS_BROADCAST_KEY", raising=False)
+    app = Flask(__name__)
+    app.register_blueprint(create_broadcast_api(str(tmp_path)))
+    return app
+
+
+def wait_for(condition, timeout=5.0):
+    # Stan pokoju uaktualnia wątek pollera huba, nie sam POST
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def read_event(chunks):
+    """Next SSE message from a streamed response, as (event, data)."""
+    text = next(chunks).decode("utf-8")
+    lines = dict(line.split(": ", 1) for line in text.strip().splitlines())
+    return lines["event"], json.loads(lines["data"])
+
+
+def test_publish_and_state(app):
+    client = app.test_client()
+    assert client.post("/api/rooms/sala1/timer", json={"timer": "main", "action": "skok"}).status_code == 400
+    assert client.post("/api/rooms/sala1/timer", json={"timer": "main", "action": "start"}).status_code == 400
+    event = client.post("/api/rooms/sala1/timer", json={"timer": "main", "action": "start", "remaining": 200,
+                                                      "duration": 240}).get_json()
+    assert (event["running"], event["remaining"], event["duration"]) == (True, 200.0, 240.0)
+    assert wait_for(lambda: client.get("/api/rooms/sala1/state").get_json()["timers"].get("main") == event)
+    assert client.get("/api/rooms/sala2/state").get_json()["timers"] == {}
+    assert client.get("/api/time").get_json()["now"] >= event["t"]
+
+
+def test_publish_key(tmp_path, monkeypatch):
+    monkeypatch.setenv("OKSFORDOS_BROADCAST_KEY", "tajne")
+    app = Flask(__name__)
+    app.register_blueprint(create_broadcast_api(str(tmp_path)))
+    client = app.test_client()
+    body = {"timer": "ad", "action": "reset", "remaining": 30}
+    assert client.post("/api/rooms/sala1/timer", json=body).status_code == 403
+    assert client.post("/api/rooms/sala1/timer", json=body, headers={"X-Room-Key": "tajne"}).status_code == 200
+
+
+def test_events_stream(app):
+    client = app.test_client()
+    client.post("/api/rooms/sala1/timer", json={"timer": "ad", "action": "reset", "remaining": 30})
+    hub = app.blueprints["broadcast"].hub
+    assert wait_for(lambda: "ad" in hub.state("sala1"))
+    response = client.get("/api/rooms/sala1/events", buffered=False)
+    assert response.mimetype == "text/event-stream"
+    chunks = iter(response.response)
+    event, data = read_event(chunks)
+    assert event == "state" and data["timers"]["ad"]["remaining"] == 30.0
+
+    client.post("/api/rooms/sala1/timer", json={"timer": "main", "action": "start", "remaining": 240})
+    event, data = read_event(chunks)
+    assert (event, data["timer"], data["running"]) == ("timer", "main", True)
+    response.close()
+    assert hub._subscribers == {}
+
+
+def test_hubs_share_events_through_the_database(tmp_path):
+    # Dwa huby na jednej bazie to dwa procesy workerów gunicorna
+    path = str(tmp_path / "broadcast.sqlite")
+    publisher, viewer = TimerHub(path), TimerHub(path)
+    q = viewer.subscribe("sala1")
+    publisher.publish("sala1", "main", "pause", 120, 240)
+    event = q.get(timeout=5)
+    assert (event["action"], event["remaining"]) == ("pause", 120.0)
+    assert viewer.state("sala1")["main"] == event
+    viewer.unsubscribe("sala1", q)
+
+
+def test_timer_publisher_posts_to_a_room(app):
+    from werkzeug.serving import make_server
+
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        publisher = TimerPublisher(f"http://127.0.0.1:{server.server_port}/api/rooms/sala1/")
+        clock = CountdownClock(240)
+        clock.start()
+        publisher.publish_clock("main", clock)
+        publisher.close(wait=True)
+        assert publisher.last_error is None
+        hub = app.blueprints["broadcast"].hub
+        assert wait_for(lambda: "main" in hub.state("sala1"))
+        event = hub.state("sala1")["main"]
+        assert event["action"] == "start" and 230 < event["remaining"] <= 240
+    finally:
+        server.shutdown()
@@ -0,0 +1,40 @@
+import json
+
+from calibration import load_panels, main
+
+
+def write_session(path, punkty, **extra):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = dict(speakers=[{}] * 8, ad_vocem=["", ""], punkty=punkty, teza="Teza", **extra)
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+
+def test_rooms_with_the_same_teza_stay_apart(tmp_path):
+    for judge, base in (("kowalski", 5), ("nowak", 6)):
+        write_session(tmp_path / judge / "sala1.json", [base] * 8)
+        write_session(tmp_path / judge / "sala2.json", [base + 1] * 8)
+    panel = load_panels([str(tmp_path)], workers=1)
+    assert panel.judges == ["kowalski", "nowak"]
+    assert panel.rounds == [("sala1", "teza"), ("sala2", "teza")]
+    assert panel.scores[:, :, 0].tolist() == [[5, 6], [6, 7]]
+
+
+def test_runda_key_matches_files_with_different_names(tmp_path):
+    write_session(tmp_path / "kowalski" / "a.json", [5] * 8, runda="R1")
+    write_session(tmp_path / "nowak" / "b.json", [6] * 8, runda="R1")
+    assert load_panels([str(tmp_path)], workers=1).rounds == [("R1", "teza")]
+
+
+def test_second_session_of_a_judge_is_reported(tmp_path, capsys):
+    write_session(tmp_path / "kowalski" / "r1.json", [5] * 8, runda="R1")
+    write_session(tmp_path / "kowalski" / "r1-kopia.json", [7] * 8, runda="R1")
+    write_session(tmp_path / "nowak" / "r1.json", [6] * 8, runda="R1")
+    write_session(tmp_path / "nowak" / "r2.json", [6] * 8, runda=["R2"])
+    panel = load_panels([str(tmp_path)], workers=1)
+    assert len(panel.skipped) == 2
+    reasons = " | ".join(reason for _, reason in panel.skipped)
+    assert "kowalski" in reasons and "runda" in reasons
+    assert panel.scores.shape[:2] == (1, 2)
+
+    assert main([str(tmp_path)]) == 0
+    assert capsys.readouterr().err.count("Pominięto") == 2
@@ -0,0 +1,50 @@
+import pytest
+
+from debate_formats import FORMATS, format_for_session, get_format, session_labels, speech_mapping
+from session_io import SessionFormatError
+
+
+def session(speakers, punkty, **extra):
+    return dict(speakers=[{"info": "", "question1": "", "question2": ""}] * speakers, ad_vocem=["", ""],
+                punkty=punkty, **extra)
+
+
+def test_oxford_score_order_is_pro_then_opo():
+    fmt = FORMATS["oksfordzki"]
+    assert [fmt.score_label(c) for c in range(fmt.score_count)] == [
+        "Pro 1", "Pro 2", "Pro 3", "Pro 4", "Opo 1", "Opo 2", "Opo 3", "Opo 4"
+    ]
+    assert [fmt.score_column(i) for i in range(8)] == [0, 4, 1, 5, 2, 6, 3, 7]
+
+
+def test_timing_profiles():
+    assert tuple(FORMATS["oksfordzki"].timing(0)) == (240, 30, 15)
+    assert FORMATS["world_schools"].timing(6).seconds == 240
+
+
+def test_speech_mapping_keeps_sides():
+    oxford, ws = FORMATS["oksfordzki"], FORMATS["world_schools"]
+    mapping = speech_mapping(oxford, ws)
+    assert mapping == {i: i for i in range(6)}  # Pro 4 / Opo 4 nie trafiają na repliki
+    assert speech_mapping(oxford, FORMATS["brytyjski"]) == {}
+    assert speech_mapping(oxford, FORMATS["oksfordzki_repliki"]) == {i: i for i in range(8)}
+
+
+def test_format_for_session():
+    assert format_for_session(session(8, [0] * 8)) is FORMATS["oksfordzki"]
+    assert format_for_session(session(8, [], format="world_schools")) is FORMATS["world_schools"]
+    with pytest.raises(SessionFormatError):
+        format_for_session(session(8, [], format="nieznany"))
+    with pytest.raises(SessionFormatError):
+        format_for_session(session(6, [], format="oksfordzki"))
+    assert get_format("nieznany") is FORMATS["oksfordzki"]
+
+
+def test_session_labels_fall_back_to_oxford():
+    speakers, scores = session_labels(session(8, [1] * 8, format="brytyjski"))
+    assert speakers[0] == "RO 1" and scores[2] == "OO 1"
+    speakers, scores = session_labels(session(8, [1] * 8, format="nieznany"))
+    assert speakers[:2] == ["Pro 1", "Opo 1"] and scores[4] == "Opo 1"
+    speakers, scores = session_labels(session(3, [1] * 8))
+    assert speakers == ["Pro 1", "Opo 1", "Pro 2"] and scores[3:5] == ["Pro 4", "Opo 1"]
+    assert session_labels(session(1, [7])) == (["Pro 1"], ["Pro 1"])  # jeden wynik - bez dzielenia przez zero
@@ -0,0 +1,35 @@
+from debate_session import DebateSession, speaker_field
+from session_io import validate_session
+
+
+def test_splice_and_snapshot_reuse():
+    session = DebateSession()
+    first = session.snapshot()
+    assert session.snapshot() is first
+    session.splice("notatnik", 0, 0, "Uwagi")
+    session.splice("notatnik", 0, 1, "u")
+    assert session.text("notatnik") == "uwagi"
+    second = session.snapshot()
+    assert second is not first and second["notatnik"] == "uwagi"
+    assert "czasy" not in second
+
+
+def test_times_are_rounded_and_saved():
+    session = DebateSession()
+    revision = session.revision
+    assert session.set_time(3, 61.04)
+    assert not session.set_time(3, 61.0)
+    assert session.revision == revision + 1
+    assert session.snapshot()["czasy"][3] == 61.0
+
+
+def test_round_trip_through_a_session_dict():
+    session = DebateSession(debate_format="oksfordzki")
+    session.set_text(speaker_field(2, "question1"), "Pytanie?")
+    session.set_score(4, 6)
+    session.set_teza("Teza")
+    session.set_time(0, 240)
+    data = validate_session(dict(session.snapshot(), speakers=[dict(s) for s in session.snapshot()["speakers"]]))
+    copy = DebateSession.from_dict(data)
+    assert copy.text(speaker_field(2, "question1")) == "Pytanie?"
+    assert (copy.punkty[4], copy.teza, copy.czasy[0], copy.debate_format) == (6, "Teza", 240.0, "oksfordzki")
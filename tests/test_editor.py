@@ -0,0 +1,73 @@
+import pytest
+
+from debate_session import DebateSession
+
+
+@pytest.fixture
+def editor(qapp):
+    from oksfordos import AutoResizingTextEdit
+
+    editor = AutoResizingTextEdit()
+    session = DebateSession()
+    editor.contentsEdited.connect(lambda pos, removed, text: session.splice("notatnik", pos, removed, text))
+    editor.session = session
+    yield editor
+    editor.deleteLater()
+
+
+def model(editor):
+    return editor.session.text("notatnik")
+
+
+def test_splices_use_python_positions_with_emoji(editor):
+    from PyQt5.QtGui import QTextCursor
+
+    editor.insertPlainText("a😀bc")
+    assert model(editor) == "a😀bc"
+    cursor = editor.textCursor()
+    cursor.setPosition(1)
+    cursor.setPosition(3, QTextCursor.KeepAnchor)  # emoji = dwie jednostki UTF-16
+    cursor.removeSelectedText()
+    assert editor.toPlainText() == model(editor) == "abc"
+
+
+def test_edits_after_non_bmp_text_and_after_load(editor):
+    from PyQt5.QtGui import QTextCursor
+
+    editor.load_text("𝒳 notatka 👍")
+    editor.session.set_text("notatnik", "𝒳 notatka 👍")
+    cursor = editor.textCursor()
+    cursor.movePosition(QTextCursor.End)
+    editor.setTextCursor(cursor)
+    editor.insertPlainText(" 🎉 koniec")
+    cursor.setPosition(0)
+    cursor.setPosition(2, QTextCursor.KeepAnchor)
+    cursor.insertText("ż")
+    assert editor.toPlainText() == model(editor) == "ż notatka 👍 🎉 koniec"
+
+
+def test_plain_text_positions_unchanged(editor):
+    editor.insertPlainText("zażółć gęślą jaźń")
+    cursor = editor.textCursor()
+    cursor.setPosition(6)
+    editor.setTextCursor(cursor)
+    editor.insertPlainText("\n")
+    assert editor.toPlainText() == model(editor) == "zażółć\n gęślą jaźń"
+
+
+def test_typing_queues_one_resize_per_frame(editor, qapp, monkeypatch):
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtTest import QTest
+
+    editor.resize(300, 100)
+    resizes = []
+    apply = editor._set_content_height  # wołane raz na każdy pomiar dokumentu
+    monkeypatch.setattr(editor, "_set_content_height", lambda height: (resizes.append(height), apply(height)))
+    for _ in range(5):
+        QTest.keyClicks(editor, "wiersz")
+        QTest.keyClick(editor, Qt.Key_Return)
+    assert resizes == [] and editor._resize_timer.isActive()
+    QTest.qWait(editor.FRAME_MS * 4)
+    assert len(resizes) == 1
+    expected = int(editor.document().size().height()) + 12
+    assert editor.minimumHeight() == max(40, min(expected, editor.max_height)) > 40
@@ -0,0 +1,69 @@
+import pytest
+
+from debate_formats import FORMATS
+
+
+def test_register_and_discard():
+    from oksfordos import FieldRegistry
+
+    fields = FieldRegistry()
+    editors = [object() for _ in range(4)]
+    for section, name in enumerate(("info", "question1", "question2")):
+        fields.register(f"speakers/2/{name}", editors[section], speaker=2, section=section)
+    notes = fields.register("notatnik", editors[3])
+    assert notes.container is editors[3] and notes.speaker is None
+    assert fields.section_count(2) == 3 and fields.section_count(0) == 0
+    assert fields.at(2, 1).field == "speakers/2/question1"
+    assert fields.for_editor(editors[2]).section == 2
+
+    fields.discard("speakers/2/question2")
+    fields.discard("speakers/2/question2")  # drugi raz - bez błędu
+    assert fields.at(2, 2) is None and fields.for_editor(editors[2]) is None
+    for name in ("info", "question1"):
+        fields.discard(f"speakers/2/{name}")
+    assert fields.section_count(2) == 0
+    assert [entry.field for entry in fields] == ["notatnik"]
+
+
+@pytest.fixture
+def window(qapp):
+    from oksfordos import DebateJudgeApp
+
+    window = DebateJudgeApp()
+    window.apply_format(FORMATS["oksfordzki_repliki"])
+    yield window
+    window.apply_format(FORMATS["oksfordzki"])  # format jest we wspólnych ustawieniach
+    window.close()
+
+
+def test_sections_wrap_around(window):
+    window.jump_to_speaker(0)
+    window.session.set_text("speakers/0/question1", "pytanie")  # drugie pytanie dopiero po pierwszym
+    assert window.fields.section_count(0) == 3
+    visited = []
+    for _ in range(3):
+        window.next_section()
+        visited.append(window.current_section_index)
+    assert visited == [1, 2, 0]
+    window.previous_section()
+    assert window.current_section_index == 2
+
+
+def test_reply_without_questions_has_one_section(window):
+    reply = window.format.speaker_count - 1
+    assert window.format.speeches[reply].questions == 0
+    window.jump_to_speaker(reply)
+    assert window.fields.section_count(reply) == 1
+    window.next_section()
+    assert window.current_section_index == 0
+    window.previous_section()
+    assert window.current_section_index == 0
+
+
+def test_speakers_wrap_around(window):
+    last = window.format.speaker_count - 1
+    window.jump_to_speaker(last)
+    window.next_speaker()
+    assert (window.current_speaker_index, window.current_section_index) == (0, 0)
+    window.previous_speaker()
+    assert window.current_speaker_index == last
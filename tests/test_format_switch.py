@@ -0,0 +1,73 @@
+import pytest
+
+from debate_formats import FORMATS
+from debate_session import speaker_field
+
+
+@pytest.fixture
+def window(qapp):
+    from oksfordos import DebateJudgeApp
+
+    window = DebateJudgeApp()
+    window.apply_format(FORMATS["oksfordzki"])
+    yield window
+    window.close()
+
+
+def test_carry_over_matches_side_and_label(window):
+    oxford = FORMATS["oksfordzki"]
+    for i in range(8):
+        window.session.set_text(speaker_field(i, "info"), oxford.speaker_label(i))
+        window.session.set_score(oxford.score_column(i), i + 1)
+    window.apply_format(FORMATS["world_schools"], carry_over=True)
+    ws = FORMATS["world_schools"]
+    for i in range(6):
+        assert window.session.text(speaker_field(i, "info")) == ws.speaker_label(i)
+        assert window.session.punkty[ws.score_column(i)] == i + 1
+    # repliki zaczynają puste - notatki Pro 4 / Opo 4 nie przechodzą na drugą stronę
+    assert window.session.text(speaker_field(6, "info")) == ""
+    assert window.session.text(speaker_field(7, "info")) == ""
+    assert window.session.punkty[ws.score_column(6)] == window.session.punkty[ws.score_column(7)] == 0
+
+
+def test_confirm_lists_unmatched_speeches(window, monkeypatch):
+    import oksfordos
+
+    asked = []
+    def question(parent, title, text):
+        asked.append(text)
+        return oksfordos.QMessageBox.No
+
+    monkeypatch.setattr(oksfordos.QMessageBox, "question", question)
+    window.session.set_text(speaker_field(6, "info"), "Pro 4")
+    assert window.confirm_format_change(FORMATS["world_schools"]) is False
+    assert "Pro 4" in asked[0]
+    window.session.set_text(speaker_field(6, "info"), "")
+    window.session.set_score(FORMATS["oksfordzki"].score_column(0), 7)
+    assert window.confirm_format_change(FORMATS["world_schools"]) is True
+    assert window.confirm_format_change(FORMATS["brytyjski"]) is False
+
+
+def test_reset_keeps_the_measured_speech_time(window):
+    window.jump_to_speaker(2)
+    timing = window.speech_timing(2)
+    window.main_clock.reset(timing.seconds, timing.grace, elapsed=95.0)
+    window.reset_timer()
+    assert window.main_clock.elapsed() == 0
+    assert window.session.czasy[2] == 95.0
+    window.jump_to_speaker(3)
+    window.jump_to_speaker(2)
+    assert window.session.czasy[2] == 95.0
+    assert window.main_clock.elapsed() == 95.0
+
+
+def test_settings_timer_stops_at_zero(window):
+    window.settings.set("format_timing", False)
+    try:
+        timing = window.speech_timing(0)
+        assert timing.seconds == window.settings.get("main_minutes") * 60 + window.settings.get("main_seconds")
+        assert timing.grace == 0
+        assert window.main_clock.limit == timing.seconds
+    finally:
+        window.settings.set("format_timing", True)
+        window.settings.flush()
@@ -0,0 +1,34 @@
+import json
+
+from instrumentation import Probe, main
+
+
+def test_ring_buffer_keeps_the_newest_events():
+    probe = Probe(capacity=4)
+    for n in range(6):
+        probe.speaker = n % 2
+        probe.record("relayout", "block", float(n))
+    records = list(probe.records())
+    assert [value for _, _, _, value, _ in records] == [2.0, 3.0, 4.0, 5.0]
+    summary = probe.summary()["relayout:block"]
+    assert (summary["count"], summary["total"], summary["max"]) == (4, 6, 5.0)
+
+
+def test_keystrokes_dump_and_summary(tmp_path, capsys):
+    probe = Probe()
+    probe.format = "brytyjski"
+    probe.speaker = 1
+    handler = probe.timed("shortcut", "Ctrl+Down", lambda: "ok")
+    assert [handler() for _ in range(3)] == ["ok"] * 3
+    probe.record("stall", "event_loop", 250.0)
+
+    path = probe.dump(str(tmp_path / "profil.json"))
+    data = json.loads(open(path, encoding="utf-8").read())
+    assert data["format"] == "brytyjski" and data["recorded"] == 4
+    assert data["summary"]["shortcut:Ctrl+Down"]["count"] == 3
+    assert data["records"][-1][1:] == ["stall", "event_loop", 250.0, 1]
+
+    assert main([path]) == 0
+    out = capsys.readouterr().out
+    assert "shortcut:Ctrl+Down" in out
+    assert "OO 1" in out  # mówca 1 w formacie brytyjskim, nie "Opo 1"
@@ -0,0 +1,110 @@
+import socket
+import threading
+import time
+
+import pytest
+
+from lan_sync import DEFAULT_PORT, SyncChair, SyncFollower, parse_address
+
+
+def test_parse_address():
+    assert parse_address("sala2.local") == ("sala2.local", DEFAULT_PORT)
+    assert parse_address(" 10.0.0.5:47801 ") == ("10.0.0.5", 47801)
+    assert parse_address(":47801") == ("", 47801)
+    with pytest.raises(ValueError):
+        parse_address("host:port")
+
+
+def test_follower_gets_state_from_chair_on_localhost():
+    received = []
+    arrived = threading.Event()
+
+    def on_state(state):
+        received.append(state)
+        arrived.set()
+
+    chair = SyncChair(0, "127.0.0.1")
+    follower = SyncFollower(("127.0.0.1", chair.port), on_state)
+    try:
+        now = time.monotonic()
+        chair.publish({"timers": {"main": {"running": True, "remaining": 200.0, "duration": 240, "t": now}},
+                       "teza": "Teza", "speaker": 2})
+        assert arrived.wait(5.0)
+        state = received[-1]
+        assert (state["teza"], state["speaker"]) == ("Teza", 2)
+        # Ten sam proces, ten sam zegar - przeliczony czas prawie się nie zmienia
+        assert abs(state["timers"]["main"]["t"] - now) < 0.5
+        assert chair.followers
+    finally:
+        follower.close()
+        chair.close()
+
+
+def test_follower_applies_heartbeats():
+    received = []
+    follower = SyncFollower(("127.0.0.1", DEFAULT_PORT), received.append)
+    follower.close()  # bez wątku sieciowego - datagramy podajemy ręcznie
+    follower._samples.clear()
+    now = time.monotonic()
+    state = {"type": "state", "seq": 7, "sent": now, "speaker": 1,
+             "timers": {"main": {"running": True, "remaining": 100.0, "duration": 240, "t": now}}}
+    follower._handle(state, None, now)
+    # Pierwszy pong poprawia offset - powtórzony heartbeat musi go zastosować
+    follower._samples.append((0.001, 2.0))
+    follower._handle(state, None, now + 1.0)
+    assert len(received) == 2
+    assert received[0]["offset"] is None and received[1]["offset"] == 2.0
+    assert received[1]["timers"]["main"]["t"] == pytest.approx(now - 2.0)
+
+
+@pytest.fixture
+def window(qapp):
+    from oksfordos import DebateJudgeApp
+
+    window = DebateJudgeApp()
+    yield window
+    # Ustawienia są wspólne dla całego procesu - sprzątamy po sobie
+    window.settings.set("sync_mode", "")
+    window.settings.set("sync_address", "")
+    window.settings.flush()
+    window.close()
+
+
+def test_chair_with_host_only_address(window):
+    probe = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        probe.bind(("0.0.0.0", DEFAULT_PORT))
+    except OSError:
+        pytest.skip("domyślny port zajęty")
+    finally:
+        probe.close()
+    window.settings.set("sync_address", "127.0.0.1")
+    window.settings.set("sync_mode", "chair")
+    assert isinstance(window.lan_sync, SyncChair)
+    assert window.lan_sync.port == DEFAULT_PORT
+
+
+def test_windows_sync_over_localhost(qapp, window):
+    from oksfordos import DebateJudgeApp
+
+    window.settings.set("sync_address", "127.0.0.1:0")
+    window.settings.set("sync_mode", "chair")
+    assert isinstance(window.lan_sync, SyncChair)
+    # Drugie okno w tym samym procesie dzieli ustawienia, więc podpinamy je jak configure_lan_sync
+    follower = DebateJudgeApp()
+    follower.lan_sync = SyncFollower(("127.0.0.1", window.lan_sync.port), follower._sync_bridge.stateReceived.emit)
+    focused = []
+    follower.focus_field = focused.append
+    try:
+        window.jump_to_speaker(3)
+        deadline = time.monotonic() + 5.0
+        while follower.current_speaker_index != 3 and time.monotonic() < deadline:
+            qapp.processEvents()
+            time.sleep(0.01)
+        assert follower.current_speaker_index == 3
+        assert follower.timed_speech == window.timed_speech == 3
+        assert focused == []  # przewodniczący nie zabiera kursora sędziemu
+    finally:
+        follower.lan_sync.close()
+        follower.lan_sync = None
+        follower.close()
@@ -0,0 +1,79 @@
+import os
+import time
+
+import pytest
+
+pytest.importorskip("reportlab")
+
+import pdf_report  # noqa: E402
+from debate_session import DebateSession  # noqa: E402
+
+
+def session(note="Pierwszy argument\n\nzażółć gęślą jaźń"):
+    s = DebateSession()
+    s.set_teza("Ta izba poparłaby dochód podstawowy")
+    s.set_text("speakers/0/info", note)
+    s.set_score(3, 7)
+    return s.snapshot()
+
+
+def test_same_session_gives_identical_bytes(tmp_path):
+    first, second = tmp_path / "a.pdf", tmp_path / "b.pdf"
+    pdf_report.build_session_pdf(str(first), session())
+    pdf_report.build_session_pdf(str(second), session())
+    data = first.read_bytes()
+    assert data.startswith(b"%PDF") and data == second.read_bytes()
+
+
+def test_unchanged_session_is_copied_from_cache(tmp_path, monkeypatch):
+    cache = tmp_path / "cache"
+    steps = []
+    pdf_report.build_session_pdf(str(tmp_path / "a.pdf"), session(), cache_dir=str(cache))
+    assert os.listdir(cache) == [pdf_report.session_digest(session()) + ".pdf"]
+
+    def no_render(*args, **kwargs):
+        raise AssertionError("raport z cache nie powinien być składany od nowa")
+
+    monkeypatch.setattr(pdf_report, "SimpleDocTemplate", no_render)
+    pdf_report.build_session_pdf(
+        str(tmp_path / "b.pdf"), session(), lambda percent, message: steps.append(message), cache_dir=str(cache)
+    )
+    assert steps == ["Przygotowanie raportu", "Gotowe"]
+    assert (tmp_path / "a.pdf").read_bytes() == (tmp_path / "b.pdf").read_bytes()
+    # Inna treść - inny klucz, więc bez trafienia w cache
+    with pytest.raises(AssertionError):
+        pdf_report.build_session_pdf(str(tmp_path / "c.pdf"), session("inna notatka"), cache_dir=str(cache))
+
+
+def run_worker(qapp, worker):
+    results = []
+    worker.succeeded.connect(lambda path: results.append(("ok", path)))
+    worker.failed.connect(lambda message: results.append(("błąd", message)))
+    worker.start()
+    deadline = time.monotonic() + 30.0
+    while not results and time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.01)
+    worker.wait()
+    return results
+
+
+def test_export_worker_builds_the_pdf_off_the_gui_thread(qapp, tmp_path):
+    from oksfordos import PdfExportWorker
+
+    path = str(tmp_path / "raport.pdf")
+    worker = PdfExportWorker(path, session())
+    progress = []
+    worker.progress.connect(lambda percent, message: progress.append(percent))
+    assert run_worker(qapp, worker) == [("ok", path)]
+    with open(path, "rb") as f:
+        assert f.read(5) == b"%PDF-"
+    assert progress[0] == 0 and progress[-1] == 100
+
+
+def test_export_worker_reports_failure(qapp, tmp_path):
+    from oksfordos import PdfExportWorker
+
+    worker = PdfExportWorker(str(tmp_path / "brak" / "raport.pdf"), session())
+    [(kind, _)] = run_worker(qapp, worker)
+    assert kind == "błąd"
@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+from session_archive import SessionArchive
+from session_io import SessionFormatError, load_session_from_json, parse_session, save_session_to_json, validate_session
+
+
+def minimal(**extra):
+    return dict(dict(speakers=[{"info": "Argument"}], ad_vocem=["", ""], punkty=[7]), **extra)
+
+
+def test_validate_fills_defaults_and_rejects_bad_values():
+    session = validate_session(minimal())
+    assert session["speakers"][0] == {"info": "Argument", "question1": "", "question2": ""}
+    assert session["notatnik"] == "" and session["teza"] == ""
+    with pytest.raises(SessionFormatError):
+        validate_session(minimal(punkty=[11]))
+    with pytest.raises(SessionFormatError):
+        validate_session(minimal(czasy=[-1]))
+    with pytest.raises(SessionFormatError):
+        parse_session("{nie json")
+    # Klucze narzędzi turniejowych (standings, calibration) przechodzą bez zmian
+    assert validate_session(minimal(mowcy=[1], sedzia=None))["mowcy"] == [1]
+
+
+def test_json_comments_and_round_trip(tmp_path):
+    session = parse_session('{"speakers": [], // komentarz\n "ad_vocem": ["a", "b"], "punkty": [] /* */}')
+    assert session["ad_vocem"] == ["a", "b"]
+    path = tmp_path / "runda.json"
+    save_session_to_json(str(path), minimal(teza="Teza ąę"))
+    assert load_session_from_json(str(path))["teza"] == "Teza ąę"
+
+
+def test_archive_ingests_single_score_session(tmp_path):
+    path = tmp_path / "jeden.json"
+    path.write_text(json.dumps(minimal()), encoding="utf-8")
+    archive = SessionArchive(str(tmp_path / "archiwum.sqlite"))
+    try:
+        assert archive.ingest_file(str(path)) == "new"
+        assert archive.ingest_file(str(path)) == "unchanged"
+    finally:
+        archive.close()
+
+
+def test_non_utf8_file_is_a_format_error(tmp_path):
+    path = tmp_path / "cp1250.json"
+    path.write_bytes('{"teza": "Zażółć"}'.encode("cp1250"))
+    with pytest.raises(SessionFormatError, match="UTF-8"):
+        load_session_from_json(str(path))
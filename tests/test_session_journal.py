@@ -0,0 +1,56 @@
+import os
+
+from session_journal import SessionJournal
+
+
+def snapshot(notatnik=""):
+    return {
+        "speakers": [dict.fromkeys(("info", "question1", "question2"), "") for _ in range(8)],
+        "ad_vocem": ["", ""],
+        "notatnik": notatnik,
+        "punkty": [0] * 8,
+    }
+
+
+def test_recover_replays_edits_after_the_snapshot(tmp_path):
+    journal = SessionJournal(str(tmp_path))
+    journal.start(snapshot())
+    journal.record_text("notatnik", 0, 0, "Ala")
+    journal.record_text("notatnik", 3, 0, " ma kota")
+    journal.record_value("punkty/2", 5)
+    # Awaria: dziennik nie został zamknięty, nowy proces odtwarza sesję
+    recovered = SessionJournal(str(tmp_path)).recover()
+    assert recovered["notatnik"] == "Ala ma kota"
+    assert recovered["punkty"][2] == 5
+
+
+def test_compaction_does_not_replay_twice(tmp_path):
+    journal = SessionJournal(str(tmp_path))
+    journal.start(snapshot())
+    journal.record_text("notatnik", 0, 0, "abc")
+    journal.compact(snapshot("abc"))
+    # Awaria między zapisem migawki a wyczyszczeniem dziennika: stary wpis wraca do pliku
+    with open(journal.journal_path, "w", encoding="utf-8") as f:
+        f.write('{"f":"notatnik","p":0,"r":0,"a":"abc","n":1}\n')
+    assert SessionJournal(str(tmp_path)).recover()["notatnik"] == "abc"
+
+
+def test_torn_last_record_is_ignored(tmp_path):
+    journal = SessionJournal(str(tmp_path))
+    journal.start(snapshot())
+    journal.record_text("notatnik", 0, 0, "cały")
+    with open(journal.journal_path, "a", encoding="utf-8") as f:
+        f.write('{"f":"notatnik","p":4,"r":0,"a":" ur')
+    assert SessionJournal(str(tmp_path)).recover()["notatnik"] == "cały"
+
+
+def test_close_and_set_aside(tmp_path):
+    journal = SessionJournal(str(tmp_path))
+    assert journal.recover() is None
+    journal.start(snapshot("x"))
+    assert journal.set_aside().endswith(".uszkodzony")
+    assert not journal.has_recovery()
+    assert os.path.exists(journal.snapshot_path + ".uszkodzony")
+    journal.start(snapshot())
+    journal.close()
+    assert not os.path.exists(journal.snapshot_path) and not os.path.exists(journal.journal_path)
@@ -0,0 +1,77 @@
+import itertools
+
+import pytest
+
+_names = itertools.count()
+
+
+@pytest.fixture
+def store_factory(qapp):
+    from PyQt5.QtCore import QSettings
+
+    from oksfordos import SettingsStore
+
+    application = f"test-{next(_names)}"
+    stores = []
+
+    def make():
+        store = SettingsStore("OksfordOS-testy", application)
+        stores.append(store)
+        return store
+
+    yield make, QSettings("OksfordOS-testy", application)
+    QSettings("OksfordOS-testy", application).clear()
+
+
+def test_format_timing_defaults_on_for_new_users(store_factory):
+    make, _ = store_factory
+    assert make().get("format_timing") is True
+
+
+def test_format_timing_stays_off_for_a_stored_timer(store_factory):
+    make, qs = store_factory
+    qs.setValue("main_minutes", 5)
+    qs.sync()
+    store = make()
+    assert store.get("format_timing") is False
+    assert store.get("main_minutes") == 5
+
+
+def test_values_are_coerced_to_the_default_type(store_factory):
+    make, qs = store_factory
+    # Tak zapisuje QSettings w pliku INI - wszystko wraca jako tekst
+    qs.setValue("format_timing", "false")
+    qs.setValue("ad_seconds", "45")
+    qs.setValue("main_minutes", "cztery")
+    qs.sync()
+    store = make()
+    assert store.get("format_timing") is False
+    assert store.get("ad_seconds") == 45
+    assert store.get("main_minutes") == 4  # nie da się odczytać - domyślna wartość
+    store.set("format_timing", "true")
+    store.set("main_seconds", 30.0)
+    assert store.get("format_timing") is True
+    assert store.get("main_seconds") == 30 and isinstance(store.get("main_seconds"), int)
+
+
+def test_writes_are_batched_until_flush(store_factory, monkeypatch):
+    make, qs = store_factory
+    store = make()
+    batches, changes = [], []
+    write = store._write_batch
+    monkeypatch.setattr(store, "_write_batch", lambda batch: (batches.append(dict(batch)), write(batch)))
+    store.valueChanged.connect(lambda key, value: changes.append(key))
+    store.set("teza", "Pierwsza")
+    store.set("teza", "Druga")
+    store.set("ad_seconds", 20)
+    store.set("ad_seconds", 20)  # bez zmiany - bez sygnału i zapisu
+    assert changes == ["teza", "teza", "ad_seconds"]
+    assert batches == [] and store._flush_timer.isActive()
+    store.flush(wait=True)
+    assert batches == [{"teza": "Druga", "ad_seconds": 20}]
+    qs.sync()
+    assert qs.value("teza") == "Druga"
+    store.flush(wait=True)
+    assert len(batches) == 1  # nic nowego do zapisu
+    store.close()
+
@@ -0,0 +1,61 @@
+import json
+
+import numpy as np
+
+from standings import SIDE_OPO, SIDE_PRO, TIE, load_score_matrix, main, round_winners, speaker_standings
+
+
+def write_session(path, punkty, **extra):
+    data = dict(speakers=[{}] * 8, ad_vocem=["", ""], punkty=punkty, **extra)
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+
+def test_round_winners_and_tie_breaks():
+    scores = np.array([
+        [5, 5, 5, 5, 4, 4, 4, 4],  # suma
+        [6, 4, 5, 5, 7, 3, 5, 5],  # suma równa, najlepszy mówca opozycji
+        [5, 5, 5, 5, 5, 5, 5, 5],
+    ])
+    assert list(round_winners(scores)) == [SIDE_PRO, SIDE_OPO, TIE]
+
+
+def test_bad_files_are_skipped_and_reported(tmp_path, capsys):
+    write_session(tmp_path / "a.json", [6, 5, 5, 5, 4, 4, 4, 4], mowcy=["Ala"])
+    write_session(tmp_path / "b.json", [4, 4, 4, 4, 6, 5, 5, 5], mowcy=["", "", "", "", "Ala"])
+    write_session(tmp_path / "jeden.json", [7])
+    (tmp_path / "zly.json").write_bytes(b'{"teza": "\xff"}')
+    (tmp_path / "nie_json.json").write_text("{", encoding="utf-8")
+    write_session(tmp_path / "nazwiska.json", [5] * 8, mowcy="Ala")
+
+    matrix = load_score_matrix([str(tmp_path)], workers=2)
+    assert matrix.rounds == 2
+    assert sorted(p.rsplit("/", 1)[1] for p, _ in matrix.skipped) == [
+        "jeden.json", "nazwiska.json", "nie_json.json", "zly.json"
+    ]
+    ala = next(row for row in speaker_standings(matrix) if row["mowca"] == "Ala")
+    assert (ala["rundy"], ala["suma"], ala["wygrane_rundy"]) == (2, 12, 2)
+
+    assert main([str(tmp_path)]) == 0
+    err = capsys.readouterr().err
+    assert err.count("Pominięto") == 4
+
+
+def test_sides_come_from_the_format_and_four_benches_are_skipped(tmp_path, capsys):
+    write_session(tmp_path / "oks.json", [6, 6, 6, 6, 4, 4, 4, 4], format="oksfordzki", mowcy=["Ala"])
+    write_session(tmp_path / "ws.json", [4, 4, 4, 4, 6, 6, 6, 6], format="world_schools", mowcy=["Ala"])
+    write_session(tmp_path / "bp.json", [7, 7, 3, 3, 3, 3, 3, 3], format="brytyjski", mowcy=["Ala"])
+
+    matrix = load_score_matrix([str(tmp_path)], workers=1)
+    assert matrix.rounds == 2
+    assert [p.rsplit("/", 1)[1] for p, _ in matrix.skipped] == ["bp.json"]
+    assert matrix.sides.tolist() == [[SIDE_PRO] * 4 + [SIDE_OPO] * 4] * 2
+    assert list(round_winners(matrix.scores, matrix.sides)) == [SIDE_PRO, SIDE_OPO]
+    ala = next(row for row in speaker_standings(matrix) if row["mowca"] == "Ala")
+    assert (ala["rundy"], ala["suma"], ala["wygrane_rundy"]) == (2, 10, 1)
+
+
+def test_round_winners_with_uneven_sides():
+    scores = np.array([[5, 5, 5, 9, 9, 9]])
+    sides = np.array([[SIDE_PRO, SIDE_PRO, SIDE_PRO, SIDE_PRO, SIDE_PRO, SIDE_OPO]])
+    assert list(round_winners(scores, sides)) == [SIDE_PRO]
+    assert list(round_winners(scores)) == [SIDE_OPO]
@@ -0,0 +1,31 @@
+import os
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+HEAVY = ("sqlite3", "urllib.request", "http.client", "ssl", "subprocess", "reportlab", "numpy")
+
+
+def test_heavy_modules_load_on_first_use():
+    # Osobny proces: w tym moduły mogły już zostać wczytane przez inne testy
+    code = "import sys, oksfordos; print(' '.join(m for m in %r if m in sys.modules))" % (HEAVY,)
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    result = subprocess.run([sys.executable, "-c", code], cwd=SRC, env=env, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == []
+
+
+def _cli_without_reportlab(module, *args):
+    # reportlab zablokowany: narzędzia bez PDF nie mogą go potrzebować
+    code = f"import sys; sys.modules['reportlab'] = None; import {module}; sys.exit({module}.main({list(args)!r}))"
+    return subprocess.run([sys.executable, "-c", code], cwd=SRC, capture_output=True, text=True, timeout=60)
+
+
+def test_standings_runs_without_reportlab(tmp_path):
+    result = _cli_without_reportlab("standings", str(tmp_path))
+    assert "Brak sesji z punktacją" in result.stderr, result.stderr
+
+
+def test_calibration_runs_without_reportlab(tmp_path):
+    result = _cli_without_reportlab("calibration", str(tmp_path))
+    assert "Brak rund" in result.stderr, result.stderr
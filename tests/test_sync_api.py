@@ -0,0 +1,96 @@
+import gzip
+import json
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("flask")
+
+# Serwer (OksfordOS-web) nie jest pakietem - importujemy jego moduły jak app.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "OksfordOS-web"))
+
+from flask import Flask  # noqa: E402
+
+from sync_api import MAX_BODY, create_sync_api  # noqa: E402
+
+SESSION = "/api/sync/sesja-testowa-0001"
+
+
+@pytest.fixture
+def client(tmp_path):
+    app = Flask(__name__)
+    app.register_blueprint(create_sync_api(str(tmp_path)))
+    return app.test_client()
+
+
+def exchange(client, body, **kwargs):
+    response = client.post(SESSION, json=body, **kwargs)
+    return response.status_code, response.get_json()
+
+
+def test_push_then_pull_on_another_device(client):
+    push = {"notatnik": {"c": 1, "v": "Ala"}, "score3": {"c": 2, "v": "7"}}
+    status, data = exchange(client, {"r": "a", "vv": {}, "d": push})
+    assert status == 200 and data["vv"] == {"a": 2}
+    assert data["d"] == {}  # klient ma już wszystko, co wysłał
+
+    status, data = exchange(client, {"r": "b", "vv": {}})
+    assert data["d"] == {"notatnik": ["a", 1, "Ala"], "score3": ["a", 2, "7"]}
+    # Wektor wersji pokrywa wszystko - nic do pobrania
+    assert exchange(client, {"r": "b", "vv": {"a": 2}})[1]["d"] == {}
+
+
+def test_splice_on_current_base_and_resend_on_stale_base(client):
+    exchange(client, {"r": "a", "vv": {}, "d": {"notatnik": {"c": 1, "v": "Ala kota"}}})
+    status, data = exchange(client, {"r": "a", "vv": {"a": 1}, "d": {
+        "notatnik": {"c": 2, "b": ["a", 1], "p": 3, "x": 0, "s": " ma"}}})
+    assert status == 200 and "resend" not in data
+    assert exchange(client, {"r": "b", "vv": {}})[1]["d"]["notatnik"] == ["a", 2, "Ala ma kota"]
+
+    status, data = exchange(client, {"r": "b", "vv": {"a": 2}, "d": {
+        "notatnik": {"c": 1, "b": ["a", 1], "p": 0, "x": 3, "s": "Ola"}}})
+    assert data["resend"] == ["notatnik"]
+    assert exchange(client, {"r": "c", "vv": {}})[1]["d"]["notatnik"] == ["a", 2, "Ala ma kota"]
+
+
+def test_concurrent_writes_are_reported(client):
+    exchange(client, {"r": "a", "vv": {}, "d": {"teza": {"c": 1, "v": "Pierwsza"}}})
+    status, data = exchange(client, {"r": "b", "vv": {}, "d": {"teza": {"c": 1, "v": "Druga"}}})
+    assert data["conflicts"] == ["teza"]
+    # Ostatni zapis wygrywa; a dostaje wartość b
+    assert exchange(client, {"r": "a", "vv": {"a": 1}})[1]["d"] == {"teza": ["b", 1, "Druga"]}
+    # b widział już zapis a - to nie jest konflikt
+    status, data = exchange(client, {"r": "b", "vv": {"a": 1, "b": 1}, "d": {"teza": {"c": 2, "v": "Trzecia"}}})
+    assert "conflicts" not in data
+
+
+def test_invalid_requests(client):
+    assert client.post("/api/sync/krotki", json={"r": "a"}).status_code == 404
+    assert exchange(client, {"r": "a b", "vv": {}})[0] == 400
+    exchange(client, {"r": "a", "vv": {}, "d": {"teza": {"c": 5, "v": "x"}}})
+    assert exchange(client, {"r": "a", "vv": {"a": 5}, "d": {"teza": {"c": 5, "v": "y"}}})[0] == 400
+    past_end = {"teza": {"c": 6, "b": ["a", 5], "p": 9, "x": 0, "s": ""}}
+    assert exchange(client, {"r": "a", "vv": {"a": 5}, "d": past_end})[0] == 400
+    assert client.post(SESSION, data=b"{", content_type="application/json").status_code == 400
+
+
+def test_gzip_both_ways(client):
+    text = "notatka " * 100
+    body = gzip.compress(json.dumps({"r": "a", "vv": {}, "d": {"notatnik": {"c": 1, "v": text}}}).encode())
+    response = client.post(SESSION, data=body, content_type="application/json", headers={"Content-Encoding": "gzip"})
+    assert response.status_code == 200
+    response = client.post(SESSION, json={"r": "b", "vv": {}}, headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(response.data))["d"]["notatnik"][2] == text
+
+
+def test_body_limits(client):
+    too_big = b" " * (MAX_BODY + 1)
+    assert client.post(SESSION, data=too_big, content_type="application/json").status_code == 413
+    # Mała bomba gzip: po rozpakowaniu ponad limit
+    bomb = gzip.compress(b" " * (MAX_BODY * 4))
+    assert len(bomb) < MAX_BODY
+    response = client.post(SESSION, data=bomb, content_type="application/json", headers={"Content-Encoding": "gzip"})
+    assert response.status_code == 413
+    assert client.post(SESSION, data=b"nie gzip", headers={"Content-Encoding": "gzip"}).status_code == 400
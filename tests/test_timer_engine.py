@@ -0,0 +1,70 @@
+import pytest
+
+from timer_engine import CountdownClock, SpeechTiming, next_wakeup, speech_phase
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_speech_phases():
+    timing = SpeechTiming(240, 30, 15)
+    assert [speech_phase(timing, t) for t in (0, 29, 30, 209, 210, 240, 254, 255)] == [
+        "protected", "protected", "open", "open", "protected", "grace", "grace", "over"
+    ]
+
+
+def test_countdown_pause_and_resume():
+    clock = FakeClock()
+    timer = CountdownClock(60, clock)
+    timer.start()
+    clock.now += 10.4
+    assert timer.display_seconds() == 50
+    timer.pause()
+    clock.now += 100
+    assert timer.remaining() == pytest.approx(49.6)
+    timer.start()
+    clock.now += 0.6
+    assert timer.elapsed() == pytest.approx(11.0)
+
+
+def test_grace_runs_past_zero_then_stops():
+    clock = FakeClock()
+    timer = CountdownClock(10, clock, grace=5)
+    timer.start()
+    clock.now += 11.5
+    assert timer.expired() and not timer.finished()
+    assert timer.display_overtime() == 1
+    clock.now += 100
+    assert timer.finished()
+    assert timer.elapsed() == timer.limit == 15
+    timer.pause()
+    timer.start()
+    assert not timer.running  # zegar po doliczonym czasie nie rusza
+
+
+def test_reset_resumes_a_timed_speech():
+    timer = CountdownClock(60, FakeClock())
+    timer.reset(120, 10, elapsed=45)
+    assert (timer.duration, timer.grace, timer.remaining()) == (120, 10, 75)
+    timer.reset(elapsed=500)
+    assert timer.finished()
+
+
+def test_set_state_and_wakeups():
+    clock = FakeClock()
+    timer = CountdownClock(0, clock)
+    timer.set_state(240, 0, True, at=clock.now - 2, grace=15, overtime=3)
+    assert timer.overtime() == pytest.approx(5)
+    assert timer.until_next_second() == pytest.approx(1.0)
+    idle = CountdownClock(30, clock)
+    running = CountdownClock(30, clock)
+    running.start()
+    clock.now += 0.25
+    assert idle.until_next_second() is None
+    assert next_wakeup([idle, running]) == pytest.approx(0.75)
+    assert next_wakeup([idle]) is None
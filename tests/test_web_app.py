@@ -0,0 +1,89 @@
+import gzip
+import importlib
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("flask")
+
+WEB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "OksfordOS-web")
+
+
+@pytest.fixture(scope="module")
+def web(tmp_path_factory):
+    # app.py tworzy bazy transmisji i synchronizacji przy imporcie - niech trafią do katalogu tymczasowego
+    previous = os.environ.get("OKSFORDOS_DATA")
+    os.environ["OKSFORDOS_DATA"] = str(tmp_path_factory.mktemp("web-data"))
+    sys.path.insert(0, WEB)
+    try:
+        return importlib.import_module("app")
+    finally:
+        sys.path.remove(WEB)
+        if previous is None:
+            del os.environ["OKSFORDOS_DATA"]
+        else:
+            os.environ["OKSFORDOS_DATA"] = previous
+
+
+@pytest.fixture
+def client(web):
+    return web.app.test_client()
+
+
+def test_etag_revalidation(client):
+    first = client.get("/", headers={"Accept-Encoding": "identity"})
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"] == "no-cache"
+    etag = first.headers["ETag"]
+    second = client.get("/", headers={"Accept-Encoding": "identity", "If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.headers["ETag"] == etag
+    assert second.data == b""
+    assert client.get("/", headers={"If-None-Match": '"inny"'}).status_code == 200
+
+
+def test_gzip_negotiation(client, web):
+    plain = client.get("/index.html", headers={"Accept-Encoding": "identity"})
+    zipped = client.get("/index.html", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in plain.headers
+    assert zipped.headers["Content-Encoding"] == "gzip"
+    assert zipped.headers["Vary"] == "Accept-Encoding"
+    assert zipped.headers["ETag"] != plain.headers["ETag"]
+    assert gzip.decompress(zipped.data) == plain.data
+    # ETag wariantu gzip też pasuje przy rewalidacji
+    assert client.get("/index.html", headers={"If-None-Match": zipped.headers["ETag"]}).status_code == 304
+
+
+def test_static_assets_are_cached_longer(client):
+    response = client.get("/logo.png")
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"].startswith("public, max-age=")
+
+
+def test_server_code_is_not_served(client):
+    for path in ("/app.py", "/broadcast.py", "/sync_api.py", "/.data/broadcast.sqlite", "/brak.html"):
+        assert client.get(path).status_code == 404, path
+
+
+def test_asset_manifest(client, web):
+    response = client.get("/asset-manifest.json")
+    assert response.headers["Cache-Control"] == "no-cache"
+    manifest = response.get_json()
+    assets = manifest["assets"]
+    assert assets["/index.html"] == web.ASSETS["index.html"].digest
+    assert assets["/"] == assets["/index.html"]  # sw.js trzyma stronę główną pod kluczem "/"
+    assert "/timer.html" in assets
+    assert "/sw.js" not in assets and "/asset-manifest.json" not in assets
+    assert not any(name.endswith(".py") for name in assets)
+
+
+def test_manifest_version_follows_content(web):
+    assets = {name: asset for name, asset in web.ASSETS.items() if name != web.MANIFEST_NAME}
+    version = web.build_asset_manifest(assets)["version"]
+    assert web.build_asset_manifest(dict(assets))["version"] == version
+    changed = dict(assets, **{"timer.html": web.Asset("timer.html", b"<p>nowy</p>")})
+    assert web.build_asset_manifest(changed)["version"] != version
+    # Zmiana samego sw.js nie unieważnia cache zasobów
+    worker = dict(assets, **{"sw.js": web.Asset("sw.js", b"// nowy")})
+    assert web.build_asset_manifest(worker)["version"] == version